@@ -0,0 +1,288 @@
+"""
+active_label.py – étiquetage actif : la recherche seulement là où MoveNet doute
+──────────────────────────────────────────────────────────────
+Le pipeline --bg étiquette chaque coup avec BEPP-2, même là où MoveNet
+choisit déjà le bon coup.  Ici, à chaque tour :
+
+ 1. auto-jeu MoveNet en parallèle (parties en pas synchrone) : toutes les
+    grilles vivantes passent dans un seul predict_proba ;
+ 2. incertitude par grille, sur les coups légaux : marge top1 − top2, et
+    désaccord avec le modèle du tour précédent (comité de deux modèles) ;
+    un coup forcé (un seul légal) n'est jamais étiqueté ;
+ 3. BEPP plus profond que BEPP-2 (LABEL_DEPTH / LABEL_MS) sur les grilles
+    incertaines seulement (marge < MARGIN ou désaccord), au plus --budget
+    par tour, désaccords puis plus petites marges d'abord ;
+ 4. lignes ajoutées au dossier de shards (ShardWriter, manifest.json), puis
+    réentraînement `train_hgbc.py --stream` sur la base d'origine (--base, celle
+    du modèle de départ) + le dossier, lignes actives pondérées par
+    --label-weight → modèle du tour suivant.  Sans la base, le modèle
+    n'apprendrait que des grilles difficiles (≤ budget lignes biaisées) et
+    oublierait le reste : le score baisse à chaque tour.
+
+    python active_label.py --model model/hgb_2048.joblib --base data/base/ \\
+           --shards data/active/ --rounds 5 --games 64 --budget 20000 \\
+           --eval-games 64 --out model/hgb_active.joblib
+
+--eval-games rejoue les mêmes graines à chaque tour : c'est la mesure à
+comparer d'un modèle à l'autre (le score des parties d'auto-jeu dépend de
+leurs graines, nouvelles à chaque tour).
+
+Les symétries du carré ne servent pas de comité : les labels BEPP suivent un
+coin préféré, le modèle n'est pas équivariant.
+"""
+from __future__ import annotations
+import argparse, multiprocessing as mp, os, subprocess, sys, tempfile, time
+from pathlib import Path
+
+import numpy as np
+
+import kernels
+import shards
+from algo.movenet import DIRS, MoveNet
+from board import Board, move_board, _DIR_ID
+from eval.heuristics import bounded_eval
+from game import Game
+from search.expectimax import best_move
+
+ROOT = Path(__file__).resolve().parent
+
+# ─────────────────────── paramètres (modifiables) ──────────────────────────
+MARGIN      = 0.20   # marge top1 − top2 sous laquelle la grille est étiquetée
+LABEL_DEPTH = 3      # profondeur BEPP des labels (BEPP-2 dans --bg)
+LABEL_MS    = 100    # budget BEPP par grille étiquetée
+EVAL_SEED   = 1 << 40   # graines d'évaluation, hors de celles réservées par ShardWriter
+
+_DIR_IDS = np.array([_DIR_ID[d] for d in DIRS], dtype=np.int8)
+
+
+def set_active_params(*, margin: float | None = None, depth: int | None = None,
+                      ms: int | None = None) -> None:
+    """Permet de changer les seuils / la recherche depuis un autre module (argparse)."""
+    global MARGIN, LABEL_DEPTH, LABEL_MS
+    if margin is not None:
+        MARGIN = float(margin)
+    if depth is not None:
+        LABEL_DEPTH = int(depth)
+    if ms is not None:
+        LABEL_MS = int(ms)
+
+
+# ───────────────────────────── incertitude ─────────────────────────────────
+def legal_mask(raws) -> np.ndarray:
+    """Grilles uint64[n] → coups légaux bool (n, 4), colonnes dans l'ordre DIRS."""
+    raws = np.asarray(raws, dtype=np.uint64)
+    out = np.zeros((len(raws), len(DIRS)), dtype=bool)
+    for i, b in enumerate(raws):
+        for j, d in enumerate(_DIR_IDS):
+            out[i, j] = move_board(b, d)[2]
+    return out
+
+
+def policy_proba(model: MoveNet | None, raws) -> np.ndarray:
+    """Probabilités (n, 4) ; sans modèle : a priori uniforme (tout est incertain)."""
+    raws = np.asarray(raws, dtype=np.uint64)
+    if model is None:
+        return np.full((len(raws), len(DIRS)), 1 / len(DIRS))
+    return model.predict_proba_batch(raws)
+
+
+def uncertainty(proba: np.ndarray, legal: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """(coup retenu, marge top1 − top2) sur les coups légaux ; coup forcé → marge 1."""
+    p = np.where(legal, proba + 1e-12, -1.0)
+    p_sorted = np.sort(p, axis=1)
+    margin = np.where(legal.sum(axis=1) > 1, p_sorted[:, -1] - p_sorted[:, -2], 1.0)
+    return p.argmax(axis=1), margin
+
+
+def select(margin: np.ndarray, disagree: np.ndarray, budget: int) -> np.ndarray:
+    """
+    Indices à étiqueter, par priorité : désaccords puis marges < MARGIN,
+    chaque groupe par marge croissante ; au plus *budget*.
+    """
+    cand = np.flatnonzero((margin < MARGIN) | disagree)
+    order = np.lexsort((margin[cand], ~disagree[cand]))
+    return cand[order[:budget]]
+
+
+# ───────────────────────────── auto-jeu ────────────────────────────────────
+def self_play(model: MoveNet | None, seeds: list[int], max_moves: int = 0,
+              prev: MoveNet | None = None) -> dict:
+    """
+    Parties MoveNet en pas synchrone → positions rencontrées (game, idx, score,
+    board, margin, disagree) + score / tuile max de chaque partie.
+    *prev* : modèle du tour précédent, comité pour le désaccord.
+    """
+    games = [Game(s) for s in seeds]
+    idx = [0] * len(games)
+    cols = {k: [] for k in ("game", "idx", "score", "board", "margin", "disagree")}
+    live = [i for i, g in enumerate(games) if not g.is_over()]
+    while live:
+        raws = np.array([games[i].board.raw for i in live], dtype=np.uint64)
+        legal = legal_mask(raws)
+        top, margin = uncertainty(policy_proba(model, raws), legal)
+        disagree = (uncertainty(policy_proba(prev, raws), legal)[0] != top
+                    if prev is not None else np.zeros(len(live), dtype=bool))
+        for k, i in enumerate(live):
+            g = games[i]
+            for name, v in (("game", g.seed), ("idx", idx[i]), ("score", g.score),
+                            ("board", raws[k]), ("margin", margin[k]),
+                            ("disagree", disagree[k])):
+                cols[name].append(v)
+            g.move(DIRS[top[k]])
+            idx[i] += 1
+        live = [i for i in live if not games[i].is_over()
+                and (not max_moves or idx[i] < max_moves)]
+    pos = {k: np.asarray(v) for k, v in cols.items()}
+    pos["board"] = pos["board"].astype(np.uint64)
+    pos["game"] = pos["game"].astype(np.uint64)
+    return {"pos": pos, "scores": np.array([g.score for g in games]),
+            "max_tiles": np.array([g.board.max_tile() for g in games])}
+
+
+# ───────────────────────────── étiquetage ──────────────────────────────────
+def _board(raw: int) -> Board:
+    b = Board.__new__(Board)
+    b._b, b._rng = np.uint64(raw), None
+    return b
+
+
+def _label(args) -> tuple[int, float, float]:
+    """Worker : grille → (coup BEPP, bounded_eval, CPU s)."""
+    raw, depth, ms = args
+    b = _board(raw)
+    t0 = time.process_time()
+    mv = best_move(b, depth, ms)
+    return DIRS.index(mv), bounded_eval(b), time.process_time() - t0
+
+
+def label(raws, workers: int, depth: int | None = None,
+          ms: int | None = None) -> tuple[np.ndarray, np.ndarray, float]:
+    """Étiquette les grilles en parallèle → (coups, valeurs, CPU s total)."""
+    depth, ms = depth or LABEL_DEPTH, ms or LABEL_MS
+    tasks = [(int(r), depth, ms) for r in raws]
+    if workers > 1:
+        with mp.Pool(workers, kernels.warmup, (("board",),)) as pool:
+            out = pool.map(_label, tasks, chunksize=16)
+    else:
+        out = [_label(t) for t in tasks]
+    moves, vals, cpu = zip(*out) if out else ((), (), ())
+    return (np.array(moves, dtype=np.uint8), np.array(vals, dtype=np.float32),
+            float(sum(cpu)))
+
+
+def bepp2_cost_ms(raws, n: int = 200, seed: int = 0) -> float:
+    """CPU-ms moyen de l'étiquetage historique (BEPP-2, 10 ms) sur *n* grilles."""
+    rng = np.random.default_rng(seed)
+    sample = rng.choice(np.asarray(raws), min(n, len(raws)), replace=False)
+    t0 = time.process_time()
+    for r in sample:
+        best_move(_board(int(r)), 2, 10)
+    return 1000 * (time.process_time() - t0) / max(len(sample), 1)
+
+
+# ─────────────────────────── boucle de réentraînement ──────────────────────
+def retrain(data: str | Path, model_out: str | Path, max_iter: int = 100,
+            base: str | Path | None = None, label_weight: float = 1.0) -> None:
+    """
+    train_hgbc.py --stream (sous-processus) sur *base* puis le dossier de
+    shards *data*, dont les poids sont multipliés par *label_weight*.
+    """
+    sources = ([str(base)] if base else []) + [str(data)]
+    weights = ([1.0] if base else []) + [label_weight]
+    with tempfile.TemporaryDirectory() as work:
+        subprocess.run([sys.executable, str(ROOT / "train_hgbc.py"), "--stream",
+                        "--data", *sources, "--data-weight", *map(str, weights),
+                        "--model", str(model_out), "--work-dir", work, "--cv-rows", "0",
+                        "--max-iter", str(max_iter)],
+                       check=True, stdout=subprocess.DEVNULL)
+
+
+def evaluate(model: MoveNet | None, games: int, max_moves: int = 0) -> tuple[float, float]:
+    """Score moyen et taux ≥ 1024 sur les mêmes *games* graines à chaque appel."""
+    play = self_play(model, [EVAL_SEED + i for i in range(games)], max_moves)
+    return float(play["scores"].mean()), float((play["max_tiles"] >= 1024).mean())
+
+
+def run_round(model: MoveNet | None, writer: shards.ShardWriter, games: int,
+              budget: int, workers: int, max_moves: int = 0,
+              prev: MoveNet | None = None) -> dict:
+    """Un tour auto-jeu → sélection → étiquetage → shards ; renvoie ses mesures."""
+    t0 = time.perf_counter()
+    play = self_play(model, writer.reserve_seeds(games), max_moves, prev)
+    pos = play["pos"]
+    sel = np.sort(select(pos["margin"], pos["disagree"], budget))   # ordre des parties
+    moves, vals, cpu_s = label(pos["board"][sel], workers)
+
+    rec = shards.empty_records(len(sel))
+    for name in ("game", "idx", "score", "board"):
+        rec[name] = pos[name][sel]
+    rec["move"], rec["val"] = moves, vals
+    for g in np.unique(rec["game"]):
+        writer.add_game(rec[rec["game"] == g])
+    writer.commit()
+
+    top, _ = uncertainty(policy_proba(model, pos["board"][sel]), legal_mask(pos["board"][sel]))
+    return {"positions": len(pos["board"]), "labeled": len(sel),
+            "agree_with_labels": float((top == moves).mean()) if len(sel) else 1.0,
+            "search_ms_per_label": 1000 * cpu_s / max(len(sel), 1),
+            "search_ms_per_position": 1000 * cpu_s / max(len(pos["board"]), 1),
+            "mean_score": float(play["scores"].mean()),
+            "rate_1024": float((play["max_tiles"] >= 1024).mean()),
+            "wall_s": time.perf_counter() - t0, "boards": pos["board"]}
+
+
+if __name__ == "__main__":
+    pa = argparse.ArgumentParser()
+    pa.add_argument("--model", help="modèle MoveNet de départ (.joblib) ; absent = tout étiqueter")
+    pa.add_argument("--base", help="données du modèle de départ (parquet, csv ou shards), "
+                                   "gardées à chaque réentraînement ; requis avec --model")
+    pa.add_argument("--shards", required=True, help="dossier de shards (manifest.json) enrichi")
+    pa.add_argument("--label-weight", type=float, default=0.5,
+                    help="multiplicateur de poids des lignes actives au réentraînement")
+    pa.add_argument("--eval-games", type=int, default=0,
+                    help="parties d'évaluation à graines fixes après chaque tour (0 = aucune)")
+    pa.add_argument("--out", default="model/hgb_active.joblib", help="modèle réentraîné")
+    pa.add_argument("--rounds", type=int, default=3)
+    pa.add_argument("--games", type=int, default=64, help="parties d'auto-jeu par tour")
+    pa.add_argument("--budget", type=int, default=20_000, help="grilles étiquetées par tour")
+    pa.add_argument("--max-moves", type=int, default=0, help="coupe les parties après N coups")
+    pa.add_argument("--margin", type=float, default=MARGIN)
+    pa.add_argument("--depth", type=int, default=LABEL_DEPTH, help="profondeur BEPP des labels")
+    pa.add_argument("--time", type=int, default=LABEL_MS, help="ms BEPP par grille étiquetée")
+    pa.add_argument("--max-iter", type=int, default=100, help="itérations de boosting")
+    pa.add_argument("--workers", type=int, default=max(1, mp.cpu_count() // 2))
+    args = pa.parse_args()
+    if args.model and not args.base:
+        pa.error("--model sans --base : le réentraînement oublierait les données du modèle")
+
+    set_active_params(margin=args.margin, depth=args.depth, ms=args.time)
+    kernels.warmup(("board",))
+    model, prev = (MoveNet(args.model) if args.model else None), None
+    writer = shards.ShardWriter(args.shards)
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    print(f"🚀 étiquetage actif : {args.rounds} tours × {args.games} parties, "
+          f"BEPP-{LABEL_DEPTH} {LABEL_MS} ms si marge < {MARGIN} ou désaccord")
+    if args.eval_games:
+        score, r1024 = evaluate(model, args.eval_games, args.max_moves)
+        print(f"[départ] évaluation {args.eval_games} parties : score moyen {score:,.0f} · "
+              f"≥1024 {r1024:.0%}", flush=True)
+
+    for r in range(args.rounds):
+        res = run_round(model, writer, args.games, args.budget, args.workers,
+                        args.max_moves, prev)
+        base = bepp2_cost_ms(res["boards"])
+        print(f"[tour {r}] score moyen {res['mean_score']:,.0f} · ≥1024 {res['rate_1024']:.0%} · "
+              f"{res['labeled']:,}/{res['positions']:,} grilles étiquetées "
+              f"({res['labeled'] / max(res['positions'], 1):.1%}) · accord MoveNet/labels "
+              f"{res['agree_with_labels']:.1%}")
+        print(f"          recherche {res['search_ms_per_position']:.2f} ms/position "
+              f"(BEPP-2 partout : {base:.2f}) · {res['search_ms_per_label']:.1f} ms/label · "
+              f"{res['wall_s']:.0f}s", flush=True)
+        retrain(args.shards, args.out, args.max_iter, args.base, args.label_weight)
+        model, prev = MoveNet(args.out), model
+        print(f"          ✅ {args.out} réentraîné sur la base + {writer.manifest['rows']:,} "
+              f"lignes actives (poids ×{args.label_weight:g})")
+        if args.eval_games:
+            score, r1024 = evaluate(model, args.eval_games, args.max_moves)
+            print(f"          évaluation {args.eval_games} parties : score moyen {score:,.0f} · "
+                  f"≥1024 {r1024:.0%}", flush=True)
@@ -6,9 +6,19 @@ Sortie  : str  ∈ {"up","down","left","right"}
 """
 
 from pathlib import Path
-import joblib, numpy as np
+import numpy as np
 
 DIRS = ["up", "down", "left", "right"]          # id → label
+_SHIFTS = np.arange(0, 64, 4, dtype=np.uint64)
+
+
+def features_from_raw(raws) -> np.ndarray:
+    """Grilles uint64[n] → features uint16 (n, 17) : [empty_cnt, c0…c15]."""
+    exp   = ((np.asarray(raws, dtype=np.uint64).reshape(-1, 1) >> _SHIFTS)
+             & np.uint64(0xF)).astype(np.uint16)
+    tiles = np.where(exp == 0, 0, np.left_shift(1, exp)).astype(np.uint16)
+    empty = (exp == 0).sum(axis=1, dtype=np.uint16).reshape(-1, 1)
+    return np.hstack((empty, tiles))
 
 
 class MoveNet:
@@ -18,22 +28,30 @@ class MoveNet:
         model_path = Path(model_path)
         if not model_path.exists():
             raise FileNotFoundError(model_path)
+        import joblib                           # (shards / features : pas de joblib)
         self.clf = joblib.load(model_path)      # HistGradientBoostingClassifier
 
     # ────────────────────────── helpers ──────────────────────────
     @staticmethod
     def _features(board) -> np.ndarray:
         """Encode la grille (uint16) + nombre de cases vides (uint16)."""
-        raw = board.raw
-        exp = np.array([(raw >> (i * 4)) & 0xF for i in range(16)], dtype=np.uint8)
-
-        empty_cnt = np.uint16((exp == 0).sum())
-        tiles     = np.where(exp == 0, 0, 1 << exp).astype(np.uint16)
-
-        return np.concatenate(([empty_cnt], tiles)).reshape(1, -1)  # shape (1, 17)
+        return features_from_raw([board.raw])                       # shape (1, 17)
 
     # ────────────────────────── prédiction ───────────────────────
     def __call__(self, board, *_) -> str:
-        pred = self.clf.predict(self._features(board))[0]
+        return self.predict_batch([board.raw])[0]
+
+    def predict_batch(self, raws) -> list[str]:
+        """Grilles uint64[n] → n coups, en un seul appel au modèle."""
+        preds = self.clf.predict(features_from_raw(raws))
         # le modèle peut renvoyer int ou str :
-        return DIRS[int(pred)] if isinstance(pred, (int, np.integer)) else str(pred)
+        return [DIRS[int(p)] if isinstance(p, (int, np.integer)) else str(p)
+                for p in preds]
+
+    def predict_proba_batch(self, raws) -> np.ndarray:
+        """Grilles uint64[n] → probabilités (n, 4), colonnes dans l'ordre DIRS."""
+        p = self.clf.predict_proba(features_from_raw(raws))
+        out = np.zeros((len(p), len(DIRS)))
+        for j, c in enumerate(self.clf.classes_):
+            out[:, int(c) if isinstance(c, (int, np.integer)) else DIRS.index(str(c))] = p[:, j]
+        return out
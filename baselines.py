@@ -0,0 +1,197 @@
+"""
+baselines.py – politiques de référence 100 % Numba
+──────────────────────────────────────────────────────────────
+Un seul moteur de parties JIT, paramétré par un identifiant de politique,
+joue N parties en prange, sans Python dans la boucle :
+
+    random       coup légal uniforme (SplitMix64 propre à la partie)
+    greedy       1-ply : meilleure heuristique bornée après le glissement
+    corner       premier coup légal dans l'ordre ← ↓ → ↑ (coin bas-gauche)
+    expectimax1  1-ply expectimax : moyenne exacte sur les apparitions
+                 (2 : 0.9, 4 : 0.1) de chaque case vide, grille bloquée = 0
+
+Les égalités sont départagées dans l'ordre ← ↓ → ↑.  Les apparitions sont
+celles de board.game_step : la partie i est Game(seed=seeds[i]) jouée avec
+les mêmes coups, sans arrêt à 2048 ; elle se rejoue avec replay.py.
+
+    python baselines.py --policy all --games 20000 --seed 1
+    python baselines.py --policy greedy --games 1000 --replay greedy.2048r
+"""
+from __future__ import annotations
+import argparse, random, time
+
+import numba as nb
+import numpy as np
+
+from board import ROW_EMPTY, can_move, game_step, max_exp, move_board, spawn_tile, splitmix64
+
+RANDOM, GREEDY, CORNER, EXPECTIMAX1 = 0, 1, 2, 3
+POLICIES = {"random": RANDOM, "greedy": GREEDY, "corner": CORNER,
+            "expectimax1": EXPECTIMAX1}
+
+_ORDER = np.array([0, 3, 1, 2], dtype=np.int8)      # ← ↓ → ↑
+_POLICY_SALT = nb.uint64(0xD1B54A32D192ED03)        # RNG des coups ≠ RNG des apparitions
+_NO_WIN = nb.uint8(16)                              # la partie continue après 2048
+
+
+# ───────────────────────────── politiques ──────────────────────────────────
+@nb.njit(cache=True)
+def _heuristic(b):
+    """bounded_eval (eval/heuristics.py) : 0.6 · vides/16 + 0.4 · exposant max/16."""
+    empty = 0
+    for r in range(4):
+        empty += ROW_EMPTY[(b >> nb.uint64(16 * r)) & nb.uint64(0xFFFF)]
+    return 0.6 * empty / 16.0 + 0.4 * max_exp(b) / 16.0
+
+
+@nb.njit(cache=True)
+def _leaf(b):
+    """Feuille de l'expectimax : 0 si la partie est finie, sinon l'heuristique."""
+    return _heuristic(b) if can_move(b) else 0.0
+
+
+@nb.njit(cache=True)
+def _chance_value(a):
+    """Espérance de la feuille sur les apparitions possibles après *a*."""
+    tot, n = 0.0, 0
+    for pos in range(16):
+        sh = nb.uint64(4 * pos)
+        if (a >> sh) & nb.uint64(0xF) == 0:
+            tot += (0.9 * _leaf(a | (nb.uint64(1) << sh))
+                    + 0.1 * _leaf(a | (nb.uint64(2) << sh)))
+            n += 1
+    return tot / n if n else _leaf(a)
+
+
+@nb.njit(cache=True)
+def _choose(policy, b, r):
+    """Coup de *policy* sur *b* → (direction ou -1 si bloqué, état RNG)."""
+    if policy == RANDOM:
+        mask, n = 0, 0
+        for d in range(4):
+            if move_board(b, nb.int8(d))[2]:
+                mask |= 1 << d
+                n += 1
+        if n == 0:
+            return -1, r
+        r, x = splitmix64(r)
+        k = x % nb.uint64(n)
+        for d in range(4):
+            if (mask >> d) & 1:
+                if k == 0:
+                    return d, r
+                k -= nb.uint64(1)
+    best_d, best_v = -1, -1.0
+    for j in range(4):
+        d = _ORDER[j]
+        a, _, moved = move_board(b, d)
+        if not moved:
+            continue
+        if policy == CORNER:
+            return d, r
+        v = _heuristic(a) if policy == GREEDY else _chance_value(a)
+        if v > best_v:
+            best_d, best_v = d, v
+    return best_d, r
+
+
+# ──────────────────────────────── parties ──────────────────────────────────
+@nb.njit(parallel=True, cache=True)
+def play_games(policy, seeds, max_moves, moves, offsets):
+    """
+    Une partie par graine (prange) → (scores, tuiles max, nb de coups).
+    *max_moves* ≤ 0 : jusqu'au blocage.  Si *moves* n'est pas vide, les coups
+    de la partie i y sont écrits à partir de offsets[i].
+    """
+    n = seeds.shape[0]
+    scores = np.zeros(n, dtype=np.int64)
+    tiles = np.zeros(n, dtype=np.int32)
+    counts = np.zeros(n, dtype=np.int64)
+    record = moves.shape[0] > 0
+    for i in nb.prange(n):
+        s = seeds[i]
+        b, s = spawn_tile(nb.uint64(0), s)
+        b, s = spawn_tile(b, s)
+        r = seeds[i] ^ _POLICY_SALT
+        score, k = 0, 0
+        while max_moves <= 0 or k < max_moves:
+            d, r = _choose(policy, b, r)
+            if d < 0:
+                break
+            b, gain, _, _, over, s = game_step(b, nb.int8(d), s, _NO_WIN)
+            if record:
+                moves[offsets[i] + k] = d
+            score += gain
+            k += 1
+            if over:
+                break
+        scores[i] = score
+        tiles[i] = np.int32(1) << np.int32(max_exp(b))
+        counts[i] = k
+    return scores, tiles, counts
+
+
+def play(policy: str | int, n_games: int, seed: int | None = None,
+         max_moves: int = 10_000, record: bool = False) -> dict:
+    """
+    Joue *n_games* parties (graines seed, seed+1, …) → tableaux NumPy
+    {"seed", "score", "max_tile", "moves"} ; avec *record*, une 2e passe
+    (déterministe) ajoute les coups à plat : "moves_flat" et "offsets".
+    """
+    pid = POLICIES[policy] if isinstance(policy, str) else int(policy)
+    base = random.getrandbits(64) if seed is None else seed
+    seeds = np.uint64(base) + np.arange(n_games, dtype=np.uint64)
+    no_moves = np.empty(0, dtype=np.uint8)
+    offsets = np.zeros(n_games, dtype=np.int64)
+    scores, tiles, counts = play_games(pid, seeds, max_moves, no_moves, offsets)
+    res = {"seed": seeds, "score": scores, "max_tile": tiles, "moves": counts}
+    if record:
+        offsets[1:] = np.cumsum(counts)[:-1]
+        flat = np.empty(int(counts.sum()), dtype=np.uint8)
+        play_games(pid, seeds, max_moves, flat, offsets)
+        res["moves_flat"], res["offsets"] = flat, offsets
+    return res
+
+
+def write_replay(path: str, res: dict) -> None:
+    """Parties enregistrées (play(..., record=True)) → archive .2048r."""
+    from replay import MAGIC, encode_game
+    flat, offsets = res["moves_flat"], res["offsets"]
+    with open(path, "ab") as f:
+        if f.tell() == 0:
+            f.write(MAGIC)
+        f.write(b"".join(encode_game(int(s), flat[o:o + n])
+                         for s, o, n in zip(res["seed"], offsets, res["moves"])))
+
+
+def summarize(res: dict, dt: float) -> str:
+    tiles, sc = res["max_tile"], res["score"]
+    rates = " ".join(f"≥{t}: {(tiles >= t).mean():4.0%}" for t in (512, 1024, 2048))
+    return (f"{len(sc) / dt:10,.0f} parties/s {res['moves'].sum() / dt:12,.0f} coups/s · "
+            f"score moy {sc.mean():8,.0f} méd {np.median(sc):8,.0f} · {rates}")
+
+
+if __name__ == "__main__":
+    pa = argparse.ArgumentParser()
+    pa.add_argument("--policy", default="all", choices=["all", *POLICIES])
+    pa.add_argument("--games", type=int, default=10_000)
+    pa.add_argument("--seed", type=int, default=1)
+    pa.add_argument("--max-moves", type=int, default=10_000, help="0 = jusqu'au blocage")
+    pa.add_argument("--replay", help="archive .2048r des parties (une seule politique)")
+    args = pa.parse_args()
+
+    import kernels
+    kernels.warmup(("baselines",))
+    names = list(POLICIES) if args.policy == "all" else [args.policy]
+    if args.replay and len(names) > 1:
+        pa.error("--replay : choisir une seule --policy")
+    print(f"🚀 {args.games:,} parties par politique, graine {args.seed}, "
+          f"{nb.get_num_threads()} threads")
+    for name in names:
+        t0 = time.perf_counter()
+        res = play(name, args.games, args.seed, args.max_moves, record=bool(args.replay))
+        print(f"   {name:<12}{summarize(res, time.perf_counter() - t0)}", flush=True)
+        if args.replay:
+            write_replay(args.replay, res)
+            print(f"✅ {args.replay} : {len(res['score']):,} parties, "
+                  f"{int(res['moves'].sum()):,} coups")
@@ -0,0 +1,204 @@
+"""
+bench_search.py – nœuds / coup et ms / coup de BEPP sur des positions fixes
+───────────────────────────────────────────────────────────────
+Les positions sont tirées de parties BEPP-2 à graine fixe, puis chaque
+configuration est rejouée sans limite de temps sur les mêmes grilles.
+
+    python bench_search.py --depth 4 --prob 0 1e-3 1e-2
+    python bench_search.py --depth 4 --prob 1e-3 --sparse 0 10 --sparse-k 4
+    python bench_search.py --depth 3 --batched        # feuilles une à une vs par lot
+    python bench_search.py --depth 3 --adaptive 16    # parties : fixe vs effort adaptatif
+    python bench_search.py --depth 3 --adaptive 200 --match-cpu   # + fixe à CPU égal
+    python bench_search.py --depth 4 --afterstate     # best_move vs cœur après-états
+"""
+from __future__ import annotations
+import argparse, itertools, random, time
+
+import numpy as np
+
+from board import Board
+from game import Game
+from search import expectimax
+from search.batched_expectimax import best_move_batched
+from search import adaptive, afterstate
+from eval.heuristics import bounded_eval_batch
+
+
+def sample_positions(n: int, seed: int = 0, every: int = 7) -> list[int]:
+    """*n* grilles (raw uint64) prises tous les *every* coups de parties BEPP-2."""
+    random.seed(seed)
+    out: list[int] = []
+    while len(out) < n:
+        g, i = Game(), 0
+        while not g.is_over() and len(out) < n:
+            if i % every == 0:
+                out.append(g.board.raw)
+            g.move(expectimax.best_move(g.board, depth=2, time_limit_ms=10**6))
+            i += 1
+    return out
+
+
+def run(positions: list[int], depth: int, engine=None,
+        stats=expectimax) -> tuple[list[str], dict, float]:
+    """
+    Joue *engine* (best_move par défaut) sur chaque position → (coups,
+    compteurs du module *stats*, durée s).
+    """
+    engine = engine or expectimax.best_move
+    stats.reset_search_stats()
+    moves, t0 = [], time.perf_counter()
+    for raw in positions:
+        b = Board.__new__(Board); b._b = raw
+        moves.append(engine(b, depth, 10**7))
+    return moves, stats.search_stats(), time.perf_counter() - t0
+
+
+def hgb_value_model(positions: list[int]):
+    """Petit HistGradientBoostingRegressor appris sur bounded_eval : évaluateur coûteux à l'appel."""
+    from sklearn.ensemble import HistGradientBoostingRegressor
+    rng  = np.random.default_rng(0)
+    raws = rng.integers(0, 1 << 63, 20_000, dtype=np.uint64)
+    raws = np.concatenate([raws, np.asarray(positions, dtype=np.uint64)])
+    feat = lambda r: ((np.asarray(r, dtype=np.uint64)[:, None]
+                       >> np.arange(0, 64, 4, dtype=np.uint64)) & np.uint64(0xF)).astype(np.uint8)
+    reg  = HistGradientBoostingRegressor(max_iter=50).fit(feat(raws), bounded_eval_batch(raws))
+    batch_eval = lambda r: reg.predict(feat(r))
+    return (lambda b: float(batch_eval([b.raw])[0])), batch_eval
+
+
+def bench_batched(positions: list[int], depth: int) -> None:
+    one, many = hgb_value_model(positions)
+    rows = [("bounded, feuille à feuille", expectimax.best_move),
+            ("bounded, par lot", best_move_batched),
+            ("hgb, feuille à feuille",
+             lambda b, d, ms: expectimax.best_move(b, d, ms, eval_fn=one)),
+            ("hgb, par lot",
+             lambda b, d, ms: best_move_batched(b, d, ms, batch_eval=many))]
+    print(f"{'évaluateur':<28} {'nœuds/coup':>12} {'ms/coup':>9}")
+    for name, engine in rows:
+        _, st, dt = run(positions, depth, engine)
+        print(f"{name:<28} {st['nodes']/len(positions):>12,.0f} "
+              f"{1000*dt/len(positions):>9.1f}")
+
+
+def bench_afterstate(positions: list[int], depth: int) -> None:
+    """best_move vs search/afterstate à profondeur égale : accord des coups, nœuds, temps."""
+    ref, st, dt = run(positions, depth)
+    moves, st2, dt2 = run(positions, depth, afterstate.afterstate_best_move, afterstate)
+    agree = sum(a == b for a, b in zip(moves, ref)) / len(positions)
+    print(f"{'cœur':<12} {'nœuds/coup':>12} {'ms/coup':>9} {'cache':>7} {'accord':>7}")
+    print(f"{'best_move':<12} {st['nodes']/len(positions):>12,.0f} "
+          f"{1000*dt/len(positions):>9.2f} {'-':>7} {'-':>7}")
+    print(f"{'après-états':<12} {st2['nodes']/len(positions):>12,.0f} "
+          f"{1000*dt2/len(positions):>9.2f} {st2['hits']/max(st2['nodes'], 1):>7.1%} "
+          f"{agree:>7.1%}   (×{dt/dt2:.1f})")
+
+
+def _play_all(cfg: dict, seeds) -> tuple[dict, float]:
+    from tune_presets import play, summarize
+    games = [play(cfg, seed) for seed in seeds]
+    r = summarize(cfg, games)
+    r["score_se"] = float(np.std([g["score"] for g in games]) / np.sqrt(len(games)))
+    return r, sum(g["cpu_s"] for g in games) / len(games)
+
+
+def calibrate_cpu(cfg: dict, cpu_target: float, seeds, rounds: int = 4) -> tuple[dict, tuple]:
+    """
+    Ajuste proportionnellement le budget ms du preset fixe *cfg* jusqu'à ce
+    que ses parties sur *seeds* coûtent *cpu_target* CPU s chacune (±5 %) :
+    le coût dépend de la durée des parties, donc du jeu lui-même, il se
+    calibre sur les graines mesurées.  → (preset, dernier résultat).
+    """
+    for _ in range(rounds):
+        out = _play_all(cfg, seeds)
+        if abs(out[1] / cpu_target - 1) <= 0.05:
+            break
+        cfg = {**cfg, "time": round(cfg["time"] * cpu_target / max(out[1], 1e-9), 2)}
+    return cfg, out
+
+
+def bench_adaptive(n_games: int, depth: int, ms: int, match_cpu: bool = False) -> None:
+    """
+    Parties seedées BEPP fixe vs adaptatif (même preset de base) + répartition.
+    *match_cpu* : ajoute un BEPP fixe à la profondeur max de l'adaptatif dont le
+    budget est calibré pour coûter autant de CPU par partie (cf. calibrate_cpu).
+    """
+    seeds = range(n_games)
+    print(f"{n_games} parties · preset de base depth {depth} · {ms} ms")
+    adaptive.reset_effort_stats()
+    rows = [("adaptive", {"engine": "adaptive", "depth": depth, "time": ms})]
+    res = {"adaptive": _play_all(rows[0][1], seeds)}
+    effort = adaptive.effort_stats()
+    rows.append(("bepp", {"engine": "bepp", "depth": depth, "time": ms}))
+    res["bepp"] = _play_all(rows[-1][1], seeds)
+    if match_cpu:
+        cpu_a = res["adaptive"][1]
+        d = min(adaptive.MAX_DEPTH, depth + max(dd for dd, _ in adaptive.TIERS.values()))
+        cfg = {"engine": "bepp", "depth": d, "time": res["adaptive"][0]["ms_per_move"]}
+        cfg, res["bepp=CPU"] = calibrate_cpu(cfg, cpu_a, seeds)
+        rows.append(("bepp=CPU", cfg))
+
+    print(f"{'moteur':<10} {'preset':>16} {'score':>8} {'± e.t.':>7} {'≥512':>6} {'≥1024':>6} "
+          f"{'CPU s/partie':>13} {'ms/coup':>8}")
+    for name, cfg in rows:
+        r, cpu = res[name]
+        preset = f"d{cfg['depth']} · {cfg['time']:g} ms"
+        print(f"{name:<10} {preset:>16} {r['mean_score']:>8,.0f} {r['score_se']:>7,.0f} "
+              f"{r['rate_512']:>6.0%} {r['rate_1024']:>6.0%} {cpu:>13.2f} {r['ms_per_move']:>8.2f}")
+    print("répartition de l'effort (adaptatif) :")
+    for tier, st in effort.items():
+        dd, k = adaptive.TIERS[tier]
+        d = max(1, min(adaptive.MAX_DEPTH, depth + dd))
+        print(f"   {tier:<9} depth {d} · {ms * k:5.0f} ms   {st['share']:>6.1%} des coups "
+              f"{st['ms_per_move']:>7.2f} ms/coup")
+
+
+if __name__ == "__main__":
+    pa = argparse.ArgumentParser()
+    pa.add_argument("--depth", type=int, default=4)
+    pa.add_argument("--positions", type=int, default=40)
+    pa.add_argument("--seed", type=int, default=0)
+    pa.add_argument("--beam", type=int, default=4)
+    pa.add_argument("--prob", type=float, nargs="+", default=[0.0, 1e-3, 1e-2])
+    pa.add_argument("--sparse", type=int, nargs="+", default=[0],
+                    help="seuils de cases vides du mode clairsemé (0 = complet)")
+    pa.add_argument("--sparse-k", type=int, default=6)
+    pa.add_argument("--batched", action="store_true",
+                    help="compare l'évaluation feuille à feuille et par lot")
+    pa.add_argument("--adaptive", type=int, metavar="N",
+                    help="N parties : BEPP fixe vs effort adaptatif (search/adaptive.py)")
+    pa.add_argument("--afterstate", action="store_true",
+                    help="compare best_move et le cœur après-états (search/afterstate.py)")
+    pa.add_argument("--time", type=int, default=40, help="budget ms du preset de base (--adaptive)")
+    pa.add_argument("--match-cpu", action="store_true",
+                    help="--adaptive : + BEPP fixe calibré au même CPU par partie")
+    args = pa.parse_args()
+
+    if args.adaptive:                   # beam / θ : valeurs par défaut de l'UI
+        bench_adaptive(args.adaptive, args.depth, args.time, args.match_cpu)
+        raise SystemExit
+    pos = sample_positions(args.positions, args.seed)
+    if args.batched:
+        expectimax.set_bepp_params(prob_cutoff=args.prob[0], beam_k=args.beam)
+        print(f"{len(pos)} positions · depth {args.depth} · θ {args.prob[0]:g}")
+        bench_batched(pos, args.depth)
+        raise SystemExit
+    if args.afterstate:
+        expectimax.set_bepp_params(prob_cutoff=args.prob[0], beam_k=args.beam,
+                                   sparse_empties=args.sparse[0], sparse_k=args.sparse_k)
+        print(f"{len(pos)} positions · depth {args.depth} · θ {args.prob[0]:g} · beam {args.beam}")
+        bench_afterstate(pos, args.depth)
+        raise SystemExit
+    print(f"{len(pos)} positions · depth {args.depth} · beam {args.beam} "
+          f"· sparse-k {args.sparse_k}")
+    print(f"{'θ':>8} {'sparse':>6} {'nœuds/coup':>12} {'coupés/coup':>12} "
+          f"{'ms/coup':>9} {'accord':>7}")
+    ref = None
+    for theta, sparse in itertools.product(args.prob, args.sparse):
+        expectimax.set_bepp_params(prob_cutoff=theta, beam_k=args.beam,
+                                   sparse_empties=sparse, sparse_k=args.sparse_k)
+        moves, st, dt = run(pos, args.depth)
+        ref = ref or moves
+        agree = sum(a == b for a, b in zip(moves, ref)) / len(pos)
+        print(f"{theta:>8g} {sparse or '-':>6} {st['nodes']/len(pos):>12,.0f} "
+              f"{st['cut']/len(pos):>12,.0f} {1000*dt/len(pos):>9.1f} {agree:>7.1%}")
@@ -3,7 +3,7 @@ board.py – moteur 2048 « bit-board » ultrarapide
 © 2025 – libre de droits
 """
 from __future__ import annotations
-import random
+import hashlib, os, random
 import numpy as np
 import numba as nb
 
@@ -14,6 +14,7 @@ SCORE_LUT = np.empty(1 << 16, dtype=np.uint32)
 
 
 def _left_row(row16: int) -> tuple[int, int]:
+    """Référence scalaire d'un glissement à gauche (tests de _left_rows)."""
     tiles = [(row16 >> (4 * i)) & 0xF for i in range(4)]
     new   = [t for t in tiles if t]
     score = 0
@@ -29,23 +30,51 @@ def _left_row(row16: int) -> tuple[int, int]:
     return res, score
 
 
-for r in range(1 << 16):
-    left, sc      = _left_row(r)
-    ROW_LEFT[r]   = left
-    SCORE_LUT[r]  = sc
-    rev           = ((r >> 12) & 0xF) | ((r >> 4) & 0xF0) \
-                  | ((r << 4) & 0xF00) | ((r << 12) & 0xF000)
-    rev_left, _   = _left_row(rev)
-    ROW_RIGHT[r]  = ((rev_left >> 12) & 0xF) | ((rev_left >> 4) & 0xF0) \
-                  | ((rev_left << 4) & 0xF00) | ((rev_left << 12) & 0xF000)
+def _reverse_rows(r: np.ndarray) -> np.ndarray:
+    return ((r >> 12) & 0xF) | ((r >> 4) & 0xF0) | ((r << 4) & 0xF00) | ((r << 12) & 0xF000)
+
+
+def _left_rows(r: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """_left_row vectorisé sur toutes les lignes *r* (int64) → (lignes, scores)."""
+    nib   = (r[:, None] >> np.array([0, 4, 8, 12])) & 0xF
+    order = np.argsort(nib == 0, axis=1, kind="stable")    # non nulles tassées à gauche
+    src   = np.zeros((len(r), 8), dtype=np.int64)          # marge : lecture jusqu'à +2
+    src[:, :4] = np.take_along_axis(nib, order, axis=1)
+    rows, pos = np.arange(len(r)), np.zeros(len(r), dtype=np.int64)
+    res, score = np.zeros(len(r), dtype=np.int64), np.zeros(len(r), dtype=np.int64)
+    for w in range(4):                                     # case écrite w
+        a, b  = src[rows, pos], src[rows, pos + 1]
+        merge = (a != 0) & (a == b)
+        res   |= (a + merge) << (4 * w)
+        score += np.where(merge, 1 << (a + 1), 0)
+        pos   += 1 + merge
+    return res, score
+
+
+# vectorisé : ~30 ms au lieu de ~300 ms de boucle Python à chaque import
+_ALL_ROWS = np.arange(1 << 16, dtype=np.int64)
+_left, _score = _left_rows(_ALL_ROWS)
+ROW_LEFT[:]   = _left
+SCORE_LUT[:]  = _score
+ROW_RIGHT[:]  = _reverse_rows(_left_rows(_reverse_rows(_ALL_ROWS))[0])
+del _ALL_ROWS, _left, _score
+
+# LUT « danger » : cases vides, tuiles présentes (bit e = exposant e), fusions
+_NIB       = (np.arange(1 << 16)[:, None] >> np.array([0, 4, 8, 12])) & 0xF
+ROW_EMPTY  = (_NIB == 0).sum(axis=1).astype(np.uint8)
+ROW_MASK   = (np.bitwise_or.reduce(1 << _NIB, axis=1) & 0xFFFE).astype(np.uint16)
+ROW_MERGES = ((4 - ROW_EMPTY)
+              - (((ROW_LEFT[:, None] >> np.array([0, 4, 8, 12])) & 0xF) != 0).sum(axis=1)
+              ).astype(np.uint8)
+del _NIB
 
 # ─────────────────────────────────── kernels JIT ────────────────────────────
-@nb.njit(inline="always")
+@nb.njit(inline="always", cache=True)     # appelée aussi depuis Python
 def _get(b: nb.uint64, r: nb.int8, c: nb.int8) -> nb.uint8:
     return nb.uint8((b >> ((r * 4 + c) * 4)) & 0xF)
 
 
-@nb.njit(inline="always")
+@nb.njit(inline="always", cache=True)
 def _set(b: nb.uint64, r: nb.int8, c: nb.int8, v: nb.uint8) -> nb.uint64:
     mask = nb.uint64(0xF) << ((r * 4 + c) * 4)
     return (b & ~mask) | (nb.uint64(v) << ((r * 4 + c) * 4))
@@ -85,6 +114,48 @@ def move_board(b: nb.uint64, d: nb.int8) -> tuple[nb.uint64, nb.int32, nb.bool_]
     return new_b, score, moved
 
 
+# ───────────────────────────── RNG reproductible ───────────────────────────
+@nb.njit(cache=True)
+def splitmix64(s: nb.uint64) -> tuple[nb.uint64, nb.uint64]:
+    """Générateur SplitMix64 : (nouvel état, tirage 64 bits)."""
+    s = nb.uint64(s + nb.uint64(0x9E3779B97F4A7C15))
+    z = s
+    z = (z ^ (z >> nb.uint64(30))) * nb.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> nb.uint64(27))) * nb.uint64(0x94D049BB133111EB)
+    return s, z ^ (z >> nb.uint64(31))
+
+
+@nb.njit(cache=True)
+def spawn_tile(b: nb.uint64, s: nb.uint64) -> tuple[nb.uint64, nb.uint64]:
+    """Pose 2 (90 %) ou 4 (10 %) sur une case vide tirée avec l'état *s*."""
+    n = 0
+    for pos in range(16):
+        if ((b >> (pos * 4)) & 0xF) == 0:
+            n += 1
+    if n == 0:
+        return b, s
+    s, r = splitmix64(s)
+    pick = r % nb.uint64(n)
+    val  = nb.uint64(2) if (r >> nb.uint64(32)) % nb.uint64(10) == 0 else nb.uint64(1)
+    for pos in range(16):
+        if ((b >> (pos * 4)) & 0xF) == 0:
+            if pick == 0:
+                return b | (val << nb.uint64(pos * 4)), s
+            pick -= nb.uint64(1)
+    return b, s
+
+
+@nb.njit(cache=True)
+def max_exp(b: nb.uint64) -> nb.uint8:
+    """Exposant de la plus grosse tuile (0 si grille vide)."""
+    m = nb.uint64(0)
+    for pos in range(16):
+        e = (b >> (pos * 4)) & 0xF
+        if e > m:
+            m = e
+    return nb.uint8(m)
+
+
 @nb.njit(cache=True)
 def can_move(b: nb.uint64) -> nb.bool_:
     for pos in range(16):
@@ -100,12 +171,76 @@ def can_move(b: nb.uint64) -> nb.bool_:
                 return True
     return False
 
+@nb.njit(cache=True)
+def danger_features(b: nb.uint64):
+    """(cases vides, tuiles distinctes, fusions du meilleur axe) via les LUT lignes."""
+    t = _transpose(b)
+    empty, mask, mh, mv = 0, 0, 0, 0
+    for r in range(4):
+        row = (b >> nb.uint64(16 * r)) & nb.uint64(0xFFFF)
+        col = (t >> nb.uint64(16 * r)) & nb.uint64(0xFFFF)
+        empty += ROW_EMPTY[row]
+        mask  |= ROW_MASK[row]
+        mh    += ROW_MERGES[row]
+        mv    += ROW_MERGES[col]
+    distinct = 0
+    while mask:
+        distinct += mask & 1
+        mask >>= 1
+    return empty, distinct, max(mh, mv)
+
+
+@nb.njit(cache=True)
+def game_step(b: nb.uint64, d: nb.int8, s: nb.uint64, win_exp: nb.uint8):
+    """
+    Un coup complet en un seul appel JIT : déplacement, apparition seedée,
+    drapeaux de fin.  Renvoie (board, gain, bougé ?, gagné ?, fini ?, état RNG).
+    """
+    new_b, gain, moved = move_board(b, d)
+    if not moved:
+        return b, nb.int32(0), False, False, False, s
+    new_b, s = spawn_tile(new_b, s)
+    won  = max_exp(new_b) >= win_exp
+    over = won or not can_move(new_b)
+    return new_b, gain, True, won, over, s
+
+# ─────────────────────── noyaux précompilés (AOT) ──────────────────────────
+# `python kernels.py --aot` compile les points d'entrée Python de Board dans
+# l'extension _board_aot : plus aucun JIT au premier coup.  Ignorée si absente,
+# si BOARD_AOT=0, ou si elle a été construite depuis une autre version du fichier.
+def source_digest() -> int:
+    """Empreinte 63 bits de board.py (fige la version des noyaux AOT)."""
+    with open(__file__, "rb") as f:
+        return int.from_bytes(hashlib.sha1(f.read()).digest()[:8], "little") >> 1
+
+
+def _load_aot():
+    if os.environ.get("BOARD_AOT", "1") == "0":
+        return None
+    try:
+        import _board_aot
+    except ImportError:
+        return None
+    return _board_aot if _board_aot.source_digest() == source_digest() else None
+
+
+_aot = _load_aot()
+# versions appelées depuis Python (les noyaux JIT restent ceux des appels Numba)
+_py_get, _py_set, _py_move, _py_step, _py_spawn, _py_can, _py_max = (
+    (_aot._get, _aot._set, _aot.move_board, _aot.game_step,
+     _aot.spawn_tile, _aot.can_move, _aot.max_exp) if _aot else
+    (_get, _set, move_board, game_step, spawn_tile, can_move, max_exp))
+
 # ──────────────────────────────── classe Board ─────────────────────────────
+_DIR_ID = {"left": 0, "right": 1, "up": 2, "down": 3}
+
 class Board:
-    __slots__ = ("_b",)
+    __slots__ = ("_b", "_rng")
 
-    def __init__(self):
-        self._b = np.uint64(0)
+    def __init__(self, seed: int | None = None):
+        """*seed* : graine 64 bits des apparitions (tirée de `random` si None)."""
+        self._b   = np.uint64(0)
+        self._rng = np.uint64(random.getrandbits(64) if seed is None else seed)
         self._add_random_tile()
         self._add_random_tile()
 
@@ -113,6 +248,7 @@ class Board:
     def clone(self) -> "Board":
         obj = Board.__new__(Board)
         obj._b = np.uint64(self._b)      # assure le type
+        obj._rng = None                  # copie de recherche : RNG global
         return obj
 
     # ----------------------------------------------------------- hash / eq
@@ -125,21 +261,30 @@ class Board:
         return int(self._b)
 
     def max_tile(self) -> int:
-        return 1 << max((_get(np.uint64(self._b), r, c)  # cast de sûreté
-                         for r in range(4) for c in range(4)))
+        return 1 << int(_py_max(np.uint64(self._b)))
 
     def get_empty_cells(self) -> list[tuple[int, int]]:
         return [(p // 4, p % 4) for p in range(16)
                 if ((np.uint64(self._b) >> (p * 4)) & 0xF) == 0]
 
     def set_tile(self, r: int, c: int, exp: int):
-        self._b = np.uint64(_set(np.uint64(self._b), r, c, np.uint8(exp)))
+        self._b = np.uint64(_py_set(np.uint64(self._b), r, c, np.uint8(exp)))
 
     # ---------------------------------------------------------------- move
+    def step(self, dir_id: int, win_exp: int = 11) -> tuple[bool, int, bool, bool]:
+        """Coup de partie (RNG seedé) via game_step → (bougé, gain, gagné, fini)."""
+        b, gain, moved, won, over, self._rng = _py_step(
+            np.uint64(self._b), np.int8(dir_id), np.uint64(self._rng), np.uint8(win_exp))
+        self._b = np.uint64(b)
+        return moved, gain, won, over
+
     def move(self, direction: str, *, add_random: bool = True) -> tuple[bool, int]:
-        dir_id = {"left": 0, "right": 1, "up": 2, "down": 3}[direction]
+        dir_id = _DIR_ID[direction]
+        if add_random and getattr(self, "_rng", None) is not None:
+            moved, gain, _, _ = self.step(dir_id)
+            return moved, gain
         # 🔑 on force le type ⇒ jamais (float64, int64)
-        new_b, gain, moved = move_board(np.uint64(self._b), np.int8(dir_id))
+        new_b, gain, moved = _py_move(np.uint64(self._b), np.int8(dir_id))
         if moved:
             self._b = np.uint64(new_b)
             if add_random:
@@ -147,10 +292,15 @@ class Board:
         return bool(moved), int(gain)
 
     def can_move(self) -> bool:
-        return bool(can_move(np.uint64(self._b)))
+        return bool(_py_can(np.uint64(self._b)))
 
     # ----------------------------------------------------------- internals
     def _add_random_tile(self):
+        rng = getattr(self, "_rng", None)
+        if rng is not None:              # partie : tirage reproductible
+            b, self._rng = _py_spawn(np.uint64(self._b), np.uint64(rng))
+            self._b = np.uint64(b)
+            return
         empties = self.get_empty_cells()
         if not empties:
             return
@@ -164,7 +314,7 @@ class Board:
         for r in range(4):
             s += "|"
             for c in range(4):
-                v = _get(np.uint64(self._b), r, c)
+                v = _py_get(np.uint64(self._b), r, c)
                 s += f"{(1 << v) if v else '.':>5}|"
             s += "\n" + sep
         return s
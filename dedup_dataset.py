@@ -0,0 +1,119 @@
+"""
+dedup_dataset.py – compaction du dataset par symétries du carré
+──────────────────────────────────────────────────────────────
+Chaque grille est ramenée à sa forme canonique (plus petite clé uint64 parmi
+les 8 symétries) et son label est transformé avec elle (ex. miroir gauche/
+droite : left ↔ right).  Les lignes (clé, coup) identiques sont fusionnées en
+une ligne pondérée (group-by par hachage), écrite en shard binaire :
+
+    python dedup_dataset.py data.csv --out data_dedup.npy
+    python train_hgbc.py --stream --data data_dedup.npy      # sample_weight = weight
+"""
+from __future__ import annotations
+import argparse, time
+import numpy as np
+import pandas as pd
+
+import shards
+from shards import MOVES
+
+_SHIFTS = np.arange(0, 64, 4, dtype=np.uint64)
+_VEC    = {"up": (-1, 0), "down": (1, 0), "left": (0, -1), "right": (0, 1)}
+
+# (r, c) → (r', c') pour les 8 symétries du carré 4×4
+_SYM_FUNCS = [
+    lambda r, c: (r, c),            # identité
+    lambda r, c: (r, 3 - c),        # miroir gauche/droite
+    lambda r, c: (3 - r, c),        # miroir haut/bas
+    lambda r, c: (3 - r, 3 - c),    # rotation 180°
+    lambda r, c: (c, r),            # transposée
+    lambda r, c: (3 - c, 3 - r),    # anti-transposée
+    lambda r, c: (c, 3 - r),        # rotation 90° horaire
+    lambda r, c: (3 - c, r),        # rotation 90° anti-horaire
+]
+
+
+def _tables():
+    dest = np.empty((8, 16), dtype=np.intp)       # case p → case dest[s, p]
+    move = np.empty((8, 4), dtype=np.uint8)       # coup m → coup move[s, m]
+    for s, f in enumerate(_SYM_FUNCS):
+        for p in range(16):
+            r, c = f(p // 4, p % 4)
+            dest[s, p] = 4 * r + c
+        for m, name in enumerate(MOVES):
+            (r0, c0), (r1, c1) = f(1, 1), f(1 + _VEC[name][0], 1 + _VEC[name][1])
+            move[s, m] = MOVES.index(next(k for k, v in _VEC.items()
+                                          if v == (r1 - r0, c1 - c0)))
+    return dest, move
+
+SYM_DEST, SYM_MOVE = _tables()
+
+
+def _nibbles(raws: np.ndarray) -> np.ndarray:
+    return ((np.asarray(raws, dtype=np.uint64)[:, None] >> _SHIFTS)
+            & np.uint64(0xF)).astype(np.uint64)
+
+
+def _apply(nib: np.ndarray, s: int) -> np.ndarray:
+    out = np.empty_like(nib)
+    out[:, SYM_DEST[s]] = nib
+    return np.bitwise_or.reduce(out << _SHIFTS, axis=1)
+
+
+def transform(raws: np.ndarray, s: int) -> np.ndarray:
+    """Applique la symétrie *s* à des grilles uint64[n]."""
+    return _apply(_nibbles(raws), s)
+
+
+def canonicalize(raws: np.ndarray, moves: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """(grilles, coups) → (forme canonique, coup transformé en conséquence)."""
+    nib  = _nibbles(raws)
+    keys = np.stack([_apply(nib, s) for s in range(8)])      # (8, n)
+    best = keys.argmin(axis=0)
+    cols = np.arange(len(best))
+    return keys[best, cols], SYM_MOVE[best, np.asarray(moves, dtype=np.intp)]
+
+
+def boards_from_features(X: np.ndarray) -> np.ndarray:
+    """Features MoveNet (n, 17) → grilles uint64 (c0…c15 = valeurs de tuiles)."""
+    tiles = np.asarray(X)[:, 1:].astype(np.uint32)
+    exp   = np.where(tiles == 0, 0, np.log2(np.maximum(tiles, 1))).astype(np.uint64)
+    return np.bitwise_or.reduce(exp << _SHIFTS, axis=1)
+
+
+def _group(df: pd.DataFrame) -> pd.DataFrame:
+    return df.groupby(["key", "move"], sort=False, as_index=False)["weight"].sum()
+
+
+def dedup(path: str, chunk_rows: int = 1_000_000) -> tuple[np.ndarray, int]:
+    """Source (CSV / Parquet / shards) → (enregistrements dédoublonnés, lignes lues)."""
+    from train_hgbc import iter_chunks
+    acc, n_in = None, 0
+    for X, y, w in iter_chunks(path, chunk_rows):
+        key, mv = canonicalize(boards_from_features(X), y)
+        part = _group(pd.DataFrame({"key": key, "move": mv,
+                                    "weight": w.astype(np.uint64)}))
+        acc = part if acc is None else _group(pd.concat([acc, part], ignore_index=True))
+        n_in += len(y)
+        print(f"   … {n_in:,} lignes → {len(acc):,} uniques", flush=True)
+
+    rec = shards.empty_records(0 if acc is None else len(acc))
+    if acc is not None:
+        rec["board"]  = acc["key"].to_numpy(np.uint64)
+        rec["move"]   = acc["move"].to_numpy(np.uint8)
+        rec["weight"] = acc["weight"].to_numpy(np.uint32)
+    return rec, n_in
+
+
+if __name__ == "__main__":
+    pa = argparse.ArgumentParser()
+    pa.add_argument("data", help="CSV, Parquet, shard .npy ou dossier de shards")
+    pa.add_argument("--out", required=True, help="shard .npy de sortie")
+    pa.add_argument("--chunk-rows", type=int, default=1_000_000)
+    args = pa.parse_args()
+
+    t0 = time.time()
+    rec, n_in = dedup(args.data, args.chunk_rows)
+    shards.write_shard(args.out, rec)
+    print(f"✅ {n_in:,} → {len(rec):,} lignes (×{n_in / max(len(rec), 1):.1f}) "
+          f"en {time.time() - t0:.1f}s → {args.out}")
@@ -0,0 +1,516 @@
+"""
+distributed.py – self-play réparti sur plusieurs machines (coordinateur TCP)
+──────────────────────────────────────────────────────────────
+Le coordinateur distribue des lots de parties (graines + configuration du
+moteur) ; les workers, sur n'importe quelle machine, les jouent avec
+interface_jeu_pygame._play_game et renvoient des enregistrements compacts
+(shards.SHARD_DTYPE en .npy base64) et les résumés de metrics.py.  Le
+coordinateur les agrège dans un dossier de shards reprenable (ShardWriter)
+et dans les instantanés Metrics.
+
+    python distributed.py coordinator --listen 0.0.0.0:8770 --games 100000 --shards data/
+    python distributed.py worker --connect coord:8770 --procs 8      # sur chaque machine
+    python distributed.py local --games 64 --procs 4 --shards data/  # tout en local
+
+Protocole (une ligne JSON par message, comme move_server.py) :
+    → {"op": "ready", "worker": "hôte:pid"}
+    ← {"op": "batch", "id": 12, "seeds": [...], "config": {...}, "shard": true}
+      | {"op": "wait", "s": 0.5}  | {"op": "done"}
+    → {"op": "alive", "id": 12}   (pendant le lot, toutes les lease/3 s ; sans réponse)
+    → {"op": "result", "id": 12, "games": [résumés], "rows": [...], "rec": "<b64>"}
+      | {"op": "error", "id": 12, "error": "Type: message"}
+      (chaque résultat ou erreur vaut demande du lot suivant)
+
+Pannes : un lot est prêté à une connexion.  Si elle tombe, si le worker renvoie
+une erreur, ou si le lot reste *lease_s* secondes sans nouvelle (ni résultat ni
+« alive »), il repart dans la file pour un autre worker ; le premier résultat
+gagne, un doublon tardif est ignoré.  Au-delà de *max_retries* échecs d'un même
+lot, le run s'arrête avec le dernier motif.  Un arrêt du coordinateur perd au
+plus les parties non validées (cf. ShardWriter).
+Pas d'authentification : réseau de confiance uniquement.
+"""
+from __future__ import annotations
+import argparse, asyncio, base64, io, itertools, json, os, random, socket, threading, time
+import multiprocessing as mp
+from collections import deque
+
+import numpy as np
+
+import shards
+from metrics import Metrics
+
+# ─────────────────────── paramètres (modifiables) ──────────────────────────
+DEFAULT_ADDR = "127.0.0.1:8770"
+BATCH_GAMES  = 16         # parties par lot
+LEASE_S      = 600.0      # délai sans nouvelle avant réattribution d'un lot
+MAX_RETRIES  = 3          # échecs tolérés par lot avant d'abandonner le run
+WAIT_S       = 0.5        # pause conseillée quand tout est prêté
+LINE_LIMIT   = 256 << 20  # taille max d'une ligne (lot de shards en base64)
+
+
+def _split_addr(address: str) -> tuple[str, int]:
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def check_config(cfg: dict) -> dict:
+    """Configuration moteur distribuable : depth / time entiers ≥ 0, moteur connu."""
+    import engines
+    for k in ("depth", "time"):
+        if k not in cfg:
+            raise ValueError(f"configuration sans « {k} » : {cfg}")
+        if not isinstance(cfg[k], int) or cfg[k] < 0:
+            raise ValueError(f"« {k} » doit être un entier ≥ 0 : {cfg[k]!r}")
+    name = cfg.get("engine", "bepp")
+    if name not in engines.REGISTRY:
+        raise ValueError(f"moteur inconnu {name!r} (connus : {', '.join(engines.REGISTRY)})")
+    return cfg
+
+
+def pack_records(rec: np.ndarray) -> str:
+    buf = io.BytesIO()
+    np.save(buf, np.asarray(rec, dtype=shards.SHARD_DTYPE), allow_pickle=False)
+    return base64.b64encode(buf.getvalue()).decode()
+
+
+def unpack_records(data: str) -> np.ndarray:
+    rec = np.load(io.BytesIO(base64.b64decode(data)), allow_pickle=False)
+    if rec.dtype != shards.SHARD_DTYPE:
+        raise ValueError(f"dtype {rec.dtype} ≠ SHARD_DTYPE")
+    return rec
+
+
+# ───────────────────────────── coordinateur ────────────────────────────────
+class Coordinator:
+    """
+    Distribue *n_games* parties par lots de *batch_games*.  Avec *shard_dir*,
+    les parties déjà validées dans le dossier sont décomptées (reprise) et les
+    graines viennent du compteur du manifeste.  *config* est vérifiée par
+    check_config (ValueError).
+    """
+
+    def __init__(self, n_games: int, config: dict, *, batch_games: int = BATCH_GAMES,
+                 shard_dir: str | None = None, shard_games: int = 256,
+                 lease_s: float = LEASE_S, max_retries: int = MAX_RETRIES,
+                 seed: int | None = None,
+                 metrics_path: str | None = None, metrics_every: float = 30.0):
+        self.config, self.batch_games, self.lease_s = check_config(config), batch_games, lease_s
+        self.max_retries = max_retries
+        self.writer = shards.ShardWriter(shard_dir, shard_games, seed) if shard_dir else None
+        self.todo = max(0, n_games - (self.writer.games if self.writer else 0))
+        self._seed = random.getrandbits(63) if seed is None else int(seed)
+        self.metrics = Metrics(metrics_path, metrics_every, label="DIST")
+        self.batches: dict[int, list[int]] = {}
+        self.pending: deque[int] = deque()
+        self.leased: dict[int, tuple[int, float]] = {}   # lot → (connexion, échéance)
+        self.done: set[int] = set()
+        self.failures: dict[int, int] = {}               # lot → échecs
+        self.error: str | None = None                    # motif d'abandon du run
+        self.created = self.games = self.nodes = self.reassigned = self.duplicates = 0
+        self.workers: dict[int, str] = {}
+        self._cids = itertools.count(1)
+        self.finished: asyncio.Event | None = None
+        self.server: asyncio.AbstractServer | None = None
+
+    # ---------------------------------------------------------------- lots
+    def _new_batch(self) -> int | None:
+        left = self.todo - self.created
+        if left <= 0:
+            return None
+        n = min(self.batch_games, left)
+        if self.writer:
+            seeds = self.writer.reserve_seeds(n)
+        else:
+            seeds = [(self._seed + self.created + i) & (2**64 - 1) for i in range(n)]
+        bid = len(self.batches)
+        self.batches[bid] = seeds
+        self.created += n
+        return bid
+
+    def _lease(self, cid: int) -> dict:
+        if self.error:
+            return {"op": "done"}
+        while self.pending and self.pending[0] in self.done:
+            self.pending.popleft()
+        bid = self.pending.popleft() if self.pending else self._new_batch()
+        if bid is None:
+            if self.leased:
+                return {"op": "wait", "s": WAIT_S}
+            return {"op": "done"}
+        self.leased[bid] = (cid, time.monotonic() + self.lease_s)
+        return {"op": "batch", "id": bid, "seeds": self.batches[bid],
+                "config": self.config, "shard": self.writer is not None,
+                "lease": self.lease_s}
+
+    def _renew(self, cid: int, bid: int) -> None:
+        """« alive » : le worker joue encore le lot, l'échéance repart."""
+        if self.leased.get(bid, (None,))[0] == cid:
+            self.leased[bid] = (cid, time.monotonic() + self.lease_s)
+
+    def _requeue(self, bid: int, why: str) -> None:
+        self.leased.pop(bid, None)
+        if bid in self.done:
+            return
+        n = self.failures[bid] = self.failures.get(bid, 0) + 1
+        print(f"[DIST] lot {bid} : {why} (échec {n})", flush=True)
+        if n > self.max_retries:
+            self.abort(f"lot {bid} abandonné après {n} échecs, dernier : {why}")
+            return
+        self.pending.appendleft(bid)
+        self.reassigned += 1
+
+    def _release(self, cid: int) -> None:
+        """Connexion perdue : ses lots repartent en tête de file."""
+        for bid in [b for b, (c, _) in self.leased.items() if c == cid]:
+            self._requeue(bid, f"connexion de {self.workers.get(cid, cid)} perdue")
+
+    def abort(self, reason: str) -> None:
+        """Arrête le run (à appeler dans la boucle asyncio) : run() rend le motif."""
+        if self.finished.is_set():
+            return                                # déjà fini : rien à interrompre
+        self.error = reason
+        self.finished.set()
+
+    def _accept(self, msg: dict) -> None:
+        bid = int(msg["id"])
+        if bid in self.done or bid not in self.batches:
+            self.duplicates += 1                  # déjà rendu par un autre worker
+            return
+        games = msg["games"]
+        if self.writer:
+            rec = unpack_records(msg["rec"])
+            bounds = np.cumsum(msg["rows"])[:-1]
+            for part in np.split(rec, bounds):
+                self.writer.add_game(part)
+        for res in games:
+            self.nodes += res.get("nodes", 0)
+            self.metrics.add(res)
+        self.metrics.maybe_write()
+        self.done.add(bid)
+        self.leased.pop(bid, None)
+        self.games += len(games)
+        if self.games >= self.todo:
+            self.finished.set()
+
+    async def _expire(self) -> None:
+        while True:
+            await asyncio.sleep(min(1.0, self.lease_s / 4))
+            now = time.monotonic()
+            for bid in [b for b, (_, t) in self.leased.items() if t < now]:
+                self._requeue(bid, f"aucune nouvelle depuis {self.lease_s:g}s")
+
+    # ------------------------------------------------------------- réseau
+    async def _client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        cid = next(self._cids)
+        try:
+            while line := await reader.readline():
+                msg = json.loads(line)
+                op = msg.get("op")
+                if op == "alive":
+                    self._renew(cid, int(msg["id"]))
+                    continue                          # pas de réponse
+                if op == "result":
+                    self._accept(msg)
+                elif op == "error":
+                    self._requeue(int(msg["id"]), f"{self.workers.get(cid, cid)} : "
+                                                  f"{msg.get('error', '?')}")
+                else:
+                    self.workers[cid] = msg.get("worker", "?")
+                writer.write(json.dumps(self._lease(cid)).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, ValueError, KeyError) as e:
+            print(f"[DIST] worker {self.workers.get(cid, cid)} : {type(e).__name__}: {e}",
+                  flush=True)
+        finally:
+            self._release(cid)
+            self.workers.pop(cid, None)
+            writer.close()
+
+    async def start(self, address: str = DEFAULT_ADDR) -> str:
+        """Ouvre la socket → adresse effective (port 0 = port libre)."""
+        self.finished = asyncio.Event()
+        if self.todo == 0:
+            self.finished.set()
+        host, port = _split_addr(address)
+        self.server = await asyncio.start_server(self._client, host, port, limit=LINE_LIMIT)
+        host, port = self.server.sockets[0].getsockname()[:2]
+        return f"{host}:{port}"
+
+    async def run(self) -> dict:
+        """Attend la fin de toutes les parties, valide les shards → bilan."""
+        expire = asyncio.create_task(self._expire())
+        await self.finished.wait()
+        expire.cancel()
+        # les workers encore connectés reçoivent « done » à leur prochaine demande
+        self.server.close()
+        for _ in range(40):
+            if not self.workers:
+                break
+            await asyncio.sleep(0.05)
+        if self.writer:
+            self.writer.close()
+        snap = self.metrics.flush()
+        return {"games": self.games, "nodes": self.nodes, "batches": len(self.done),
+                "reassigned": self.reassigned, "duplicates": self.duplicates,
+                "error": self.error, "metrics": snap}
+
+
+def serve_in_thread(coord: Coordinator, address: str = "127.0.0.1:0") -> tuple[str, dict]:
+    """
+    Coordinateur dans un thread démon → (adresse, dict rempli avec le bilan à
+    la fin).  out["loop"] sert à appeler coord.abort depuis un autre thread.
+    """
+    ready, out = threading.Event(), {}
+
+    def main():
+        async def go():
+            out["loop"] = asyncio.get_running_loop()
+            out["addr"] = await coord.start(address)
+            ready.set()
+            out["summary"] = await coord.run()
+        asyncio.run(go())
+
+    out["thread"] = threading.Thread(target=main, daemon=True)
+    out["thread"].start()
+    ready.wait()
+    return out["addr"], out
+
+
+# ──────────────────────────────── worker ───────────────────────────────────
+_CONFIGURED: dict[str, object] = {}
+
+def _engine(cfg: dict):
+    """Moteur de *cfg* (engines.REGISTRY) avec ses réglages BEPP / MCTS."""
+    key = json.dumps(cfg, sort_keys=True)
+    if key not in _CONFIGURED:
+        import engines
+        engines.configure("search.expectimax", "set_bepp_params",
+                          prob_cutoff=cfg.get("prob", 1e-3), beam_k=cfg.get("beam", 2),
+                          sparse_empties=cfg.get("sparse", 0), sparse_k=cfg.get("sparse_k", 6))
+        engines.configure("search.mcts", "set_mcts_params", threads=cfg.get("threads", 1))
+        _CONFIGURED.clear()
+        _CONFIGURED[key] = engines.get(cfg.get("engine", "bepp"))
+    return _CONFIGURED[key]
+
+
+def _connect(address: str, retry_s: float):
+    """Connexion au coordinateur, réessayée pendant *retry_s* secondes."""
+    deadline = time.monotonic() + retry_s
+    while True:
+        try:
+            sock = socket.create_connection(_split_addr(address))
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            return sock.makefile("rwb")
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.5)
+
+
+def _play_batch(msg: dict) -> dict:
+    """Joue un lot → message « result » (sans id ni worker)."""
+    from interface_jeu_pygame import _play_game
+    cfg = msg["config"]
+    engine = _engine(cfg)
+    results = [_play_game(cfg["depth"], cfg["time"], engine, None, None, s, msg["shard"])
+               for s in msg["seeds"]]
+    out = {"op": "result"}
+    if msg["shard"]:
+        recs = [r.pop("rec") for r in results]
+        out["rows"] = [len(r) for r in recs]
+        out["rec"] = pack_records(np.concatenate(recs))
+    out["games"] = results
+    return out
+
+
+def _keep_alive(post, bid: int, every: float, stop: threading.Event) -> None:
+    """Thread : « alive » toutes les *every* s tant que le lot *bid* tourne."""
+    while not stop.wait(every):
+        try:
+            post({"op": "alive", "id": bid})
+        except OSError:
+            return
+
+
+def run_worker(address: str = DEFAULT_ADDR, retry_s: float = 30.0) -> int:
+    """
+    Joue les lots du coordinateur jusqu'à « done » → nombre de parties jouées.
+    Un lot qui lève une exception est signalé (« error ») au lieu d'arrêter
+    le worker.
+    """
+    io_ = _connect(address, retry_s)
+    name = f"{socket.gethostname()}:{os.getpid()}"
+    lock = threading.Lock()                 # écritures : boucle + thread alive
+
+    def post(msg: dict) -> None:
+        with lock:
+            io_.write(json.dumps(msg).encode() + b"\n")
+            io_.flush()
+
+    def send(msg: dict) -> dict:
+        post(msg)
+        line = io_.readline()
+        if not line:
+            raise ConnectionError("coordinateur déconnecté")
+        return json.loads(line)
+
+    played = 0
+    msg = send({"op": "ready", "worker": name})
+    try:
+        while msg["op"] != "done":
+            if msg["op"] == "wait":
+                time.sleep(msg["s"])
+                msg = send({"op": "ready", "worker": name})
+                continue
+            stop = threading.Event()
+            alive = threading.Thread(target=_keep_alive, daemon=True,
+                                     args=(post, msg["id"], msg.get("lease", LEASE_S) / 3, stop))
+            alive.start()
+            try:
+                out = _play_batch(msg)
+                played += len(out["games"])
+            except Exception as e:
+                print(f"[worker {os.getpid()}] lot {msg['id']} : {type(e).__name__}: {e}",
+                      flush=True)
+                out = {"op": "error", "error": f"{type(e).__name__}: {e}"}
+            finally:
+                stop.set()
+                alive.join()
+            out.update(id=msg["id"], worker=name)
+            msg = send(out)
+    finally:
+        io_.close()
+    return played
+
+
+def _worker_main(address: str, retry_s: float) -> None:
+    try:
+        n = run_worker(address, retry_s)
+        print(f"[worker {os.getpid()}] {n} parties", flush=True)
+    except ConnectionError as e:
+        print(f"[worker {os.getpid()}] arrêt : {e}", flush=True)
+
+
+def start_workers(address: str, procs: int, retry_s: float = 30.0) -> list[mp.Process]:
+    """*procs* processus worker (contexte spawn : sûr avec le thread du coordinateur)."""
+    ctx = mp.get_context("spawn")
+    ps = [ctx.Process(target=_worker_main, args=(address, retry_s), daemon=True)
+          for _ in range(procs)]
+    for p in ps:
+        p.start()
+    return ps
+
+
+# ───────────────────────────────── CLI ─────────────────────────────────────
+def config_from_args(args) -> dict:
+    """
+    Configuration moteur : valeurs CLI, écrasées par le preset (comme l'UI),
+    vérifiée par check_config (ValueError).
+    """
+    from interface_jeu_pygame import PRESETS, load_presets
+    presets = dict(PRESETS)
+    if args.preset_file:
+        presets.update(load_presets(args.preset_file))
+    if args.preset not in presets:
+        raise ValueError(f"preset inconnu {args.preset!r} (connus : {', '.join(presets)})")
+    cfg = {"engine": "bepp", "depth": args.depth, "time": args.time, "beam": args.beam,
+           "prob": args.prob, "sparse": args.sparse, "sparse_k": args.sparse_k,
+           "threads": args.threads}
+    cfg.update(presets[args.preset])
+    return check_config(cfg)
+
+
+def _print_summary(s: dict, dt: float) -> None:
+    if s["error"]:
+        print(f"❌ run interrompu : {s['error']}")
+    snap = s["metrics"]
+    print(f"{'⚠️' if s['error'] else '✅'} {s['games']:,} parties en {dt:.1f}s ({s['games'] / max(dt, 1e-9):,.2f} parties/s) · "
+          f"{s['batches']} lots, {s['reassigned']} réattribué(s), {s['duplicates']} doublon(s)")
+    print(f"Moy {snap['score']['mean']:.1f}  Méd ≈{snap['score']['p50']}  "
+          f"Max {snap['score']['max']}  Tuiles max {snap['max_tile']}")
+    if s["nodes"]:
+        print(f"Nœuds BEPP : {s['nodes'] / max(s['games'], 1):,.0f} par partie, "
+              f"{s['nodes'] / max(snap['moves'], 1):,.0f} par coup")
+
+
+if __name__ == "__main__":
+    pa = argparse.ArgumentParser()
+    pa.add_argument("mode", choices=["coordinator", "worker", "local"])
+    pa.add_argument("--listen", default=DEFAULT_ADDR, help="coordinateur : hôte:port")
+    pa.add_argument("--connect", default=DEFAULT_ADDR, help="worker : hôte:port du coordinateur")
+    pa.add_argument("--procs", type=int, default=max(1, mp.cpu_count() // 2),
+                    help="processus worker (worker / local)")
+    pa.add_argument("--retry", type=float, default=30.0,
+                    help="worker : secondes de tentatives de connexion")
+    pa.add_argument("--games", type=int, default=1000,
+                    help="parties au total (avec --shards : y compris celles déjà présentes)")
+    pa.add_argument("--batch", type=int, default=BATCH_GAMES, help="parties par lot")
+    pa.add_argument("--lease", type=float, default=LEASE_S,
+                    help="secondes sans nouvelle d'un worker avant réattribution de son lot")
+    pa.add_argument("--retries", type=int, default=MAX_RETRIES,
+                    help="échecs tolérés par lot avant d'arrêter le run")
+    pa.add_argument("--seed", type=int, help="graine de départ (nouveau dossier / bench)")
+    pa.add_argument("--shards", metavar="DIR", help="parties → shards + manifest.json")
+    pa.add_argument("--shard-games", type=int, default=256)
+    pa.add_argument("--metrics", help="instantanés JSONL")
+    pa.add_argument("--metrics-every", type=float, default=30.0)
+    pa.add_argument("--preset", default="default")
+    pa.add_argument("--preset-file")
+    pa.add_argument("--depth", type=int, default=3)
+    pa.add_argument("--time", type=int, default=60)
+    pa.add_argument("--beam", type=int, default=2)
+    pa.add_argument("--prob", type=float, default=1e-3)
+    pa.add_argument("--sparse", type=int, default=0)
+    pa.add_argument("--sparse-k", type=int, default=6)
+    pa.add_argument("--threads", type=int, default=1)
+    args = pa.parse_args()
+
+    if args.mode == "worker":
+        ps = start_workers(args.connect, args.procs, args.retry)
+        for p in ps:
+            p.join()
+        raise SystemExit
+
+    try:
+        cfg = config_from_args(args)
+        coord = Coordinator(args.games, cfg, batch_games=args.batch, shard_dir=args.shards,
+                            shard_games=args.shard_games, lease_s=args.lease,
+                            max_retries=args.retries, seed=args.seed,
+                            metrics_path=args.metrics, metrics_every=args.metrics_every)
+    except ValueError as e:
+        pa.error(str(e))
+    t0 = time.perf_counter()
+    if args.mode == "local":
+        addr, out = serve_in_thread(coord, "127.0.0.1:0")
+        print(f"🚀 coordinateur {addr} · {coord.todo:,} parties · {args.procs} workers · {cfg}",
+              flush=True)
+        ps = start_workers(addr, args.procs, args.retry)
+        while out["thread"].is_alive():
+            out["thread"].join(1.0)
+            if out["thread"].is_alive() and not any(p.is_alive() for p in ps):
+                # plus personne pour jouer : sans ça le coordinateur attendrait toujours
+                out["loop"].call_soon_threadsafe(
+                    coord.abort, "tous les workers locaux se sont arrêtés")
+                out["thread"].join()
+        for p in ps:
+            p.join(timeout=10)
+        summary = out["summary"]
+        _print_summary(summary, time.perf_counter() - t0)
+        if summary["error"]:
+            raise SystemExit(1)
+    else:
+        async def main():
+            addr = await coord.start(args.listen)
+            print(f"🚀 coordinateur {addr} · {coord.todo:,} parties à distribuer · {cfg}",
+                  flush=True)
+            return await coord.run()
+        try:
+            summary = asyncio.run(main())
+        except KeyboardInterrupt:
+            if coord.writer:
+                coord.writer.close()
+            print("Arrêt demandé (parties validées conservées).")
+            raise SystemExit
+        _print_summary(summary, time.perf_counter() - t0)
+        if summary["error"]:
+            raise SystemExit(1)
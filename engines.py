@@ -0,0 +1,142 @@
+"""
+engines.py – registre paresseux des moteurs de jeu
+──────────────────────────────────────────────────────────────
+Un moteur n'est importé, et ses noyaux Numba préchauffés, que lorsqu'il est
+choisi : un --bench BEPP ne charge ni MCTS ni le roll-out JIT, et MoveNet
+(joblib / sklearn) n'est chargé que pour le moteur « ia ».
+
+    fn = engines.get("mcts")            # import + préchauffage, une seule fois
+    engines.is_search(fn)               # appelé avec (board, depth, ms) ?
+    engines.configure("search.mcts", "set_mcts_params", threads=4)
+
+    python engines.py --profile [MODULE]   # import / JIT par module, processus neuf
+"""
+from __future__ import annotations
+import argparse, importlib, subprocess, sys, time
+from typing import Callable, NamedTuple
+
+import kernels
+
+
+class Engine(NamedTuple):
+    module: str
+    attr: str
+    kernels: tuple[str, ...] = ()     # modules de kernels.KERNELS à préchauffer
+    search: bool = True               # appelé avec (board, depth, ms), sinon (board)
+
+
+BASE_KERNELS = ("board",)             # Board hors AOT : toujours utilisés
+
+REGISTRY: dict[str, Engine] = {
+    "bepp":     Engine("search.expectimax", "best_move"),
+    "rollout":  Engine("search.fast_expectimax", "fast_best_move",
+                       ("search.fast_expectimax",), search=False),
+    "mcts":     Engine("search.mcts", "mcts_best_move", ("search.mcts",)),
+    "adaptive": Engine("search.adaptive", "adaptive_best_move"),
+    "afterstate": Engine("search.afterstate", "afterstate_best_move"),
+}
+
+_LOADED: dict[str, Callable] = {}
+_PENDING: list[tuple[str, str, dict]] = []     # réglages en attente d'import
+PROFILE: dict[str, dict] = {}                  # moteur → {"import_ms", "jit"}
+
+
+# ────────────────────────────── chargement ─────────────────────────────────
+def configure(module: str, setter: str, **params) -> None:
+    """Appelle module.setter(**params) dès que *module* est importé (tout de suite s'il l'est)."""
+    _PENDING.append((module, setter, params))
+    _apply_pending()
+
+
+def _apply_pending() -> None:
+    for item in list(_PENDING):
+        module, setter, params = item
+        if module in sys.modules:
+            getattr(sys.modules[module], setter)(**params)
+            _PENDING.remove(item)
+
+
+def get(name: str) -> Callable:
+    """Fonction du moteur *name* : importée et préchauffée au premier appel."""
+    fn = _LOADED.get(name)
+    if fn is None:
+        e = REGISTRY[name]
+        t0 = time.perf_counter()
+        fn = getattr(importlib.import_module(e.module), e.attr)
+        t1 = time.perf_counter()
+        _apply_pending()
+        jit = kernels.warmup(BASE_KERNELS + e.kernels)
+        PROFILE[name] = {"import_ms": (t1 - t0) * 1000, "jit": jit}
+        _LOADED[name] = fn
+    return fn
+
+
+def kernels_for(engine) -> tuple[str, ...]:
+    """Modules de noyaux à préchauffer dans un worker qui joue avec *engine*."""
+    key = (getattr(engine, "__module__", None), getattr(engine, "__name__", None))
+    for e in REGISTRY.values():
+        if (e.module, e.attr) == key:
+            return BASE_KERNELS + e.kernels
+    return BASE_KERNELS
+
+
+def is_search(engine) -> bool:
+    """Moteurs de recherche (et RemoteEngine) : appelés avec (board, depth, ms)."""
+    if getattr(engine, "search_args", False):
+        return True
+    key = (getattr(engine, "__module__", None), getattr(engine, "__name__", None))
+    return any(e.search and (e.module, e.attr) == key for e in REGISTRY.values())
+
+
+# ─────────────────────────── profil de démarrage ───────────────────────────
+def import_profile(module: str = "interface_jeu_pygame") -> list[tuple[str, float]]:
+    """
+    `python -X importtime -c "import <module>"` dans un processus neuf →
+    [(paquet, ms)] triés : temps propre des imports, cumulé par paquet racine.
+    """
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                         cwd=kernels.ROOT, capture_output=True, text=True, check=True)
+    per_pkg: dict[str, float] = {}
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        pkg = name.strip().split(".")[0]
+        per_pkg[pkg] = per_pkg.get(pkg, 0.0) + int(self_us) / 1000
+    return sorted(per_pkg.items(), key=lambda kv: -kv[1])
+
+
+def format_profile(imports: list[tuple[str, float]] | None = None, top: int = 10) -> str:
+    lines = []
+    if imports is not None:
+        total = sum(ms for _, ms in imports)
+        lines.append(f"⏱️  Imports (processus neuf) : {total:,.0f} ms")
+        for pkg, ms in imports[:top]:
+            lines.append(f"   {pkg:<28} {ms:8.1f} ms")
+        rest = sum(ms for _, ms in imports[top:])
+        lines.append(f"   {'(autres)':<28} {rest:8.1f} ms")
+    for name, p in PROFILE.items():
+        jit_ms = sum(ms for ms, _, _ in p["jit"].values())
+        lines.append(f"⚙️  Moteur {name:<10} import {p['import_ms']:7.1f} ms · "
+                     f"noyaux {jit_ms:7.1f} ms")
+        per_mod: dict[str, float] = {}
+        for k, (ms, _, _) in p["jit"].items():
+            mod = k.rsplit(".", 1)[0]
+            per_mod[mod] = per_mod.get(mod, 0.0) + ms
+        for mod, ms in per_mod.items():
+            if ms >= 0.05:
+                lines.append(f"   {mod:<28} {ms:8.1f} ms")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    pa = argparse.ArgumentParser()
+    pa.add_argument("--profile", nargs="?", const="interface_jeu_pygame", metavar="MODULE",
+                    help="temps d'import par paquet d'un module, dans un processus neuf")
+    pa.add_argument("--engine", action="append", choices=list(REGISTRY),
+                    help="charge ces moteurs et affiche import / préchauffage")
+    args = pa.parse_args()
+
+    for name in args.engine or ():
+        get(name)
+    print(format_profile(import_profile(args.profile) if args.profile else None))
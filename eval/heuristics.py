@@ -1,6 +1,7 @@
 # eval/heuristics.py
 from board import Board
 import math
+import numpy as np
 
 # ────────────────────────────────────────────────────────────────
 def basic_eval(board: Board) -> float:
@@ -33,3 +34,17 @@ def bounded_eval(board: Board) -> float:
     max_ratio = max_tile_exp / 16.0          # 16 → tuile 65 536
 
     return 0.6 * empty_ratio + 0.4 * max_ratio
+
+
+# ────────────────────────────────────────────────────────────────
+_SHIFTS = np.arange(0, 64, 4, dtype=np.uint64)
+
+def bounded_eval_batch(raws: np.ndarray) -> np.ndarray:
+    """
+    Version vectorisée de bounded_eval : uint64[n] → float64[n].
+    Sert d'évaluateur par lot pour search/batched_expectimax.py.
+    """
+    nib = (np.asarray(raws, dtype=np.uint64)[:, None] >> _SHIFTS) & np.uint64(0xF)
+    empty_ratio = (nib == 0).sum(axis=1) / 16.0
+    max_ratio   = nib.max(axis=1).astype(np.float64) / 16.0
+    return 0.6 * empty_ratio + 0.4 * max_ratio
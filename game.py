@@ -1,24 +1,29 @@
 # game.py
-from board import Board
+import random
+from board import Board, _DIR_ID
 
 class Game:
     WIN_TILE = 2048
+    WIN_EXP  = 11                        # log2(WIN_TILE)
 
-    def __init__(self):
-        self.board = Board()
+    def __init__(self, seed: int | None = None):
+        # graine + coups joués suffisent à rejouer la partie (voir replay.py)
+        self.seed  = random.getrandbits(64) if seed is None else int(seed)
+        self.board = Board(self.seed)
+        self.moves = bytearray()         # ids 0← 1→ 2↑ 3↓ des coups valides
         self.score = 0
         self.over  = False
         self.won   = False
 
     def move(self, dir_str: str) -> tuple[bool, int]:
-        moved, gained = self.board.move(dir_str)
+        # un seul passage Python → Numba par coup (board.game_step)
+        dir_id = _DIR_ID[dir_str]
+        moved, gained, won, over = self.board.step(dir_id, self.WIN_EXP)
         if moved:
+            self.moves.append(dir_id)
             self.score += gained
-            if self.board.max_tile() >= self.WIN_TILE:
-                self.won  = True
-                self.over = True
-            elif not self.board.can_move():
-                self.over = True
+            self.won  = won
+            self.over = over
         return moved, gained
 
     # raccourcis
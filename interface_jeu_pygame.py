@@ -5,18 +5,50 @@ interface_jeu_pygame.py
                       (MoveNet par défaut)
 • --movenet <path>   → chemin modèle .joblib alternatif
 • --headless         → aucun rendu graphique (BG/bench only)
-• Presets turbo / rollout (voir README)
+• --auto mcts        → MCTS anytime (budget --time, --threads)
+• --auto adaptive    → BEPP, profondeur / budget selon le danger de la grille
+• --auto afterstate  → BEPP sur après-états (mêmes coups, ~4× plus rapide)
+• --server ADDR      → coups demandés à move_server.py (modèle partagé)
+• --profile-startup  → temps d'import / de préchauffage par module
+• Presets turbo / rollout / mcts (voir README)
+
+Les moteurs sont chargés à la demande (engines.py) : seul celui choisi est
+importé et préchauffé.
 """
 
 from __future__ import annotations
-import argparse, csv, uuid, threading, time, multiprocessing as mp, os, sys
+import argparse, csv, json, uuid, threading, time, multiprocessing as mp, os, sys
 from typing import Optional, Literal
 
 from game import Game
-from search import expectimax
-from search.expectimax import best_move as bepp_best_move
-from search.fast_expectimax import fast_best_move
-from eval.heuristics import bounded_eval
+from replay import append_game
+import shards
+from metrics import Metrics, QuantileSketch, game_result
+import engines
+import kernels
+
+# moteurs de recherche appelés avec (board, depth, ms) ; les autres avec (board)
+def call_engine(engine, board, depth:int, ms:int) -> str:
+    return engine(board, depth, ms) if engines.is_search(engine) else engine(board)
+
+# ─────────────────────────────── presets ───────────────────────────────
+# valeurs imposées par --preset (les clés absentes gardent la valeur CLI) ;
+# --preset-file ajoute / remplace des presets (fichier de tune_presets.py) ;
+# "engine" : nom dans engines.REGISTRY
+
+PRESETS: dict[str, dict] = {
+    "default": {"engine": "bepp"},
+    "turbo":   {"engine": "bepp", "depth": 2, "time": 40, "beam": 1, "prob": 1e-2,
+                "sparse": 10, "sparse_k": 4},
+    "rollout": {"engine": "rollout", "depth": 3},
+    "mcts":    {"engine": "mcts"},
+    "adaptive": {"engine": "adaptive"},
+    "afterstate": {"engine": "afterstate"},
+}
+
+def load_presets(path: str) -> dict[str, dict]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["presets"]
 
 # ─────────────────────────── MoveNet loader ────────────────────────────
 def load_movenet(path: str | None):
@@ -33,17 +65,24 @@ def load_movenet(path: str | None):
 
 # ─────────────────────────── CSV logger ────────────────────────────────
 class DataLogger:
+    # « board_at » = pre : c0…c15 est la grille avant le coup (format 2).  Les
+    # anciens CSV, sans cette colonne, contiennent la grille après le coup.
     COLS = ["game_id","move_idx","score","max_tile","empty_cnt",
-            "bepp2_move","bepp2_val"] + [f"c{i}" for i in range(16)]
+            "bepp2_move","bepp2_val"] + [f"c{i}" for i in range(16)] + ["board_at"]
 
     def __init__(self, path: Optional[str]):
         self.path = path
         self.lock = threading.Lock()
         if path:
             os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
-            with open(path, "a", newline="") as f:
+            with open(path, "a+", newline="") as f:
                 if not f.tell():
                     csv.writer(f).writerow(self.COLS)
+                    return
+                f.seek(0)
+                if next(csv.reader(f), None) != self.COLS:
+                    raise ValueError(f"{path} : ancien format (grille après le coup), "
+                                     "on n'y ajoute pas de lignes : choisir un autre fichier")
 
     def record(self, *, gid:str, idx:int, raw:int, score:int,
                bepp2_move:str, bepp2_val:float):
@@ -55,53 +94,128 @@ class DataLogger:
         with self.lock, open(self.path,"a",newline="") as f:
             csv.writer(f).writerow(
                 [gid, idx, score, max(cells), empties,
-                 bepp2_move, round(bepp2_val,5)] + cells
+                 bepp2_move, round(bepp2_val,5)] + cells + ["pre"]
             )
 
 # ─────────────────────── IA « headless » (BG / bench) ─────────────────────
-def _play_game(depth:int, ms:int, engine, csv_path:Optional[str]):
+def engine_name(engine) -> str:
+    return getattr(engine, "__name__", type(engine).__name__)
+
+def _bepp_nodes() -> int:
+    """Compteur de nœuds BEPP, les deux cœurs (0 tant qu'aucun n'est chargé)."""
+    return sum(sys.modules[m].search_stats()["nodes"]
+               for m in ("search.expectimax", "search.afterstate") if m in sys.modules)
+
+def _play_game(depth:int, ms:int, engine, csv_path:Optional[str],
+               replay_path:Optional[str]=None, seed:Optional[int]=None,
+               shard:bool=False) -> dict:
+    """
+    Joue une partie → résumé pour metrics.Metrics (score, tuile max, latences).
+    shard=True : les lignes du dataset sont renvoyées sous res["rec"]
+    (enregistrements shards.SHARD_DTYPE) au lieu d'être écrites en CSV.
+    """
     logger = DataLogger(csv_path) if csv_path else None
-    g = Game(); gid = str(uuid.uuid4()); idx = 0
+    rows = [] if shard else None
+    if logger or shard:             # labels BEPP-2 seulement si on enregistre
+        from eval.heuristics import bounded_eval
+        bepp_best_move = engines.get("bepp")
+    g = Game(seed); gid = str(uuid.uuid4()); idx = 0
+    lat, engine_s, t0 = QuantileSketch(), 0.0, time.perf_counter()
+    nodes = 0
     while not g.is_over():
-        mv = engine(g.board, depth, ms) if engine is bepp_best_move \
-             else engine(g.board)
-        bepp2_mv  = bepp_best_move(g.board, depth=2, time_limit_ms=10)
-        bepp2_val = bounded_eval(g.board)
-        if logger:
-            snap = g.board.clone(); snap.move(mv, add_random=False)
-            logger.record(gid=gid, idx=idx, raw=snap.raw, score=g.score,
-                          bepp2_move=bepp2_mv, bepp2_val=bepp2_val)
+        t, n0 = time.perf_counter(), _bepp_nodes()
+        mv = call_engine(engine, g.board, depth, ms)
+        t = time.perf_counter() - t
+        lat.add(1000 * t); engine_s += t
+        nodes += _bepp_nodes() - n0
+        if logger or shard:
+            bepp2_mv  = bepp_best_move(g.board, depth=2, time_limit_ms=10)
+            bepp2_val = bounded_eval(g.board)
+            # grille étiquetée = grille vue par MoveNet (avant le coup : après
+            # le glissement, la direction se lirait sur la grille)
+            if logger:
+                logger.record(gid=gid, idx=idx, raw=g.board.raw, score=g.score,
+                              bepp2_move=bepp2_mv, bepp2_val=bepp2_val)
+            else:
+                rows.append((idx, g.score, g.board.raw, shards.MOVES.index(bepp2_mv),
+                             bepp2_val))
         idx += 1
         g.move(mv)
-    return g.score
-
-def _bench_mp(n, depth, ms, workers, engine):
-    import numpy as np
+    if replay_path:
+        append_game(replay_path, g.seed, g.moves)
+    res = game_result(engine_name(engine), g.score, g.board.max_tile(), idx,
+                      time.perf_counter() - t0, lat, engine_s)
+    res["nodes"] = nodes              # nœuds BEPP visités par le moteur
+    if shard:
+        rec = shards.empty_records(len(rows))
+        rec["game"] = g.seed
+        for name, col in zip(("idx", "score", "board", "move", "val"), zip(*rows)):
+            rec[name] = col
+        res["rec"] = rec
+    return res
+
+def _play_task(args) -> dict:
+    return _play_game(*args)
+
+def _init_worker(kernel_mods:tuple=engines.BASE_KERNELS):
+    """Initialiseur des pools : noyaux du moteur préchauffés."""
+    kernels.warmup(kernel_mods)
+
+def _bench_mp(n, depth, ms, workers, engine, metrics_path=None, metrics_every=30.0):
     workers = max(1, min(workers, n))
-    t0 = time.perf_counter()
-    with mp.Pool(workers) as pool:
-        scores = pool.starmap(_play_game, [(depth, ms, engine, None)]*n)
-    dt = time.perf_counter() - t0
-    scores = np.asarray(scores)
-    print(f"{n/dt:,.1f} parties/s ({workers} proc) – durée {dt:.3f}s")
-    print(f"Moy {scores.mean():.1f}  Méd {float(np.median(scores)):.1f}  "
-          f"Max {scores.max()}  Min {scores.min()}")
-
-def _bg_worker_mp(n_games, depth, ms, csv_path, workers, engine):
+    m = Metrics(metrics_path, metrics_every, label="BENCH")
+    nodes = 0
+    with mp.Pool(workers, _init_worker, (engines.kernels_for(engine),)) as pool:
+        for res in pool.imap_unordered(_play_task, [(depth, ms, engine, None)]*n):
+            nodes += res["nodes"]
+            m.add(res)
+            m.maybe_write()
+    snap = m.flush()
+    print(f"{snap['games_per_s']:,.1f} parties/s ({workers} proc) – durée {snap['elapsed_s']:.3f}s")
+    print(f"Moy {snap['score']['mean']:.1f}  Méd ≈{snap['score']['p50']}  "
+          f"Max {snap['score']['max']}  Tuiles max {snap['max_tile']}")
+    if nodes:
+        print(f"Nœuds BEPP : {nodes / n:,.0f} par partie, {nodes / max(snap['moves'], 1):,.0f} par coup")
+
+def _bg_worker_mp(n_games, depth, ms, csv_path, workers, engine, replay_path=None,
+                  metrics_path=None, metrics_every=30.0, shard_dir=None,
+                  shard_games=256):
+    """
+    Parties BG → CSV (csv_path) ou, avec *shard_dir*, shards validés
+    atomiquement + manifest.json : n_games compte alors les parties déjà
+    présentes, et un redémarrage reprend là où le manifeste s'est arrêté.
+    """
     todo = float("inf") if n_games == "inf" else int(n_games)
-    done = 0
-    with mp.Pool(workers) as pool:
+    writer = shards.ShardWriter(shard_dir, shard_games) if shard_dir else None
+    if csv_path and not writer:
+        DataLogger(csv_path)            # en-tête / format vérifiés avant le pool
+    done = writer.games if writer else 0
+    if writer and (done or writer.discarded):
+        print(f"[BG] reprise : {done:,} parties dans {shard_dir} "
+              f"({writer.discarded} fichier(s) non validé(s) supprimé(s))", flush=True)
+    m = Metrics(metrics_path, metrics_every, label="BG")
+    with mp.Pool(workers, _init_worker, (engines.kernels_for(engine),)) as pool:
         while done < todo:
             chunk = 64 if todo == float("inf") else min(64, todo-done)
-            pool.starmap(_play_game, [(depth, ms, engine, csv_path)]*chunk)
+            seeds = writer.reserve_seeds(chunk) if writer else [None]*chunk
+            tasks = [(depth, ms, engine, None if writer else csv_path, replay_path,
+                      s, writer is not None) for s in seeds]
+            # résultats au fil de l'eau (imap_unordered) : instantanés réguliers
+            for res in pool.imap_unordered(_play_task, tasks):
+                if writer:
+                    writer.add_game(res.pop("rec"))
+                m.add(res)
+                m.maybe_write()
             done += chunk
-            if done % 100 == 0:
-                print(f"[BG] {done:,} parties enregistrées → {csv_path}", flush=True)
+    if writer:
+        writer.close()
+    m.flush()
 
 # ───────────────────────────── Pygame UI ─────────────────────────────
 class Pygame2048UI:
     def __init__(self, *, fps:int, speed:float, depth:int, ms:int,
-                 logger_path:Optional[str], engine, start_ai:bool):
+                 logger_path:Optional[str], engine, start_ai:bool,
+                 frame_skip:int=1):
         import pygame
         self.pg = pygame
         self.speed = speed
@@ -128,6 +242,7 @@ class Pygame2048UI:
 
         self.fps = fps
         self.ai_delay = int(150 / max(self.speed, .1))
+        self.frame_skip = max(1, frame_skip)    # coups IA joués par frame affichée
 
         self.game = Game()
         self.gid = str(uuid.uuid4())
@@ -137,36 +252,80 @@ class Pygame2048UI:
         self.last_ai = pygame.time.get_ticks()
         self.buttons = {}
 
-        self._render()
+        self._init_render()
+        self._render(full=True)
 
     # ---------- Rendu ----------------------------------------------------
+    # tuiles pré-rendues (une Surface par valeur) + rectangles modifiés seulement :
+    # une frame sans changement ne coûte rien (pas de flip).
+    BG = (250,248,239)
+
     def _col(self, v): return (119,110,101) if v <= 4 else (255,255,255)
 
-    def _draw_board(self):
-        pg,s = self.pg, self.screen
-        s.fill((250,248,239))
-        txt = self.F_SCO.render(f"Score : {self.game.score}", True, (0,0,0))
-        r = txt.get_rect(topright=(self.W-self.M, self.M))
-        pg.draw.rect(s, (237,224,200), r.inflate(30,20), border_radius=8)
-        s.blit(txt, r)
-
-        off = r.bottom + self.M
-        tiles = [((self.game.board.raw>>(i*4)) & 0xF) for i in range(16)]
-        for i in range(4):
-            for j in range(4):
-                e = tiles[i*4+j]; v = 0 if e == 0 else 1 << e
-                rect = pg.Rect(self.M + j*(self.T+self.M),
-                               off + i*(self.T+self.M),
-                               self.T, self.T)
-                pg.draw.rect(s, self.colors.get(v,(60,58,50)),
-                             rect, border_radius=8)
-                if v:
-                    t = self.F_BIG.render(str(v), True, self._col(v))
-                    s.blit(t, t.get_rect(center=rect.center))
-
-        if self.ai_on and not self.show_pop:
-            tag = self.F_SCO.render("AUTO-IA", True, (255,0,0))
-            s.blit(tag, tag.get_rect(topleft=(self.M, self.M)))
+    def _init_render(self):
+        pg = self.pg
+        self._tile_cache: dict[int, object] = {}
+        off = self.M + self.F_SCO.get_height() + self.M
+        self._cells = [pg.Rect(self.M + j*(self.T+self.M), off + i*(self.T+self.M),
+                               self.T, self.T) for i in range(4) for j in range(4)]
+        self._tag = self.F_SCO.render("AUTO-IA", True, (255,0,0))
+        self._tag_rect = self._tag.get_rect(topleft=(self.M, self.M))
+        self._shown: list = [None] * 16         # exposants actuellement à l'écran
+        self._shown_score = self._shown_tag = None
+        self._score_box = pg.Rect(0, 0, 0, 0)
+        self._popup_drawn = False
+        self.frames = 0                         # frames réellement affichées
+
+    def _tile(self, e:int):
+        """Surface T×T de la tuile d'exposant *e* (rendue une seule fois)."""
+        surf = self._tile_cache.get(e)
+        if surf is None:
+            pg = self.pg; v = 0 if e == 0 else 1 << e
+            surf = pg.Surface((self.T, self.T)).convert()  # opaque : blit direct
+            surf.fill(self.BG)
+            pg.draw.rect(surf, self.colors.get(v,(60,58,50)),
+                         surf.get_rect(), border_radius=8)
+            if v:
+                t = self.F_BIG.render(str(v), True, self._col(v))
+                surf.blit(t, t.get_rect(center=surf.get_rect().center))
+            self._tile_cache[e] = surf
+        return surf
+
+    def _draw_board(self, full:bool=False) -> list:
+        """Redessine ce qui a changé depuis la frame précédente → rects modifiés."""
+        pg, s, dirty = self.pg, self.screen, []
+        if full:
+            s.fill(self.BG)
+            self._shown = [None] * 16
+            self._shown_score = self._shown_tag = None
+            dirty.append(s.get_rect())
+
+        if self.game.score != self._shown_score:
+            txt = self.F_SCO.render(f"Score : {self.game.score}", True, (0,0,0))
+            r = txt.get_rect(topright=(self.W-self.M, self.M))
+            box = r.inflate(30,20)
+            s.fill(self.BG, self._score_box)
+            pg.draw.rect(s, (237,224,200), box, border_radius=8)
+            s.blit(txt, r)
+            dirty.append(box.union(self._score_box))
+            self._score_box, self._shown_score = box, self.game.score
+
+        raw = self.game.board.raw
+        for p, rect in enumerate(self._cells):
+            e = (raw >> (p*4)) & 0xF
+            if e != self._shown[p]:
+                s.blit(self._tile(e), rect)
+                dirty.append(rect)
+                self._shown[p] = e
+
+        tag = self.ai_on and not self.show_pop
+        if tag != self._shown_tag:
+            s.fill(self.BG, self._tag_rect)
+            if tag:
+                s.blit(self._tag, self._tag_rect)
+            dirty.append(self._tag_rect)
+            self._shown_tag = tag
+        return dirty
 
     def _draw_popup(self, msg:str):
         pg,s = self.pg, self.screen
@@ -189,24 +348,30 @@ class Pygame2048UI:
             t=self.F_BTN.render(lbl,True,(255,255,255))
             s.blit(t,t.get_rect(center=self.buttons[k].center))
 
-    def _render(self):
-        self._draw_board()
-        if self.show_pop:
+    def _render(self, full:bool=False):
+        if self.show_pop:                       # overlay : image complète
+            self._draw_board(full=True)
             self._draw_popup("🎉 Bravo !" if self.game.is_won() else "💀 Partie terminée.")
-        self.pg.display.flip()
+            self.pg.display.flip()
+            self._popup_drawn = True
+            self.frames += 1
+            return
+        dirty = self._draw_board(full or self._popup_drawn)
+        self._popup_drawn = False
+        if dirty:                               # rien de changé → frame sautée
+            self.pg.display.update(dirty)
+            self.frames += 1
 
     # ---------- Moteur ----------------------------------------------------
     def _play_engine(self):
-        return (self.engine(self.game.board, self.depth, self.ms)
-                if self.engine is bepp_best_move else
-                self.engine(self.game.board))
+        return call_engine(self.engine, self.game.board, self.depth, self.ms)
 
     def _log_current(self, mv:str):
         if not self.logger: return
-        bepp2_mv  = bepp_best_move(self.game.board, depth=2, time_limit_ms=10)
+        from eval.heuristics import bounded_eval
+        bepp2_mv  = engines.get("bepp")(self.game.board, depth=2, time_limit_ms=10)
         bepp2_val = bounded_eval(self.game.board)
-        snap = self.game.board.clone(); snap.move(mv, add_random=False)
-        self.logger.record(gid=self.gid, idx=self.move_idx, raw=snap.raw,
+        self.logger.record(gid=self.gid, idx=self.move_idx, raw=self.game.board.raw,
                            score=self.game.score,
                            bepp2_move=bepp2_mv, bepp2_val=bepp2_val)
 
@@ -214,11 +379,14 @@ class Pygame2048UI:
     def _ai_step(self):
         if not self.ai_on or self.show_pop: return
         if self.pg.time.get_ticks() - self.last_ai < self.ai_delay: return
-        mv = self._play_engine()
-        self._log_current(mv)
-        self.move_idx += 1
-        self.game.move(mv)
-        if self.game.is_over(): self.show_pop = True
+        for _ in range(self.frame_skip):
+            mv = self._play_engine()
+            self._log_current(mv)
+            self.move_idx += 1
+            self.game.move(mv)
+            if self.game.is_over():
+                self.show_pop = True
+                break
         self.last_ai = self.pg.time.get_ticks()
         self._render()
 
@@ -235,7 +403,8 @@ class Pygame2048UI:
         self.__init__(fps=self.fps, speed=self.speed,
                       depth=self.depth, ms=self.ms,
                       logger_path=self.logger.path if self.logger else None,
-                      engine=self.engine, start_ai=False)
+                      engine=self.engine, start_ai=False,
+                      frame_skip=self.frame_skip)
 
     def tick(self):
         self.clock.tick(self.fps)
@@ -262,49 +431,125 @@ class Pygame2048UI:
     def run(self):
         while True: self.tick()
 
+def bench_render(n_moves:int, frame_skip:int=1) -> None:
+    """Temps de rendu par frame sans fenêtre (pilote SDL « dummy »), IA aléatoire."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import random
+    def rnd(board):                      # coût négligeable : on mesure le rendu
+        for d in random.sample(["up","down","left","right"], 4):
+            if board.clone().move(d, add_random=False)[0]:
+                return d
+        return "up"
+    ui = Pygame2048UI(fps=0, speed=1000, depth=1, ms=1, logger_path=None,
+                      engine=rnd, start_ai=True, frame_skip=frame_skip)
+    ui.ai_delay, spent, draw = 0, [0.0], ui._render
+    def timed(*a, **k):
+        t = time.perf_counter(); draw(*a, **k); spent[0] += time.perf_counter() - t
+    ui._render = timed
+    frames0, t0 = ui.frames, time.perf_counter()
+    while ui.move_idx < n_moves:
+        ui.last_ai = -10**9
+        ui._ai_step()
+        if ui.show_pop:                  # partie finie → suivante, sans clic
+            ui.game, ui.show_pop = Game(), False
+    dt, frames = time.perf_counter() - t0, ui.frames - frames0
+    print(f"{ui.move_idx/dt:,.0f} coups IA/s – {frames:,} frames, "
+          f"{1000*spent[0]/max(frames,1):.3f} ms/frame de rendu (frame-skip {frame_skip})")
+    ui.pg.quit()
+
 # ───────────────────────────── CLI & main ─────────────────────────────
 if __name__ == "__main__":
     mp.freeze_support()
 
     pa = argparse.ArgumentParser()
-    pa.add_argument("--preset", choices=["default","turbo","rollout"], default="default")
+    pa.add_argument("--preset", default="default",
+                    help="default, turbo, rollout, mcts ou un preset de --preset-file")
+    pa.add_argument("--preset-file", help="presets JSON (tune_presets.py)")
     pa.add_argument("--depth", type=int,   default=3)
     pa.add_argument("--time",  type=int,   default=60)
     pa.add_argument("--beam",  type=int,   default=2)
-    pa.add_argument("--prob",  type=float, default=0.04)
+    pa.add_argument("--prob",  type=float, default=1e-3)
+    pa.add_argument("--sparse",   type=int, default=0,
+                    help="cases vides à partir desquelles les nœuds chance sont échantillonnés (0 = off)")
+    pa.add_argument("--sparse-k", type=int, default=6,
+                    help="cases (strates) développées en mode clairsemé")
+    pa.add_argument("--threads", type=int, default=1,
+                    help="threads de recherche MCTS (parallélisme d'arbre)")
     pa.add_argument("--fps",   type=int,   default=30)
     pa.add_argument("--speed", type=float, default=1.0)
+    pa.add_argument("--frame-skip", type=int, default=1,
+                    help="coups IA joués avant chaque frame affichée")
+    pa.add_argument("--render-bench", type=int, metavar="N",
+                    help="mesure le rendu sur N coups IA (sans fenêtre, SDL dummy)")
     pa.add_argument("--save")                # CSV dataset
+    pa.add_argument("--replay", help="archive .2048r des parties BG (graine + coups)")
+    pa.add_argument("--shards", metavar="DIR",
+                    help="parties BG → shards .npy + manifest.json (reprise après arrêt)")
+    pa.add_argument("--shard-games", type=int, default=256,
+                    help="parties par shard (commit atomique)")
     pa.add_argument("--bg")                  # parties en arrière-plan
     pa.add_argument("--bench", type=int)     # benchmark
+    pa.add_argument("--metrics", help="instantanés JSONL des parties --bg / --bench")
+    pa.add_argument("--metrics-every", type=float, default=30.0,
+                    help="secondes entre deux instantanés")
     pa.add_argument("--workers", type=int, default=max(1, mp.cpu_count()//2))
     pa.add_argument("--headless", action="store_true")
     pa.add_argument("--movenet",  help="chemin modèle MoveNet .joblib")
+    pa.add_argument("--server",   help="serveur de coups (move_server.py) : hôte:port ou unix:/chemin")
+    pa.add_argument("--profile-startup", action="store_true",
+                    help="temps d'import (processus neuf) et de préchauffage par module")
     pa.add_argument("--auto", nargs="?", const="ia",
-                    choices=["ia","bepp"],
-                    help="démarre l’UI en mode IA (MoveNet ou BEPP)")
+                    choices=["ia","bepp","mcts","adaptive","afterstate"],
+                    help="démarre l’UI en mode IA (MoveNet, BEPP, MCTS, BEPP adaptatif "
+                         "ou sur après-états)")
     args = pa.parse_args()
 
     # --- presets ---------------------------------------------------------
-    if args.preset == "turbo":
-        args.depth, args.time, args.beam, args.prob = 2, 40, 1, 0.10
-        default_engine = bepp_best_move
-    elif args.preset == "rollout":
-        args.depth = 3
-        default_engine = fast_best_move
-    else:
-        default_engine = bepp_best_move
-
-    expectimax.set_bepp_params(prob_cutoff=args.prob, beam_k=args.beam)
+    presets = dict(PRESETS)
+    if args.preset_file:
+        presets.update(load_presets(args.preset_file))
+    if args.preset not in presets:
+        pa.error(f"preset inconnu : {args.preset} (choix : {', '.join(presets)})")
+    for key, val in presets[args.preset].items():
+        if key != "engine":
+            setattr(args, key, val)
+    default_name = presets[args.preset].get("engine", "bepp")
+
+    # réglages appliqués à l'import des moteurs (chargés seulement si choisis)
+    engines.configure("search.expectimax", "set_bepp_params",
+                      prob_cutoff=args.prob, beam_k=args.beam,
+                      sparse_empties=args.sparse, sparse_k=args.sparse_k)
+    engines.configure("search.mcts", "set_mcts_params", threads=args.threads)
 
     # --- moteur MoveNet (si dispo) ---------------------------------------
-    movenet_engine = load_movenet(args.movenet)
-    ia_engine = movenet_engine or default_engine
+    t_movenet = time.perf_counter()
+    if args.server:                     # modèle + moteurs partagés par le serveur
+        from move_server import RemoteEngine
+        movenet_engine = RemoteEngine(args.server, "ia")
+    else:
+        movenet_engine = load_movenet(args.movenet)
+    t_movenet = time.perf_counter() - t_movenet
+
+    # --- moteur choisi : seul celui-ci est importé / préchauffé ----------
+    # (préchauffage : cache disque / AOT → pas de JIT au 1er coup)
+    ia_engine = movenet_engine or engines.get(default_name)
+    ui_engine = engines.get(args.auto) if args.auto in engines.REGISTRY else ia_engine
+    if movenet_engine:
+        kernels.warmup(engines.BASE_KERNELS)
+
+    if args.profile_startup:
+        print(engines.format_profile(engines.import_profile()))
+        print(f"🧠 MoveNet / serveur : {1000 * t_movenet:7.1f} ms "
+              f"({engine_name(movenet_engine) if movenet_engine else 'absent'})", flush=True)
+
+    if args.render_bench:
+        bench_render(args.render_bench, args.frame_skip)
+        sys.exit()
 
     # ---------- bench only ----------------------------------------------
     if args.bench:
         _bench_mp(args.bench, args.depth, args.time,
-                  args.workers, ia_engine)
+                  args.workers, ia_engine, args.metrics, args.metrics_every)
         sys.exit()
 
     # ---------- BG dataset ----------------------------------------------
@@ -313,7 +558,9 @@ if __name__ == "__main__":
         n = "inf" if args.bg.lower() == "inf" else int(args.bg)
         threading.Thread(target=_bg_worker_mp,
                          args=(n, args.depth, args.time,
-                               csv_path, args.workers, ia_engine),
+                               csv_path, args.workers, ia_engine, args.replay,
+                               args.metrics, args.metrics_every,
+                               args.shards, args.shard_games),
                          daemon=True).start()
 
     # ---------- headless -------------------------------------------------
@@ -324,17 +571,13 @@ if __name__ == "__main__":
             print("Arrêt demandé.")
         sys.exit()
 
-    # ---------- sélection moteur pour l’UI ------------------------------
-    if args.auto == "bepp":
-        ui_engine, start_ai = bepp_best_move, True
-    elif args.auto == "ia":
-        ui_engine, start_ai = ia_engine, True
-    else:                               # auto non fourni
-        ui_engine, start_ai = ia_engine, False
+    # ---------- moteur de l’UI : --auto bepp / mcts / adaptive, sinon ia --
+    start_ai = args.auto is not None
 
     # ---------- lance la fenêtre ----------------------------------------
     import pygame
     Pygame2048UI(fps=args.fps, speed=args.speed,
                  depth=args.depth, ms=args.time,
                  logger_path=csv_path if args.save else None,
-                 engine=ui_engine, start_ai=start_ai).run()
+                 engine=ui_engine, start_ai=start_ai,
+                 frame_skip=args.frame_skip).run()
@@ -0,0 +1,206 @@
+"""
+kernels.py – registre des noyaux Numba + préchauffage / AOT
+──────────────────────────────────────────────────────────────
+Chaque point d'entrée JIT appelé depuis Python y figure avec ses signatures
+explicites (les types réellement passés par les appelants : une signature
+différente déclencherait une nouvelle compilation).
+
+    python kernels.py --warmup        # compile / charge tout le cache (cache=True)
+    python kernels.py --clean         # supprime les .nbi/.nbc périmés
+    python kernels.py --aot           # extension _board_aot (noyaux de Board)
+    python kernels.py --cold-start    # temps jusqu'au 1er coup : froid / cache / AOT
+
+`warmup()` est appelé par interface_jeu_pygame.py au démarrage et dans chaque
+processus du pool, pour que le premier coup ne paie plus la compilation.
+"""
+from __future__ import annotations
+import argparse, importlib, os, subprocess, sys, tempfile, time
+from pathlib import Path
+from typing import NamedTuple
+
+from numba import types as T
+
+ROOT = Path(__file__).resolve().parent
+AOT_MODULE = "_board_aot"
+
+_U8_RO = T.Array(T.uint8, 1, "C", readonly=True)        # np.frombuffer(bytes)
+
+
+class Kernel(NamedTuple):
+    module: str
+    name: str
+    sigs: tuple                  # tuples de types Numba des arguments
+    aot: str | None = None       # signature pycc (None = JIT seulement)
+
+
+KERNELS: tuple[Kernel, ...] = (
+    Kernel("board", "_get",       ((T.uint64, T.int64, T.int64),),        "u1(u8,i8,i8)"),
+    Kernel("board", "_set",       ((T.uint64, T.int64, T.int64, T.uint8),), "u8(u8,i8,i8,u1)"),
+    Kernel("board", "move_board", ((T.uint64, T.int8),),                  "Tuple((u8,i4,b1))(u8,i1)"),
+    Kernel("board", "can_move",   ((T.uint64,),),                         "b1(u8)"),
+    Kernel("board", "max_exp",    ((T.uint64,),),                         "u1(u8)"),
+    Kernel("board", "spawn_tile", ((T.uint64, T.uint64),),                "Tuple((u8,u8))(u8,u8)"),
+    Kernel("board", "game_step",  ((T.uint64, T.int8, T.uint64, T.uint8),),
+           "Tuple((u8,i4,b1,b1,b1,u8))(u8,i1,u8,u1)"),
+    Kernel("board", "danger_features", ((T.uint64,),)),
+    Kernel("replay", "replay_boards", ((T.uint64, _U8_RO, T.int64),)),
+    Kernel("baselines", "play_games",
+           ((T.int64, T.uint64[::1], T.int64, T.uint8[::1], T.int64[::1]),)),
+    Kernel("search.fast_expectimax", "_rollout_value", ((T.uint64, T.int64, T.int64),)),
+    Kernel("search.mcts", "_iterate",
+           ((T.uint64[::1], T.int32[::1], T.float64[::1], T.int32[:, ::1],
+             T.int64[::1], T.int64, T.int64, T.int64, T.int64, T.int64,
+             T.float64, T.int64),)),
+)
+
+
+def _dispatcher(k: Kernel):
+    return getattr(importlib.import_module(k.module), k.name)
+
+
+# ───────────────────────────── préchauffage ────────────────────────────────
+def warmup(modules: tuple[str, ...] | None = None, verbose: bool = False) -> dict:
+    """
+    Compile (ou charge depuis le cache disque) toutes les signatures du
+    registre → {"module.nom": (ms, chargées, compilées)}.
+    """
+    report = {}
+    for k in KERNELS:
+        if modules is not None and k.module not in modules:
+            continue
+        fn = _dispatcher(k)
+        hits0, miss0 = sum(fn.stats.cache_hits.values()), sum(fn.stats.cache_misses.values())
+        t0 = time.perf_counter()
+        for sig in k.sigs:
+            fn.compile(sig)
+        ms = (time.perf_counter() - t0) * 1000
+        hits = sum(fn.stats.cache_hits.values()) - hits0
+        miss = sum(fn.stats.cache_misses.values()) - miss0
+        report[f"{k.module}.{k.name}"] = (ms, hits, miss)
+        if verbose:
+            print(f"   {k.module + '.' + k.name:<36} {ms:8.1f} ms  "
+                  f"(cache {hits} / compilé {miss})", flush=True)
+    return report
+
+
+# ───────────────────────── nettoyage du cache disque ───────────────────────
+def stale_cache_files() -> list[Path]:
+    """
+    Fichiers .nbi/.nbc orphelins : nom « module.fonction-ligne.pyXY » dont la
+    ligne ne correspond plus à la définition actuelle, ou fonction disparue.
+    """
+    tag = f".py{sys.version_info.major}{sys.version_info.minor}."
+    current: dict[Path, set[str]] = {}                 # dossier → préfixes valides
+    stems: dict[Path, set[str]] = {}                   # dossier → modules suivis
+    for modname in sorted({k.module for k in KERNELS}):
+        mod = importlib.import_module(modname)
+        for obj in vars(mod).values():
+            cache = getattr(getattr(obj, "_cache", None), "_cache_file", None)
+            index = getattr(cache, "_index_name", None)
+            if index is None or obj.py_func.__module__ != modname:
+                continue
+            path = Path(cache._cache_path)
+            current.setdefault(path, set()).add(index[:-len(".nbi")])
+            stems.setdefault(path, set()).add(Path(mod.__file__).stem)
+
+    stale = []
+    for path, valid in current.items():
+        for f in path.glob("*.nb[ic]"):
+            if tag not in f.name or f.name.split(".", 1)[0] not in stems[path]:
+                continue                               # autre Python / autre module
+            prefix = f.name[:f.name.index(tag) + len(tag) - 1]
+            if prefix not in valid:
+                stale.append(f)
+    return sorted(stale)
+
+
+def clean_stale() -> int:
+    files = stale_cache_files()
+    for f in files:
+        f.unlink(missing_ok=True)
+    return len(files)
+
+
+# ──────────────────────────── compilation AOT ──────────────────────────────
+def build_aot(out_dir: Path = ROOT) -> Path:
+    """
+    Compile les noyaux marqués `aot` (ceux que Board appelle depuis Python)
+    dans l'extension _board_aot, avec l'empreinte de board.py.
+    numba.pycc est déprécié : sans lui, seul le cache JIT est disponible.
+    """
+    from numba.pycc import CC
+    import board
+
+    cc = CC(AOT_MODULE)
+    cc.output_dir = str(out_dir)
+    for k in KERNELS:
+        if k.aot:
+            cc.export(k.name, k.aot)(_dispatcher(k).py_func)
+    digest = board.source_digest()
+
+    def source_digest():
+        return digest                                  # constante figée par Numba
+    cc.export("source_digest", "i8()")(source_digest)
+    cc.compile()
+    return next(out_dir.glob(AOT_MODULE + ".*"))
+
+
+# ───────────────────────────── démarrage à froid ───────────────────────────
+_FIRST_MOVE = """
+import time; t0 = time.perf_counter()
+from game import Game
+from search.{mod} import {fn} as engine
+t1 = time.perf_counter()
+engine(Game(seed=1).board, 3, 60)
+t2 = time.perf_counter()
+import board
+print(t1 - t0, t2 - t1, board._aot is not None)
+"""
+
+_ENGINES = {"bepp": ("expectimax", "best_move"), "mcts": ("mcts", "mcts_best_move")}
+
+
+def cold_start(engine: str = "bepp") -> list[tuple[str, float, float, bool]]:
+    """
+    Temps import → 1er coup dans un processus neuf, pour trois états :
+    cache Numba vide (JIT complet), cache plein, AOT + cache vide.
+    """
+    mod, fn = _ENGINES[engine]
+    code = _FIRST_MOVE.format(mod=mod, fn=fn)
+    rows = []
+    with tempfile.TemporaryDirectory() as jit, tempfile.TemporaryDirectory() as aot:
+        scenarios = [("JIT, cache vide", jit, "0"),
+                     ("JIT, cache plein", jit, "0"),      # rempli par le 1er run
+                     ("AOT, cache vide", aot, "1")]
+        for label, cache, use_aot in scenarios:
+            env = dict(os.environ, NUMBA_CACHE_DIR=cache, BOARD_AOT=use_aot)
+            out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env,
+                                 capture_output=True, text=True, check=True)
+            t_imp, t_move, aot = out.stdout.split()[-3:]
+            rows.append((label, float(t_imp), float(t_move), aot == "True"))
+    return rows
+
+
+if __name__ == "__main__":
+    pa = argparse.ArgumentParser()
+    pa.add_argument("--warmup", action="store_true", help="compile / charge tous les noyaux")
+    pa.add_argument("--clean", action="store_true", help="supprime les fichiers de cache périmés")
+    pa.add_argument("--aot", action="store_true", help="construit l'extension _board_aot")
+    pa.add_argument("--cold-start", choices=list(_ENGINES), nargs="?", const="bepp",
+                    help="mesure le temps jusqu'au 1er coup (moteur bepp ou mcts)")
+    args = pa.parse_args()
+
+    if args.clean:
+        print(f"🧹 {clean_stale()} fichiers de cache périmés supprimés")
+    if args.aot:
+        t0 = time.time()
+        print(f"✅ {build_aot().name} ({time.time() - t0:.1f}s)")
+    if args.warmup or not (args.clean or args.aot or args.cold_start):
+        t0 = time.perf_counter()
+        warmup(verbose=True)
+        print(f"✅ {len(KERNELS)} noyaux prêts en {time.perf_counter() - t0:.2f}s")
+    if args.cold_start:
+        print(f"Démarrage à froid (moteur {args.cold_start}) :")
+        for label, t_imp, t_move, aot in cold_start(args.cold_start):
+            print(f"   {label:<18} import {t_imp:6.2f}s   1er coup {t_move:6.2f}s"
+                  f"   total {t_imp + t_move:6.2f}s{'' if aot or 'AOT' not in label else '  (AOT absent)'}")
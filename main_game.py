@@ -1,7 +1,6 @@
 # main.py – interface interactive + benchmark aléatoire haute-perf
 import argparse, time
 from game import Game
-from random_play import random_benchmark        # <-- nouvelle import
 
 # ─────────────────────────────────────────────
 def _clear_screen():
@@ -31,6 +30,7 @@ def interactive():
 
 # ─────────────────────────────────────────────
 def bench(n_games: int):
+    from random_play import random_benchmark    # JIT chargé seulement pour --bench
     print(f"Lancement benchmark aléatoire : {n_games:_} parties…")
     t0     = time.perf_counter()
     scores = random_benchmark(n_games)          # <-- appel au moteur JIT
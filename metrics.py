@@ -0,0 +1,143 @@
+"""
+metrics.py – métriques en flux pour les longues sessions --bg / --bench
+──────────────────────────────────────────────────────────────
+Chaque worker renvoie un résumé par partie (score, tuile max, coups, temps
+moteur, esquisse des latences par coup) ; Metrics les agrège au fil de l'eau
+et écrit périodiquement un instantané JSON par ligne :
+
+    {"t": …, "games": 812, "games_per_s": 3.1, "moves_per_s": 905.2,
+     "window": {"games_per_s": …, "moves_per_s": …},
+     "score": {"mean": …, "p50": …, "p90": …, "p99": …, "max": …},
+     "max_tile": {"512": 301, "1024": 420, "2048": 91},
+     "latency_ms": {"best_move": {"p50": …, "p95": …, "p99": …, "mean": …}}}
+
+Les quantiles viennent d'une esquisse à erreur relative bornée (seaux
+logarithmiques façon DDSketch) : mémoire constante, fusion exacte entre workers.
+"""
+from __future__ import annotations
+import json, math, time
+
+
+class QuantileSketch:
+    """Quantiles à erreur relative ≤ *rel_err* ; seaux log γ^i, fusionnables."""
+    ZERO = -(1 << 30)                        # seau des valeurs ≤ 0
+
+    def __init__(self, rel_err: float = 0.01, counts: dict | None = None):
+        self.rel_err = rel_err
+        self.gamma = (1 + rel_err) / (1 - rel_err)
+        self._lg = math.log(self.gamma)
+        self.counts: dict[int, int] = dict(counts or {})
+        self.n = sum(self.counts.values())
+
+    def add(self, x: float, k: int = 1) -> None:
+        i = math.ceil(math.log(x) / self._lg) if x > 0 else self.ZERO
+        self.counts[i] = self.counts.get(i, 0) + k
+        self.n += k
+
+    def merge(self, other: "QuantileSketch | dict") -> None:
+        counts = other.counts if isinstance(other, QuantileSketch) else other
+        for i, c in counts.items():
+            i = int(i)
+            self.counts[i] = self.counts.get(i, 0) + c
+            self.n += c
+
+    def quantile(self, q: float) -> float:
+        if not self.n:
+            return 0.0
+        rank, seen = q * (self.n - 1), 0
+        for i in sorted(self.counts):
+            seen += self.counts[i]
+            if seen > rank:
+                return self._value(i)
+        return self._value(max(self.counts))
+
+    def _value(self, i: int) -> float:
+        return 0.0 if i == self.ZERO else 2 * self.gamma ** i / (self.gamma + 1)
+
+
+def game_result(engine_name: str, score: int, max_tile: int, moves: int,
+                wall_s: float, latency: QuantileSketch, engine_s: float) -> dict:
+    """Résumé compact d'une partie (picklable, renvoyé par les workers)."""
+    return {"engine": engine_name, "score": int(score), "max_tile": int(max_tile),
+            "moves": int(moves), "wall_s": wall_s, "engine_s": engine_s,
+            "lat": latency.counts}
+
+
+class Metrics:
+    """Agrégateur en flux + instantanés JSONL toutes les *every_s* secondes."""
+
+    def __init__(self, path: str | None = None, every_s: float = 30.0, label: str = "BG"):
+        self.path, self.every_s, self.label = path, every_s, label
+        self.t0 = self._last_t = time.perf_counter()
+        self.games = self.moves = 0
+        self._last_games = self._last_moves = 0
+        self.score_sum, self.score_max = 0, 0
+        self.scores = QuantileSketch()
+        self.tiles: dict[int, int] = {}
+        self.latency: dict[str, QuantileSketch] = {}
+        self.engine_s: dict[str, float] = {}
+        self.engine_moves: dict[str, int] = {}
+        self.last: dict | None = None
+
+    def add(self, res: dict) -> None:
+        self.games += 1
+        self.moves += res["moves"]
+        self.score_sum += res["score"]
+        self.score_max = max(self.score_max, res["score"])
+        self.scores.add(res["score"])
+        self.tiles[res["max_tile"]] = self.tiles.get(res["max_tile"], 0) + 1
+        eng = res["engine"]
+        self.latency.setdefault(eng, QuantileSketch()).merge(res["lat"])
+        self.engine_s[eng] = self.engine_s.get(eng, 0.0) + res["engine_s"]
+        self.engine_moves[eng] = self.engine_moves.get(eng, 0) + res["moves"]
+
+    def snapshot(self) -> dict:
+        now = time.perf_counter()
+        up, win = now - self.t0, max(now - self._last_t, 1e-9)
+        snap = {
+            "t": round(time.time(), 3), "elapsed_s": round(up, 2),
+            "games": self.games, "moves": self.moves,
+            "games_per_s": round(self.games / max(up, 1e-9), 3),
+            "moves_per_s": round(self.moves / max(up, 1e-9), 1),
+            "window": {"games_per_s": round((self.games - self._last_games) / win, 3),
+                       "moves_per_s": round((self.moves - self._last_moves) / win, 1)},
+            "score": {"mean": round(self.score_sum / max(self.games, 1), 1),
+                      **{f"p{int(q * 100)}": round(self.scores.quantile(q))
+                         for q in (0.5, 0.9, 0.99)},
+                      "max": self.score_max},
+            "max_tile": {str(t): c for t, c in sorted(self.tiles.items())},
+            "latency_ms": {eng: {"p50": round(sk.quantile(0.5), 3),
+                                 "p95": round(sk.quantile(0.95), 3),
+                                 "p99": round(sk.quantile(0.99), 3),
+                                 "mean": round(1000 * self.engine_s[eng]
+                                               / max(self.engine_moves[eng], 1), 3)}
+                           for eng, sk in self.latency.items()},
+        }
+        self._last_t, self._last_games, self._last_moves = now, self.games, self.moves
+        self.last = snap
+        return snap
+
+    def write(self, snap: dict | None = None) -> dict:
+        """Instantané → ligne JSONL (si *path*) + résumé console."""
+        snap = snap or self.snapshot()
+        if self.path:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(snap) + "\n")
+        top = max(self.tiles) if self.tiles else 0
+        share = self.tiles.get(top, 0) / max(self.games, 1)
+        print(f"[{self.label}] {snap['games']:,} parties · {snap['window']['games_per_s']:.2f} "
+              f"parties/s · {snap['window']['moves_per_s']:,.0f} coups/s · score p50 "
+              f"{snap['score']['p50']:,} p90 {snap['score']['p90']:,} · {top}: {share:.0%}",
+              flush=True)
+        return snap
+
+    def maybe_write(self) -> dict | None:
+        if time.perf_counter() - self._last_t >= self.every_s:
+            return self.write()
+        return None
+
+    def flush(self) -> dict:
+        """Instantané final (écrit seulement s'il reste des parties non rapportées)."""
+        if self.games != self._last_games or self.last is None:
+            return self.write()
+        return self.last
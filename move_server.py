@@ -0,0 +1,350 @@
+"""
+move_server.py – serveur de coups local (asyncio, une ligne JSON par message)
+──────────────────────────────────────────────────────────────
+Un seul processus charge MoveNet et les moteurs de recherche ; l'UI, les
+workers --bench / --bg ou les générateurs de dataset lui envoient des grilles :
+
+    python move_server.py --listen 127.0.0.1:8765        # ou unix:/tmp/2048.sock
+    python interface_jeu_pygame.py --bench 1000 --server 127.0.0.1:8765
+
+Protocole :
+    → {"id": 7, "board": <uint64>, "engine": "ia", "depth": 3, "ms": 60}
+    ← {"id": 7, "move": "left"}                 (ou {"id": 7, "error": "…"})
+    → {"cmd": "stats"}                          ← compteurs (latence, débit, lots)
+
+Les requêtes « ia » (MoveNet) de tous les clients sont regroupées en
+micro-lots : la première attend au plus *batch_wait_ms* que d'autres la
+rejoignent (≤ *batch_max*), puis un seul predict_batch répond à tout le lot.
+Les recherches (bepp / mcts / rollout) tournent dans un pool de threads.
+"""
+from __future__ import annotations
+import argparse, asyncio, json, socket, threading, time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from board import Board
+
+# ─────────────────────── paramètres (modifiables) ──────────────────────────
+DEFAULT_ADDR   = "127.0.0.1:8765"
+BATCH_MAX      = 64      # requêtes MoveNet max par lot
+BATCH_WAIT_MS  = 2.0     # attente max du 1er arrivé avant inférence
+SEARCH_THREADS = 2       # threads des moteurs de recherche
+
+# ───────────────────────────── utilitaires ─────────────────────────────────
+def _split_addr(address: str) -> tuple[str, str | tuple[str, int]]:
+    """« unix:/chemin » → ("unix", chemin) ; « hôte:port » → ("tcp", (hôte, port))."""
+    if address.startswith("unix:"):
+        return "unix", address[5:]
+    host, _, port = address.rpartition(":")
+    return "tcp", (host or "127.0.0.1", int(port))
+
+
+def _board(raw: int) -> Board:
+    b = Board.__new__(Board)
+    b._b, b._rng = np.uint64(raw), None
+    return b
+
+
+class _Stats:
+    """Compteurs du serveur (latences glissantes sur les 10 000 dernières requêtes)."""
+
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.by_engine: dict[str, int] = {}
+        self.errors = self.batches = self.batched = 0
+        self.lat_ms: deque[float] = deque(maxlen=10_000)
+
+    def snapshot(self) -> dict:
+        up = time.perf_counter() - self.t0
+        n = sum(self.by_engine.values())
+        lat = np.asarray(self.lat_ms) if self.lat_ms else np.zeros(1)
+        return {"uptime_s": round(up, 2), "requests": n,
+                "req_per_s": round(n / max(up, 1e-9), 1),
+                "by_engine": dict(self.by_engine), "errors": self.errors,
+                "batches": self.batches,
+                "mean_batch": round(self.batched / max(self.batches, 1), 2),
+                "lat_ms": {q: round(float(np.percentile(lat, p)), 3)
+                           for q, p in (("p50", 50), ("p95", 95), ("p99", 99))}
+                          | {"max": round(float(lat.max()), 3)}}
+
+
+# ─────────────────────────────── micro-lots ────────────────────────────────
+class _Batcher:
+    """File d'attente MoveNet → lots traités par *predict* dans un thread."""
+
+    def __init__(self, predict, max_size: int, wait_ms: float, stats: _Stats):
+        self.predict, self.max_size, self.wait = predict, max_size, wait_ms / 1000
+        self.stats = stats
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.pool = ThreadPoolExecutor(1, thread_name_prefix="movenet")
+
+    async def submit(self, raw: int) -> str:
+        fut = asyncio.get_running_loop().create_future()
+        await self.queue.put((raw, fut))
+        return await fut
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.wait
+            while len(batch) < self.max_size:
+                if not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+                    continue
+                left = deadline - loop.time()
+                if left <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), left))
+                except asyncio.TimeoutError:
+                    break
+            raws = [r for r, _ in batch]
+            try:
+                moves = await loop.run_in_executor(self.pool, self.predict, raws)
+            except Exception as e:                      # modèle cassé → erreur par requête
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+            self.stats.batches += 1
+            self.stats.batched += len(batch)
+            for (_, fut), mv in zip(batch, moves):
+                if not fut.done():
+                    fut.set_result(mv)
+
+
+# ─────────────────────────────── serveur ───────────────────────────────────
+class MoveServer:
+    """
+    *movenet* : objet exposant predict_batch(raws) → coups (None → « ia »
+    retombe sur BEPP, comme l'UI quand le modèle est absent).
+    """
+
+    def __init__(self, movenet=None, *, batch_max: int = BATCH_MAX,
+                 batch_wait_ms: float = BATCH_WAIT_MS, search_threads: int = SEARCH_THREADS):
+        from search.expectimax import best_move as bepp_best_move
+        from search.fast_expectimax import fast_best_move
+        from search.mcts import mcts_best_move
+
+        self.movenet = movenet
+        self.searchers = {"bepp": lambda b, d, ms: bepp_best_move(b, d, ms),
+                          "mcts": lambda b, d, ms: mcts_best_move(b, d, ms),
+                          "rollout": lambda b, d, ms: fast_best_move(b, d)}
+        self.stats = _Stats()
+        self.batch_max, self.batch_wait_ms = batch_max, batch_wait_ms
+        self.search_pool = ThreadPoolExecutor(search_threads, thread_name_prefix="search")
+        self.server: asyncio.AbstractServer | None = None
+
+    async def start(self, address: str = DEFAULT_ADDR) -> str:
+        """Ouvre la socket → adresse effective (port 0 = port libre)."""
+        if self.movenet is not None:
+            self.batcher = _Batcher(self.movenet.predict_batch, self.batch_max,
+                                    self.batch_wait_ms, self.stats)
+            self._batch_task = asyncio.create_task(self.batcher.run())
+        kind, where = _split_addr(address)
+        if kind == "unix":
+            self.server = await asyncio.start_unix_server(self._client, where)
+            return address
+        self.server = await asyncio.start_server(self._client, *where)
+        host, port = self.server.sockets[0].getsockname()[:2]
+        return f"{host}:{port}"
+
+    async def serve_forever(self) -> None:
+        async with self.server:
+            await self.server.serve_forever()
+
+    # ------------------------------------------------------------ requêtes
+    async def _client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        tasks = set()
+        try:
+            while line := await reader.readline():
+                t = asyncio.create_task(self._answer(line, writer))   # pipelining
+                tasks.add(t)
+                t.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            writer.close()
+
+    async def _answer(self, line: bytes, writer: asyncio.StreamWriter) -> None:
+        t0 = time.perf_counter()
+        rid = None
+        try:
+            req = json.loads(line)
+            rid = req.get("id")
+            if req.get("cmd") == "stats":
+                resp = {"id": rid, "stats": self.stats.snapshot()}
+            else:
+                engine = req.get("engine", "ia")
+                move = await self._move(int(req["board"]), engine,
+                                        int(req.get("depth", 3)), int(req.get("ms", 60)))
+                self.stats.by_engine[engine] = self.stats.by_engine.get(engine, 0) + 1
+                self.stats.lat_ms.append((time.perf_counter() - t0) * 1000)
+                resp = {"id": rid, "move": move}
+        except Exception as e:
+            self.stats.errors += 1
+            resp = {"id": rid, "error": f"{type(e).__name__}: {e}"}
+        writer.write(json.dumps(resp).encode() + b"\n")
+        await writer.drain()
+
+    async def _move(self, raw: int, engine: str, depth: int, ms: int) -> str:
+        if engine == "ia" and self.movenet is not None:
+            return await self.batcher.submit(raw)
+        search = self.searchers["bepp" if engine == "ia" else engine]
+        return await asyncio.get_running_loop().run_in_executor(
+            self.search_pool, search, _board(raw), depth, ms)
+
+
+def serve_in_thread(server: MoveServer, address: str = "127.0.0.1:0") -> str:
+    """Lance *server* dans un thread démon (tests / bench) → adresse effective."""
+    ready, out = threading.Event(), {}
+
+    def main():
+        async def go():
+            out["addr"] = await server.start(address)
+            ready.set()
+            await server.serve_forever()
+        asyncio.run(go())
+
+    threading.Thread(target=main, daemon=True).start()
+    ready.wait()
+    return out["addr"]
+
+
+# ──────────────────────────────── client ───────────────────────────────────
+class MoveClient:
+    """Client synchrone (une connexion par processus, ouverte à la demande)."""
+
+    def __init__(self, address: str = DEFAULT_ADDR):
+        self.address = address
+        self._io = None
+        self._next = 0
+
+    def _connect(self):
+        kind, where = _split_addr(self.address)
+        if kind == "unix":
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(where)
+        else:
+            sock = socket.create_connection(where)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._io = sock.makefile("rwb")
+
+    def request(self, payload: dict) -> dict:
+        if self._io is None:
+            self._connect()
+        self._next += 1
+        payload["id"] = self._next
+        self._io.write(json.dumps(payload).encode() + b"\n")
+        self._io.flush()
+        resp = json.loads(self._io.readline())
+        if "error" in resp:
+            raise RuntimeError(resp["error"])
+        return resp
+
+    def move(self, board, engine: str = "ia", depth: int = 3, ms: int = 60) -> str:
+        raw = board if isinstance(board, (int, np.integer)) else board.raw
+        return self.request({"board": int(raw), "engine": engine,
+                             "depth": depth, "ms": ms})["move"]
+
+    def stats(self) -> dict:
+        return self.request({"cmd": "stats"})["stats"]
+
+    def close(self) -> None:
+        if self._io is not None:
+            self._io.close()
+            self._io = None
+
+    # la connexion n'est pas transmise aux workers multiprocessing
+    def __getstate__(self):
+        return {"address": self.address, "_io": None, "_next": 0}
+
+
+class RemoteEngine:
+    """Moteur « distant » au même format que best_move : (board, depth, ms) → coup."""
+    search_args = True              # engines.is_search : appelé avec (board, depth, ms)
+
+    def __init__(self, address: str = DEFAULT_ADDR, engine: str = "ia"):
+        self.engine = engine
+        self.client = MoveClient(address)
+
+    def __call__(self, board, depth: int = 3, ms: int = 60) -> str:
+        return self.client.move(board, self.engine, depth, ms)
+
+
+# ──────────────────────────────── bench ────────────────────────────────────
+def bench(address: str, clients: int, requests: int, engine: str = "ia") -> dict:
+    """*clients* threads envoient chacun *requests* grilles → stats serveur."""
+    from game import Game
+    rng = np.random.default_rng(0)
+    boards = []
+    g = Game(seed=1)
+    while len(boards) < 512:
+        boards.append(g.board.raw)
+        if g.is_over():
+            g = Game(seed=len(boards))
+        g.move(("left", "up", "right", "down")[rng.integers(4)])
+
+    def work(i: int):
+        cl = MoveClient(address)
+        for k in range(requests):
+            cl.move(boards[(i * requests + k) % len(boards)], engine, 2, 10)
+        cl.close()
+
+    t0 = time.perf_counter()
+    ths = [threading.Thread(target=work, args=(i,)) for i in range(clients)]
+    for th in ths: th.start()
+    for th in ths: th.join()
+    dt = time.perf_counter() - t0
+    st = MoveClient(address).stats()
+    print(f"{clients * requests / dt:,.0f} coups/s ({clients} clients) – "
+          f"lot moyen {st['mean_batch']}  latence p50 {st['lat_ms']['p50']} ms "
+          f"p99 {st['lat_ms']['p99']} ms")
+    return st
+
+
+if __name__ == "__main__":
+    pa = argparse.ArgumentParser()
+    pa.add_argument("--listen", default=DEFAULT_ADDR, help="hôte:port ou unix:/chemin")
+    pa.add_argument("--movenet", help="chemin modèle MoveNet .joblib")
+    pa.add_argument("--batch-max", type=int, default=BATCH_MAX)
+    pa.add_argument("--batch-wait-ms", type=float, default=BATCH_WAIT_MS)
+    pa.add_argument("--threads", type=int, default=SEARCH_THREADS,
+                    help="threads des moteurs de recherche")
+    pa.add_argument("--stats-every", type=float, default=0,
+                    help="affiche les compteurs toutes les N secondes (0 = off)")
+    pa.add_argument("--bench", metavar="ADDR", help="client de charge vers un serveur lancé")
+    pa.add_argument("--clients", type=int, default=8)
+    pa.add_argument("--requests", type=int, default=200)
+    pa.add_argument("--engine", default="ia", choices=["ia", "bepp", "mcts", "rollout"])
+    args = pa.parse_args()
+
+    if args.bench:
+        bench(args.bench, args.clients, args.requests, args.engine)
+        raise SystemExit
+
+    import kernels
+    from interface_jeu_pygame import load_movenet
+    kernels.warmup(("board", "search.fast_expectimax", "search.mcts"))
+    srv = MoveServer(load_movenet(args.movenet), batch_max=args.batch_max,
+                     batch_wait_ms=args.batch_wait_ms, search_threads=args.threads)
+
+    async def main():
+        addr = await srv.start(args.listen)
+        print(f"🚀 serveur de coups sur {addr} "
+              f"(MoveNet {'chargé' if srv.movenet else 'absent → BEPP'})", flush=True)
+        if args.stats_every > 0:
+            async def report():
+                while True:
+                    await asyncio.sleep(args.stats_every)
+                    print(json.dumps(srv.stats.snapshot()), flush=True)
+            asyncio.create_task(report())
+        await srv.serve_forever()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("Arrêt demandé.")
@@ -0,0 +1,122 @@
+"""
+replay.py – archives de parties rejouables (graine + coups sur 2 bits)
+──────────────────────────────────────────────────────────────
+Une partie = graine SplitMix64 des apparitions + suite des coups valides
+(0← 1→ 2↑ 3↓, 4 coups par octet).  Toute grille intermédiaire se régénère
+à la demande avec replay_boards (JIT) : ~0,25 octet par coup au lieu
+d'une ligne CSV de 23 colonnes.
+
+Format de fichier (.2048r) :
+    MAGIC, puis pour chaque partie : <Q graine> <I nb_coups> <coups packés>
+
+    python replay.py games.2048r                 # statistiques
+    python replay.py games.2048r --game 0 --show # grilles de la partie 0
+"""
+from __future__ import annotations
+import argparse, os, struct
+from typing import Iterator
+import numpy as np
+import numba as nb
+try:
+    import fcntl
+except ImportError:                         # Windows : pas de verrou
+    fcntl = None
+
+from board import move_board, spawn_tile
+
+MAGIC  = b"2048R\x01"
+_HEAD  = struct.Struct("<QI")
+
+
+def pack_moves(moves) -> bytes:
+    """Ids de coups (0-3) → 2 bits par coup, petit-boutiste dans l'octet."""
+    m = np.asarray(moves, dtype=np.uint8) & 3
+    pad = np.zeros(-len(m) % 4, dtype=np.uint8)
+    q = np.concatenate((m, pad)).reshape(-1, 4)
+    return (q[:, 0] | (q[:, 1] << 2) | (q[:, 2] << 4) | (q[:, 3] << 6)).tobytes()
+
+
+def unpack_moves(packed: bytes, n: int) -> np.ndarray:
+    p = np.frombuffer(packed, dtype=np.uint8)
+    return ((p[:, None] >> np.array([0, 2, 4, 6], dtype=np.uint8)) & 3).ravel()[:n]
+
+
+@nb.njit(cache=True)
+def replay_boards(seed: nb.uint64, packed: np.ndarray, n: int):
+    """
+    Rejoue une partie → (grilles uint64[n+1], scores int64[n+1]).
+    boards[i] = grille avant le coup i (boards[n] = grille finale).
+    """
+    boards = np.empty(n + 1, dtype=np.uint64)
+    scores = np.zeros(n + 1, dtype=np.int64)
+    s = nb.uint64(seed)
+    b, s = spawn_tile(nb.uint64(0), s)
+    b, s = spawn_tile(b, s)
+    boards[0] = b
+    for i in range(n):
+        d = (packed[i >> 2] >> ((i & 3) * 2)) & 3
+        b2, gain, _ = move_board(b, d)
+        b, s = spawn_tile(b2, s)
+        boards[i + 1] = b
+        scores[i + 1] = scores[i] + gain
+    return boards, scores
+
+
+def encode_game(seed: int, moves) -> bytes:
+    return _HEAD.pack(seed, len(moves)) + pack_moves(moves)
+
+
+def append_game(path: str, seed: int, moves) -> None:
+    """
+    Ajoute une partie en un seul write O_APPEND.  Le test « fichier vide ?
+    → MAGIC » et l'écriture se font sous flock : sinon deux process qui
+    créent l'archive ensemble écriraient chacun l'en-tête.
+    """
+    rec = encode_game(seed, moves)
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)    # libéré par os.close
+        if os.fstat(fd).st_size == 0:
+            rec = MAGIC + rec
+        os.write(fd, rec)
+    finally:
+        os.close(fd)
+
+
+def read_games(path: str) -> Iterator[tuple[int, int, bytes]]:
+    """Itère (graine, nb_coups, coups packés) sur une archive."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path}: pas une archive .2048r")
+        while head := f.read(_HEAD.size):
+            seed, n = _HEAD.unpack(head)
+            yield seed, n, f.read((n + 3) // 4)
+
+
+def replay(seed: int, packed: bytes, n: int) -> tuple[np.ndarray, np.ndarray]:
+    return replay_boards(np.uint64(seed), np.frombuffer(packed, dtype=np.uint8), n)
+
+
+if __name__ == "__main__":
+    pa = argparse.ArgumentParser()
+    pa.add_argument("archive")
+    pa.add_argument("--game", type=int, help="index de la partie à rejouer")
+    pa.add_argument("--show", action="store_true", help="affiche chaque grille")
+    args = pa.parse_args()
+
+    n_games = n_moves = 0
+    for gi, (seed, n, packed) in enumerate(read_games(args.archive)):
+        n_games += 1; n_moves += n
+        if gi == args.game:
+            boards, scores = replay(seed, packed, n)
+            print(f"partie {gi} : graine {seed:#018x}, {n} coups, score {scores[-1]}")
+            if args.show:
+                from board import Board
+                b = Board.__new__(Board)
+                for raw, sc in zip(boards, scores):
+                    b._b = raw
+                    print(b, f"score {sc}")
+    size = os.path.getsize(args.archive)
+    print(f"{n_games:,} parties · {n_moves:,} coups · {size:,} o "
+          f"({size / max(n_moves, 1):.2f} o/coup)")
@@ -0,0 +1,92 @@
+# search/adaptive.py
+"""
+Effort adaptatif pour BEPP : profondeur et budget choisis à chaque coup.
+
+Trois caractéristiques bon marché (board.danger_features, LUT lignes) :
+    • cases vides            – peu de place = position dangereuse
+    • tuiles distinctes      – grille « fragmentée », peu de paires
+    • fusions disponibles    – sur le meilleur axe (lignes ou colonnes)
+La position est classée en palier calm / normal / tight / critical ; chaque
+palier décale la profondeur et multiplie le budget du preset courant.
+Les positions faciles coûtent peu, les positions critiques reçoivent l'effort.
+"""
+
+import time
+from typing import Dict, Tuple
+
+import numpy as np
+
+from board import danger_features
+from search.expectimax import best_move
+
+# ─────────────────────── paramètres (modifiables) ──────────────────────────
+CALM_EMPTIES  = 7    # ≥ cases vides → palier calm
+TIGHT_EMPTIES = 3    # ≤ cases vides → palier tight
+CRIT_EMPTIES  = 1    # ≤ cases vides (et ≤ CRIT_MERGES fusions) → critical
+CRIT_MERGES   = 1
+MAX_DEPTH     = 6
+
+# palier → (Δ profondeur, facteur de budget)
+TIERS: Dict[str, Tuple[int, float]] = {
+    "calm":     (-1, 0.25),
+    "normal":   (0, 1.0),
+    "tight":    (1, 2.0),
+    "critical": (2, 4.0),
+}
+
+def set_adaptive_params(*, calm_empties: int | None = None,
+                        tight_empties: int | None = None,
+                        tiers: Dict[str, Tuple[int, float]] | None = None) -> None:
+    """Permet de changer les seuils / paliers depuis un autre module (argparse)."""
+    global CALM_EMPTIES, TIGHT_EMPTIES
+    if calm_empties is not None:
+        CALM_EMPTIES = int(calm_empties)
+    if tight_empties is not None:
+        TIGHT_EMPTIES = int(tight_empties)
+    if tiers is not None:
+        TIERS.update(tiers)
+
+# ─────────────────────── répartition de l'effort ───────────────────────────
+_EFFORT = {t: [0, 0.0] for t in TIERS}   # palier → [coups, CPU-ms]
+
+def reset_effort_stats() -> None:
+    for t in _EFFORT:
+        _EFFORT[t] = [0, 0.0]
+
+def effort_stats() -> Dict[str, Dict[str, float]]:
+    """Palier → coups, part des coups, CPU-ms total et moyen."""
+    total = sum(n for n, _ in _EFFORT.values()) or 1
+    return {t: {"moves": n, "share": n / total, "cpu_ms": ms,
+                "ms_per_move": ms / n if n else 0.0}
+            for t, (n, ms) in _EFFORT.items()}
+
+# ────────────────────────────────────────────────────────────────────────────
+def classify(raw: int) -> str:
+    empty, distinct, merges = danger_features(np.uint64(raw))
+    if empty <= CRIT_EMPTIES and merges <= CRIT_MERGES:
+        return "critical"
+    if empty >= CALM_EMPTIES:
+        return "calm"
+    # peu de place, ou aucune fusion ni paire possible : prudence
+    if empty <= TIGHT_EMPTIES or (merges == 0 and distinct == 16 - empty):
+        return "tight"
+    return "normal"
+
+
+def effort(raw: int, depth: int, time_limit_ms: int) -> Tuple[str, int, int]:
+    """(palier, profondeur, budget ms) pour la grille *raw*."""
+    tier = classify(raw)
+    dd, k = TIERS[tier]
+    return (tier, max(1, min(MAX_DEPTH, depth + dd)),
+            max(1, int(round(time_limit_ms * k))))
+
+
+def adaptive_best_move(board, depth: int = 3, time_limit_ms: int = 60) -> str:
+    """best_move BEPP avec profondeur / budget ajustés au danger de la position."""
+    tier, d, ms = effort(board.raw, depth, time_limit_ms)
+    t0 = time.process_time()
+    mv = best_move(board, d, ms)
+    rec = _EFFORT[tier]
+    rec[0] += 1
+    rec[1] += (time.process_time() - t0) * 1000
+    return mv
@@ -0,0 +1,249 @@
+# search/afterstate.py
+"""
+Expectimax BEPP sur les après-états (grille après le glissement, avant
+l'apparition), en entiers 64 bits au lieu d'objets Board.
+
+• Nœud MAX : les 4 glissements par LUT de lignes (colonnes : transposition
+  puis LUT « étalée » en colonne), sans clone, hash ni appel Numba.
+• Nœud CHANCE = un après-état.  Son espérance va dans un cache dédié
+  (après-état → profondeur, valeur) : un même après-état atteint depuis
+  plusieurs parents n'est développé qu'une fois, et jamais confondu avec une
+  grille MAX.
+• Cases vides : bit-scan (x & -x) du masque des quartets nuls, sans tuples.
+
+Même parcours et mêmes paramètres que search/expectimax.best_move (θ cumulé,
+faisceau k, coupure α des nœuds chance, mode clairsemé, approfondissement
+itératif, mêmes opérations flottantes) : à profondeur égale, sans dépassement
+du budget, le coup choisi est le même.  Une espérance interrompue par α n'est
+qu'une borne, gardée à part (cf. _searcher).  Un dépassement du budget
+abandonne l'itération en cours.
+
+    python bench_search.py --afterstate --depth 2 3 4   # vs best_move
+"""
+
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from board import Board, ROW_EMPTY, ROW_LEFT, ROW_RIGHT
+from eval.heuristics import bounded_eval
+from search import expectimax
+
+DIRECTIONS = expectimax.DIRECTIONS          # même ordre ⇒ mêmes égalités
+
+# ─────────────────────────────── LUT Python ────────────────────────────────
+def _spread(rows: np.ndarray) -> List[int]:
+    """Ligne 16 bits → mêmes quartets en colonne (quartet i au bit 16·i)."""
+    r = rows.astype(np.uint64)
+    return (((r & 0xF) | ((r & 0xF0) << 12) | ((r & 0xF00) << 24)
+             | ((r & 0xF000) << 36))).tolist()
+
+_LEFT, _RIGHT = ROW_LEFT.tolist(), ROW_RIGHT.tolist()
+_UP, _DOWN    = _spread(ROW_LEFT), _spread(ROW_RIGHT)
+_ROW_EMPTY    = ROW_EMPTY.tolist()
+_ROW_MAX      = ((np.arange(1 << 16)[:, None] >> np.array([0, 4, 8, 12])) & 0xF
+                 ).max(axis=1).tolist()
+# bounded_eval(cases vides e, exposant max m), mêmes opérations flottantes
+_EVAL = [[0.6 * (e / 16.0) + 0.4 * (m / 16.0) for m in range(16)] for e in range(17)]
+_NIB_LOW = 0x1111_1111_1111_1111
+
+
+def _transpose(x: int) -> int:
+    a1 = x & 0xF0F0_0F0F_F0F0_0F0F
+    a2 = x & 0x0000_F0F0_0000_F0F0
+    a3 = x & 0x0F0F_0000_0F0F_0000
+    a  = a1 | (a2 << 12) | (a3 >> 12)
+    b1 = a & 0xFF00_FF00_00FF_00FF
+    b2 = a & 0x00FF_00FF_0000_0000
+    b3 = a & 0x0000_0000_FF00_FF00
+    return b1 | (b2 >> 24) | (b3 << 24)
+
+
+def afterstates(b: int) -> List[Tuple[str, int]]:
+    """[(direction, après-état)] des coups légaux, dans l'ordre de DIRECTIONS."""
+    r0, r1, r2, r3 = b & 0xFFFF, (b >> 16) & 0xFFFF, (b >> 32) & 0xFFFF, b >> 48
+    t = _transpose(b)
+    c0, c1, c2, c3 = t & 0xFFFF, (t >> 16) & 0xFFFF, (t >> 32) & 0xFFFF, t >> 48
+    out = []
+    a = _UP[c0] | (_UP[c1] << 4) | (_UP[c2] << 8) | (_UP[c3] << 12)
+    if a != b:
+        out.append(("up", a))
+    a = _DOWN[c0] | (_DOWN[c1] << 4) | (_DOWN[c2] << 8) | (_DOWN[c3] << 12)
+    if a != b:
+        out.append(("down", a))
+    a = _LEFT[r0] | (_LEFT[r1] << 16) | (_LEFT[r2] << 32) | (_LEFT[r3] << 48)
+    if a != b:
+        out.append(("left", a))
+    a = _RIGHT[r0] | (_RIGHT[r1] << 16) | (_RIGHT[r2] << 32) | (_RIGHT[r3] << 48)
+    if a != b:
+        out.append(("right", a))
+    return out
+
+
+def empty_shifts(b: int) -> List[int]:
+    """Décalages (4 · case) des cases vides, par ordre croissant (bit-scan)."""
+    z = b | (b >> 1)
+    z = ~(z | (z >> 2)) & _NIB_LOW
+    out = []
+    while z:
+        low = z & -z
+        out.append(low.bit_length() - 1)
+        z ^= low
+    return out
+
+
+def bounded_eval_raw(b: int) -> float:
+    """bounded_eval sur l'entier brut (valeur identique au bit près)."""
+    r0, r1, r2, r3 = b & 0xFFFF, (b >> 16) & 0xFFFF, (b >> 32) & 0xFFFF, b >> 48
+    return _EVAL[_ROW_EMPTY[r0] + _ROW_EMPTY[r1] + _ROW_EMPTY[r2] + _ROW_EMPTY[r3]][
+        max(_ROW_MAX[r0], _ROW_MAX[r1], _ROW_MAX[r2], _ROW_MAX[r3])]
+
+
+def _raw_eval(eval_fn: Callable[[Board], float]) -> Callable[[int], float]:
+    """Adapte un eval_fn « Board » aux entiers bruts (une grille réutilisée)."""
+    b = Board.__new__(Board)
+    b._rng = None
+
+    def _fn(raw: int) -> float:
+        b._b = np.uint64(raw)
+        return eval_fn(b)
+    return _fn
+
+# ─────────────────────────── compteurs (benchmarks) ─────────────────────────
+_STATS = {"nodes": 0, "cut": 0, "hits": 0}   # nœuds / coupes θ / cache chance
+
+def reset_search_stats() -> None:
+    for k in _STATS:
+        _STATS[k] = 0
+
+def search_stats() -> Dict[str, int]:
+    return dict(_STATS)
+
+# ────────────────────────────────────────────────────────────────────────────
+class _Timeout(Exception):
+    pass
+
+
+def afterstate_best_move(board: Board,
+                         depth: int,
+                         time_limit_ms: int,
+                         eval_fn: Optional[Callable[[Board], float]] = None
+                         ) -> str:
+    """Même contrat que expectimax.best_move, sur les après-états."""
+    leaf = bounded_eval_raw if eval_fn in (None, bounded_eval) else _raw_eval(eval_fn)
+    deadline = time.time() + time_limit_ms / 1000.0
+    chance = _searcher(leaf, {}, deadline)
+    root = board.raw
+
+    best_dir, best_val = None, float("-inf")
+    for d in range(1, depth + 1):
+        if time.time() >= deadline:
+            break
+        moves = [(leaf(a), dir_, a) for dir_, a in afterstates(root)]
+        moves.sort(reverse=True, key=lambda t: t[0])
+        try:
+            for _, dir_, a in moves[:expectimax.BEAM_K]:
+                val = chance(a, d - 1, float("-inf"), 1.0)
+                if val > best_val:
+                    best_val, best_dir = val, dir_
+        except _Timeout:
+            break
+        if time.time() >= deadline:
+            break
+
+    return best_dir or "up"
+
+
+def _searcher(leaf: Callable[[int], float], cache: Dict[int, Tuple[int, float]],
+              deadline: float) -> Callable[[int, int, float, float], float]:
+    """
+    Fonctions récursives MAX / CHANCE.  *cache* : après-état → (profondeur,
+    espérance), servie pour toute profondeur ≤ (comme la TT de best_move,
+    d'une itération à l'autre).  Une espérance coupée par α n'est qu'une
+    borne : elle va dans *bounds* (profondeur, majorant, valeur partielle) et
+    n'est resservie que si le majorant reste sous l'α du nouveau parent.
+    """
+    stats = _STATS
+    bounds: Dict[int, Tuple[int, float, float]] = {}
+    max_cache: Dict[int, Tuple[int, float]] = {}
+    theta, v_max = expectimax.PROB_CUTOFF, expectimax.V_MAX
+    sparse, sparse_k = expectimax.SPARSE_EMPTIES, expectimax.SPARSE_K
+
+    def max_node(b: int, depth: int, alpha: float, prob: float) -> float:
+        stats["nodes"] += 1
+        if depth == 0:
+            return leaf(b)
+        hit = max_cache.get(b)
+        if hit is not None and hit[0] >= depth:
+            return hit[1]
+        alpha_in, best, moved = alpha, float("-inf"), False
+        for _, a in afterstates(b):
+            moved = True
+            val = chance(a, depth - 1, alpha, prob)
+            if val > best:
+                best = val
+            if val > alpha:
+                alpha = val
+        if not moved:
+            return leaf(b)                          # grille bloquée : feuille
+        if best >= alpha_in:                        # sinon : fils tous coupés, borne
+            max_cache[b] = (depth, best)
+        return best
+
+    def chance(a: int, depth: int, alpha: float, prob: float) -> float:
+        stats["nodes"] += 1
+        if not stats["nodes"] & 0xFF and time.time() >= deadline:
+            raise _Timeout
+        if depth == 0:
+            return leaf(a)
+        hit = cache.get(a)
+        if hit is not None and hit[0] >= depth:
+            stats["hits"] += 1
+            return hit[1]
+        bound = bounds.get(a)
+        if bound is not None and bound[0] >= depth and bound[1] < alpha:
+            stats["hits"] += 1
+            return bound[2]
+
+        shifts = empty_shifts(a)                    # jamais vide : a a bougé
+        if sparse and len(shifts) >= sparse:
+            cells = _stratified(shifts, a, sparse_k)
+        else:
+            cell_p = 1.0 / len(shifts)
+            cells = [(sh, cell_p) for sh in shifts]
+
+        running, p_seen = 0.0, 0.0
+        for sh, cell_p in cells:
+            for tile, p_tile in ((1 << sh, 0.9), (2 << sh, 0.1)):
+                p = cell_p * p_tile
+                if prob * p < theta:
+                    stats["cut"] += 1
+                    val = leaf(a | tile)
+                else:
+                    val = max_node(a | tile, depth - 1, alpha, prob * p)
+                running += p * val
+                p_seen  += p
+                upper = running + (1 - p_seen) * v_max
+                if upper < alpha:                   # on ne battra jamais α
+                    bounds[a] = (depth, upper, running / p_seen)
+                    return running / p_seen
+        val = running / p_seen
+        cache[a] = (depth, val)
+        return val
+
+    return chance
+
+
+def _stratified(shifts: List[int], key: int, k: int) -> List[Tuple[int, float]]:
+    """expectimax._stratified_cells sur des décalages (même échantillon)."""
+    n = len(shifts)
+    k = min(k, n)
+    out = []
+    for s in range(k):
+        if s % 12 == 0:                 # 12 tirages de 5 bits par hash 64 bits
+            h = ((key + s // 12) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+        lo, hi = s * n // k, (s + 1) * n // k
+        pick   = lo + ((h >> (5 * (s % 12))) & 0x1F) % (hi - lo)
+        out.append((shifts[pick], (hi - lo) / n))
+    return out
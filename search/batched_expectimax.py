@@ -0,0 +1,157 @@
+# search/batched_expectimax.py
+"""
+Expectimax BEPP à évaluation **par lot** des feuilles.
+
+Pour les évaluateurs coûteux à l'appel (modèle sklearn, réseau n-tuple…) :
+    1. on développe tout l'arbre jusqu'à la profondeur cible (DAG : un nœud
+       par (grille, profondeur restante, type), feuilles dédupliquées) ;
+    2. toutes les grilles feuilles partent en UN appel batch_eval(uint64[n]) ;
+    3. les valeurs remontent par les nœuds MAX / CHANCE.
+
+Mêmes paramètres que search/expectimax (θ cumulé, faisceau k, mode
+clairsemé), mais sans coupure α : la valeur d'une branche n'est connue
+qu'après l'évaluation du lot.
+"""
+
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from board import Board, move_board, can_move
+from eval.heuristics import bounded_eval_batch
+from search import expectimax
+
+BatchEval = Callable[[np.ndarray], np.ndarray]
+
+DIRECTIONS = expectimax.DIRECTIONS
+_DIR_ID    = {"left": 0, "right": 1, "up": 2, "down": 3}
+
+
+def batched(eval_fn: Callable[[Board], float]) -> BatchEval:
+    """Adapte un eval_fn « une grille » en évaluateur par lot (tests, compat)."""
+    def _fn(raws: np.ndarray) -> np.ndarray:
+        b = Board.__new__(Board)
+        out = np.empty(len(raws), dtype=np.float64)
+        for i, raw in enumerate(raws):
+            b._b = np.uint64(raw)
+            out[i] = eval_fn(b)
+        return out
+    return _fn
+
+# ────────────────────────────────────────────────────────────────────────────
+def best_move_batched(board: Board,
+                      depth: int,
+                      time_limit_ms: int,
+                      batch_eval: Optional[BatchEval] = None) -> str:
+    """Approfondissement itératif ; garde le coup de la dernière passe complète."""
+    batch_eval = batch_eval or bounded_eval_batch
+    deadline   = time.time() + time_limit_ms / 1000.0
+    best_dir   = None
+
+    for d in range(1, depth + 1):
+        vals = _root_values(board.raw, d, batch_eval, deadline)
+        if vals is None:          # passe interrompue par le budget
+            break
+        if vals:
+            best_dir = max(vals, key=vals.get)
+        if time.time() >= deadline:
+            break
+
+    return best_dir or "up"
+
+
+def _root_values(root: int, depth: int, batch_eval: BatchEval,
+                 deadline: float) -> Optional[Dict[str, float]]:
+    """Valeur de chaque coup du faisceau à profondeur *depth* (None si hors délai)."""
+    # ---- BEAM : les fils directs sont triés par un premier petit lot ------
+    first: List[Tuple[str, int]] = []
+    for dir_ in DIRECTIONS:
+        nb_, _, moved = move_board(np.uint64(root), np.int8(_DIR_ID[dir_]))
+        if moved:
+            first.append((dir_, int(nb_)))
+    if not first:
+        return {}
+    prior = batch_eval(np.array([r for _, r in first], dtype=np.uint64))
+    order = sorted(range(len(first)), key=lambda i: -prior[i])[:expectimax.BEAM_K]
+
+    # ---- développement du DAG en largeur ----------------------------------
+    # enfant >= 0 : id de nœud interne ; enfant < 0 : ~index de feuille
+    is_max: List[bool] = []
+    spans:  List[Tuple[int, int]] = []
+    e_child: List[int] = []
+    e_w:     List[float] = []
+    leaves:  List[int] = []
+    leaf_of: Dict[int, int] = {}
+    memo:    Dict[Tuple[int, int, bool], int] = {}
+    queue = deque()
+
+    def leaf(raw: int) -> int:
+        i = leaf_of.get(raw)
+        if i is None:
+            i = leaf_of[raw] = len(leaves)
+            leaves.append(raw)
+        return ~i
+
+    def node(raw: int, d: int, maximizing: bool, prob: float) -> int:
+        if d == 0 or (maximizing and not can_move(np.uint64(raw))):
+            return leaf(raw)
+        k = (raw, d, maximizing)
+        nid = memo.get(k)
+        if nid is None:
+            nid = memo[k] = len(is_max)
+            is_max.append(maximizing)
+            spans.append((0, 0))
+            queue.append((nid, raw, d, prob))
+        return nid
+
+    roots = [(first[i][0], node(first[i][1], depth - 1, False, 1.0)) for i in order]
+
+    n_done = 0
+    while queue:
+        nid, raw, d, prob = queue.popleft()
+        start = len(e_child)
+        if is_max[nid]:
+            for dir_id in range(4):
+                nb_, _, moved = move_board(np.uint64(raw), np.int8(dir_id))
+                if moved:
+                    e_child.append(node(int(nb_), d - 1, False, prob))
+                    e_w.append(1.0)
+        else:
+            empties = [(p // 4, p % 4) for p in range(16) if not (raw >> (4 * p)) & 0xF]
+            if expectimax.SPARSE_EMPTIES and len(empties) >= expectimax.SPARSE_EMPTIES:
+                cells = expectimax._stratified_cells(empties, raw)
+            else:
+                cells = [(rc, 1.0 / len(empties)) for rc in empties]
+            for (r, c), cell_p in cells:
+                pos = 4 * (4 * r + c)
+                for exp, p_tile in ((1, 0.9), (2, 0.1)):
+                    p, child = cell_p * p_tile, raw | (exp << pos)
+                    if prob * p < expectimax.PROB_CUTOFF:
+                        e_child.append(leaf(child))
+                    else:
+                        e_child.append(node(child, d - 1, True, prob * p))
+                    e_w.append(p)
+        spans[nid] = (start, len(e_child))
+        n_done += 1
+        if n_done % 256 == 0 and time.time() >= deadline:
+            return None
+
+    # ---- un seul appel d'évaluation pour toutes les feuilles --------------
+    leaf_val = np.asarray(batch_eval(np.array(leaves, dtype=np.uint64)),
+                          dtype=np.float64)
+    expectimax._STATS["nodes"] += len(is_max) + len(leaves)
+
+    # ---- remontée : les fils ont toujours un id > parent ------------------
+    val = np.empty(len(is_max), dtype=np.float64)
+    for nid in range(len(is_max) - 1, -1, -1):
+        s, e = spans[nid]
+        vs = [val[c] if c >= 0 else leaf_val[~c] for c in e_child[s:e]]
+        if is_max[nid]:
+            val[nid] = max(vs)
+        else:
+            w = e_w[s:e]
+            val[nid] = sum(wi * vi for wi, vi in zip(w, vs)) / sum(w)
+
+    return {dir_: (val[c] if c >= 0 else leaf_val[~c]) for dir_, c in roots}
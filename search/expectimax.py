@@ -4,6 +4,11 @@ Expectimax + B.E.P.P. (Bounded Expectation & Probability Pruning)
 
 Nouveautés :
 • set_bepp_params(prob_cutoff, beam_k) ⇒ modifie les bornes à chaud
+• θ porte sur la probabilité *cumulée* du chemin (case × valeur de tuile) :
+  une branche sous θ est évaluée statiquement au lieu d'être développée.
+• mode chance clairsemé : à partir de SPARSE_EMPTIES cases vides, seules
+  SPARSE_K cases (une par strate) sont développées, pondérées par la taille
+  de leur strate → espérance non biaisée.
 """
 
 import time, random
@@ -13,21 +18,41 @@ from board import Board
 from eval.heuristics import bounded_eval
 
 # ─────────────────────── paramètres B.E.P.P. (modifiables) ─────────────────
-PROB_CUTOFF = 0.02   # θ : probabilité minimale développée à un nœud chance
+PROB_CUTOFF = 1e-3   # θ : probabilité cumulée minimale d'un chemin développé
 BEAM_K      = 4      # nombre max de directions MAX gardées après tri
+SPARSE_EMPTIES = 0   # nb de cases vides à partir duquel on échantillonne (0 = off)
+SPARSE_K       = 6   # nb de cases (strates) développées en mode clairsemé
 V_MIN, V_MAX = 0.0, 1.0   # domaine de bounded_eval (toujours 0-1)
 
 def set_bepp_params(*, prob_cutoff: float | None = None,
-                    beam_k: int | None = None) -> None:
-    """Permet de changer θ et/ou k depuis un autre module (argparse)."""
-    global PROB_CUTOFF, BEAM_K
+                    beam_k: int | None = None,
+                    sparse_empties: int | None = None,
+                    sparse_k: int | None = None) -> None:
+    """Permet de changer θ, k et le mode clairsemé depuis un autre module."""
+    global PROB_CUTOFF, BEAM_K, SPARSE_EMPTIES, SPARSE_K
     if prob_cutoff is not None:
         PROB_CUTOFF = max(0.0, min(1.0, float(prob_cutoff)))
     if beam_k is not None and beam_k >= 1:
         BEAM_K = int(beam_k)
+    if sparse_empties is not None:
+        SPARSE_EMPTIES = max(0, int(sparse_empties))
+    if sparse_k is not None and sparse_k >= 1:
+        SPARSE_K = int(sparse_k)
+
+# ─────────────────────────── compteurs (benchmarks) ─────────────────────────
+_STATS = {"nodes": 0, "cut": 0}   # nœuds visités / branches coupées par θ
+
+def reset_search_stats() -> None:
+    for k in _STATS:
+        _STATS[k] = 0
+
+def search_stats() -> Dict[str, int]:
+    """Copie des compteurs depuis le dernier reset_search_stats()."""
+    return dict(_STATS)
 
 # ────────────────────────────────────────────────────────────────────────────
 DIRECTIONS = ["up", "down", "left", "right"]
+_CHANCE_SALT = 0xC6A4A7935BD1E995     # clé TT des nœuds CHANCE : hash ^ sel
 
 def best_move(board: Board,
               depth: int,
@@ -38,6 +63,7 @@ def best_move(board: Board,
     eval_fn  = eval_fn or bounded_eval
     deadline = time.time() + time_limit_ms / 1000.0
     tt: Dict[int, Tuple[int, float]] = {}
+    bounds: Dict[int, Tuple[int, float, float]] = {}
 
     best_dir, best_val = None, float("-inf")
 
@@ -58,7 +84,7 @@ def best_move(board: Board,
         for _, dir_, child in moves:
             val = _expectimax(child, d - 1, False,
                               -float("inf"), float("inf"),
-                              eval_fn, tt, deadline)
+                              eval_fn, tt, deadline, bounds=bounds)
             if val > best_val:
                 best_val, best_dir = val, dir_
 
@@ -75,65 +101,104 @@ def _expectimax(board: Board,
                 beta: float,
                 eval_fn: Callable[[Board], float],
                 tt: Dict[int, Tuple[int, float]],
-                deadline: float) -> float:
-
+                deadline: float,
+                prob: float = 1.0,
+                bounds: Optional[Dict[int, Tuple[int, float, float]]] = None
+                ) -> float:
+    """
+    *prob* : probabilité cumulée du chemin racine → nœud courant.
+    *bounds* : nœuds coupés par α (profondeur, majorant, valeur partielle),
+    hors de *tt* : resservis seulement si le majorant reste sous α.
+    """
+    if bounds is None:
+        bounds = {}
+    _STATS["nodes"] += 1
     if time.time() >= deadline:
         return eval_fn(board)
 
+    # une grille peut être à la fois nœud MAX et après-état (nœud CHANCE) :
+    # deux valeurs différentes, donc deux clés
     key = hash(board)
-    if key in tt:
-        saved_d, val = tt[key]
+    tt_key = key if maximizing else key ^ _CHANCE_SALT
+    if tt_key in tt:
+        saved_d, val = tt[tt_key]
         if saved_d >= depth:
             return val
+    bound = bounds.get(tt_key)
+    if bound is not None and bound[0] >= depth and bound[1] < alpha:
+        return bound[2]
 
     # feuille ?
     if depth == 0 or not board.can_move():
         val = eval_fn(board)
-        tt[key] = (depth, val)
+        tt[tt_key] = (depth, val)
         return val
 
     # ─────────── Max ───────────
     if maximizing:
-        best = float("-inf")
+        alpha_in, best = alpha, float("-inf")
         for dir_ in DIRECTIONS:
             tmp = board.clone()
             if not tmp.move(dir_, add_random=False)[0]:
                 continue
             val = _expectimax(tmp, depth - 1, False,
                               alpha, beta,
-                              eval_fn, tt, deadline)
+                              eval_fn, tt, deadline, prob, bounds)
             best = max(best, val)
             alpha = max(alpha, val)
             if beta <= alpha:
                 break
-        tt[key] = (depth, best)
+        if best >= alpha_in:                     # sinon : fils tous coupés, borne
+            tt[tt_key] = (depth, best)
         return best
 
     # ─────────── Chance ─────────
     running, p_seen = 0.0, 0.0
     empties = board.get_empty_cells()
-
-    for (r, c) in empties:         # ordre séquentiel - reproductible
-        for exp, prob in ((1, 0.9), (2, 0.1)):  # 2 avant 4
-            if prob < PROB_CUTOFF:
-                running += prob * eval_fn(board)
-                p_seen  += prob
-                continue
-
+    if SPARSE_EMPTIES and len(empties) >= SPARSE_EMPTIES:
+        cells = _stratified_cells(empties, key)
+    else:
+        cells = [(rc, 1.0 / len(empties)) for rc in empties]
+
+    for (r, c), cell_p in cells:   # ordre séquentiel - reproductible
+        for exp, p_tile in ((1, 0.9), (2, 0.1)):  # 2 avant 4
+            p   = cell_p * p_tile
             tmp = board.clone()
             tmp.set_tile(r, c, exp)
-            val = _expectimax(tmp, depth - 1, True,
-                              alpha, beta,
-                              eval_fn, tt, deadline)
-            running += prob * val
-            p_seen  += prob
+            if prob * p < PROB_CUTOFF:          # chemin trop improbable
+                _STATS["cut"] += 1
+                val = eval_fn(tmp)
+            else:
+                val = _expectimax(tmp, depth - 1, True,
+                                  alpha, beta,
+                                  eval_fn, tt, deadline, prob * p, bounds)
+            running += p * val
+            p_seen  += p
 
             upper = running + (1 - p_seen) * V_MAX
-            if upper < alpha:
-                break   # on ne battra jamais α
-        if upper < alpha:
-            break
+            if upper < alpha:   # on ne battra jamais α : moyenne partielle = borne
+                bounds[tt_key] = (depth, upper, running / p_seen)
+                return running / p_seen
 
     expected = running / p_seen if p_seen else eval_fn(board)
-    tt[key] = (depth, expected)
+    tt[tt_key] = (depth, expected)
     return expected
+
+
+def _stratified_cells(empties: List[Tuple[int, int]],
+                      key: int) -> List[Tuple[Tuple[int, int], float]]:
+    """
+    Découpe *empties* en SPARSE_K strates contiguës et garde une case par
+    strate, pondérée par |strate| / |empties|.  Le choix dans la strate est
+    dérivé du hash de la grille : même grille ⇒ même échantillon (TT cohérente).
+    """
+    n = len(empties)
+    k = min(SPARSE_K, n)
+    out = []
+    for s in range(k):
+        if s % 12 == 0:                 # 12 tirages de 5 bits par hash 64 bits
+            h = ((key + s // 12) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+        lo, hi = s * n // k, (s + 1) * n // k
+        pick   = lo + ((h >> (5 * (s % 12))) & 0x1F) % (hi - lo)
+        out.append((empties[pick], (hi - lo) / n))
+    return out
@@ -29,7 +29,7 @@ def _add_random_tile(b: nb.uint64) -> nb.uint64:
     return b | (nb.uint64(val) << (sel * 4))
 
 # ──────────────────────────────────────────────────────────────────────────
-@nb.njit(parallel=True, fastmath=True)
+@nb.njit(parallel=True, fastmath=True, cache=True)
 def _rollout_value(b_raw: nb.uint64, depth: int, k: int) -> float:
     """Valeur moyenne de k roll-outs aléatoires (score = cases vides)."""
     total = 0.0
@@ -0,0 +1,291 @@
+# search/mcts.py
+"""
+MCTS « chance-aware » pour 2048 (UCT sur afterstates, Numba).
+
+Arbre à deux types de nœuds, stockés dans un pool de tableaux plats :
+    • DÉCISION  : grille avant le coup      → fils = 4 afterstates (UCT)
+    • AFTERSTATE: grille après le coup,      → fils = tirage (case, 2|4)
+                  avant l'apparition          échantillonné selon la vraie loi
+Les roll-outs réutilisent move_board de board.py.
+
+Parallélisme d'arbre : chaque thread Python appelle _iterate (nogil) sur le
+même arbre (racine en 0) et alloue ses nœuds dans sa propre tranche du pool.
+Les mises à jour partagées sont atomiques (instructions LLVM atomicrmw /
+cmpxchg, via _fetch_add / _cas) :
+    • perte virtuelle : la visite d'un nœud est comptée à la descente
+      (fetch-add) et sa récompense seulement à la remontée, donc un chemin en
+      cours paraît perdant (0) aux autres threads, qui s'en écartent ;
+    • le premier thread qui atteint une feuille (ancien compte 0) fait le
+      roll-out, les suivants continuent de descendre ;
+    • un nouveau fils est publié par compare-and-swap sur child[node, k] ;
+      le perdant rend le nœud alloué à sa tranche et suit celui du gagnant.
+Chaque itération ajoute donc exactement une visite à chaque nœud de son
+chemin, quel que soit le nombre de threads.  Recherche « anytime » : on itère
+par paquets jusqu'à la fin du budget time_limit_ms.
+"""
+
+import threading, time
+import numpy as np
+import numba as nb
+from numba import types
+from numba.core import cgutils
+from numba.extending import intrinsic
+
+from board import move_board
+
+# ─────────────────────── paramètres (modifiables) ──────────────────────────
+THREADS   = 1        # threads de recherche (même arbre)
+C_UCT     = 0.5      # constante d'exploration (récompenses dans [0 ; 1])
+HORIZON   = 24       # coups aléatoires par roll-out
+POOL_SIZE = 1 << 17  # nœuds max par recherche (toutes tranches confondues)
+BATCH     = 64       # itérations par appel JIT (granularité du budget temps)
+
+_FREE, _ILLEGAL = -1, -2
+_MAX_PATH = 128
+
+def set_mcts_params(*, threads: int | None = None, c_uct: float | None = None,
+                    horizon: int | None = None) -> None:
+    """Permet de changer threads / c / horizon depuis un autre module (argparse)."""
+    global THREADS, C_UCT, HORIZON
+    if threads is not None and threads >= 1:
+        THREADS = int(threads)
+    if c_uct is not None and c_uct >= 0:
+        C_UCT = float(c_uct)
+    if horizon is not None and horizon >= 0:
+        HORIZON = int(horizon)
+
+# ──────────────────────────────── atomiques ────────────────────────────────
+def _item_ptr(context, builder, aryty, ary, idx):
+    a = context.make_array(aryty)(context, builder, ary)
+    return cgutils.get_item_pointer(context, builder, aryty, a, idx)
+
+
+@intrinsic
+def _fetch_add(typingctx, arr, i, val):
+    """arr[i] += val atomiquement (entier ou flottant) ; renvoie l'ancienne valeur."""
+    sig = arr.dtype(arr, types.intp, arr.dtype)
+
+    def codegen(context, builder, sig, args):
+        ptr = _item_ptr(context, builder, sig.args[0], args[0], [args[1]])
+        op = "fadd" if isinstance(sig.args[0].dtype, types.Float) else "add"
+        return builder.atomic_rmw(op, ptr, args[2], "seq_cst")
+    return sig, codegen
+
+
+@intrinsic
+def _cas(typingctx, arr, i, j, old, new):
+    """Si arr[i, j] == old alors arr[i, j] = new, atomiquement ; renvoie l'ancienne valeur."""
+    sig = arr.dtype(arr, types.intp, types.intp, arr.dtype, arr.dtype)
+
+    def codegen(context, builder, sig, args):
+        ptr = _item_ptr(context, builder, sig.args[0], args[0], [args[1], args[2]])
+        res = builder.cmpxchg(ptr, args[3], args[4], "seq_cst", "seq_cst")
+        return builder.extract_value(res, 0)
+    return sig, codegen
+
+# ─────────────────────────────── kernels JIT ───────────────────────────────
+@nb.njit(inline="always")
+def _spawn(b: nb.uint64) -> nb.uint64:
+    """Ajoute 2 (90 %) ou 4 (10 %) sur une case vide aléatoire."""
+    n = 0
+    for pos in range(16):
+        if ((b >> (pos * 4)) & 0xF) == 0:
+            n += 1
+    if n == 0:
+        return b
+    pick = np.random.randint(n)
+    for pos in range(16):
+        if ((b >> (pos * 4)) & 0xF) == 0:
+            if pick == 0:
+                val = 1 if np.random.random() < 0.9 else 2
+                return b | (nb.uint64(val) << (pos * 4))
+            pick -= 1
+    return b
+
+
+@nb.njit(nogil=True, cache=True)
+def _playout(b: nb.uint64, horizon: int) -> float:
+    """
+    Roll-out aléatoire depuis la grille *b* (tuile déjà posée).
+    Récompense ∈ [0 ; 1] : ½ survie (coups joués / horizon) + ½ bounded_eval.
+    """
+    steps = 0
+    for _ in range(horizon):
+        d0 = np.random.randint(4)
+        b2, moved = b, False
+        for k in range(4):                    # 1er coup légal à partir de d0
+            b2, _, moved = move_board(b, (d0 + k) % 4)
+            if moved:
+                break
+        if not moved:
+            return 0.5 * steps / max(horizon, 1)
+        b = _spawn(b2)
+        steps += 1
+    empty, top = 0, 0
+    for pos in range(16):
+        e = (b >> (pos * 4)) & 0xF
+        if e == 0:
+            empty += 1
+        elif e > top:
+            top = e
+    return 0.5 + 0.5 * (0.6 * empty / 16.0 + 0.4 * top / 16.0)
+
+
+@nb.njit(inline="always")
+def _link(board, visits, value, child, used, tid, lo, hi, node, k, b):
+    """
+    Fils *k* de *node* : alloue un nœud (grille *b*) dans la tranche [lo, hi)
+    du thread *tid* et le publie par CAS ; si un autre thread l'a publié
+    avant, le nœud est rendu et c'est celui de l'autre thread qui est suivi.
+    """
+    n = lo + used[tid]
+    if n >= hi:
+        return _FREE                          # tranche pleine
+    board[n] = b
+    visits[n] = 0
+    value[n] = 0.0
+    child[n, :] = _FREE
+    cur = _cas(child, node, k, _FREE, n)
+    if cur != _FREE:
+        return cur                            # perdu : used[tid] inchangé
+    used[tid] += 1
+    return n
+
+
+@nb.njit(nogil=True, cache=True)
+def _iterate(board, visits, value, child, used, tid, root, lo, hi,
+             n_iter, c_uct, horizon):
+    """
+    *n_iter* itérations sélection → expansion → roll-out → remontée sur
+    l'arbre partagé de racine *root* ; le thread *tid* alloue ses nœuds dans
+    la tranche [lo, hi).
+    """
+    path = np.empty(_MAX_PATH, dtype=np.int32)
+    for _ in range(n_iter):
+        node, plen = root, 1
+        path[0] = root
+        _fetch_add(visits, root, 1)
+        reward = -1.0
+        while reward < 0.0:
+            # ─────────── DÉCISION : UCT sur les 4 afterstates ───────────
+            parent_n = visits[node]
+            best, best_s, legal = _FREE, -1.0, False
+            for d in range(4):
+                ch = child[node, d]
+                if ch == _FREE:
+                    b2, _, moved = move_board(board[node], d)
+                    if not moved:
+                        child[node, d] = _ILLEGAL     # même valeur pour tous
+                        continue
+                    ch = _link(board, visits, value, child,
+                               used, tid, lo, hi, node, d, b2)
+                    if ch == _FREE:
+                        legal = True
+                        continue
+                if ch == _ILLEGAL:
+                    continue
+                legal = True
+                n = visits[ch]
+                if n == 0:
+                    s = 1e9 - d                   # fils jamais visité d'abord
+                else:
+                    s = value[ch] / n + c_uct * np.sqrt(np.log(parent_n + 1.0) / n)
+                if s > best_s:
+                    best, best_s = ch, s
+            if best == _FREE:                     # partie perdue, ou pool plein
+                reward = _playout(board[node], horizon) if legal else 0.0
+                break
+            after = best
+            path[plen] = after; plen += 1
+            _fetch_add(visits, after, 1)          # perte virtuelle
+
+            # ─────────── CHANCE : tirage selon la loi du jeu ────────────
+            a = board[after]
+            spawned = _spawn(a)
+            diff = spawned ^ a
+            pos = 0
+            while (diff >> (pos * 4)) & 0xF == 0:
+                pos += 1
+            k = pos * 2 + int((diff >> (pos * 4)) & 0xF) - 1
+            ch = child[after, k]
+            if ch == _FREE:
+                ch = _link(board, visits, value, child,
+                           used, tid, lo, hi, after, k, spawned)
+                if ch == _FREE:                   # pool plein → roll-out direct
+                    reward = _playout(spawned, horizon)
+                    break
+            node = ch
+            path[plen] = node; plen += 1
+            first = _fetch_add(visits, node, 1) == 0   # perte virtuelle
+            if first or plen >= _MAX_PATH - 2:
+                reward = _playout(board[node], horizon)
+
+        # ───────────── remontée (visites déjà comptées) ─────────────────
+        for i in range(plen):
+            _fetch_add(value, path[i], reward)
+
+# ───────────────────────────── pool de nœuds ───────────────────────────────
+class _Pool:
+    """Tableaux plats réutilisés d'un coup à l'autre (évite 16 Mo d'allocs)."""
+
+    def __init__(self, size: int):
+        self.board  = np.zeros(size, dtype=np.uint64)
+        self.visits = np.zeros(size, dtype=np.int32)
+        self.value  = np.zeros(size, dtype=np.float64)
+        self.child  = np.full((size, 32), _FREE, dtype=np.int32)
+
+    def reset(self, node: int, root: int) -> None:
+        self.board[node], self.visits[node], self.value[node] = root, 0, 0.0
+        self.child[node, :] = _FREE
+
+
+_local = threading.local()
+
+def _pool() -> _Pool:
+    if getattr(_local, "pool", None) is None:
+        _local.pool = _Pool(POOL_SIZE)
+    return _local.pool
+
+# ────────────────────────────────────────────────────────────────────────────
+DIRECTIONS = ["left", "right", "up", "down"]      # ordre des ids move_board
+
+def mcts_best_move(board, depth: int = 0, time_limit_ms: int = 60) -> str:
+    """
+    Choisit le coup le plus visité après *time_limit_ms* de recherche.
+    *depth* est ignoré (même signature que best_move pour l'UI / le bench).
+    """
+    pool, threads = _pool(), THREADS
+    # racine partagée en 0 ; tranche d'allocation t = [lo, hi) du thread t
+    bounds = np.linspace(1, POOL_SIZE, threads + 1).astype(np.int64)
+    used   = np.zeros(threads, dtype=np.int64)
+    pool.reset(0, np.uint64(board.raw))
+    deadline = time.perf_counter() + time_limit_ms / 1000.0
+
+    def work(tid: int) -> None:
+        lo, hi = bounds[tid], bounds[tid + 1]
+        while True:
+            _iterate(pool.board, pool.visits, pool.value, pool.child,
+                     used, tid, 0, lo, hi, BATCH, C_UCT, HORIZON)
+            if time.perf_counter() >= deadline:
+                break
+
+    if threads == 1:
+        work(0)
+    else:
+        ths = [threading.Thread(target=work, args=(t,)) for t in range(threads)]
+        for th in ths: th.start()
+        for th in ths: th.join()
+
+    kids = pool.child[0, :4]
+    root_visits = np.where(kids >= 0, pool.visits[np.maximum(kids, 0)], -1)
+
+    # lignes utilisées (racine comprise) remises à FREE pour le prochain coup
+    pool.child[0] = _FREE
+    for t in range(threads):
+        pool.child[bounds[t]:bounds[t] + used[t]] = _FREE
+
+    best_dir, best_n = "up", -1
+    for d, dir_str in enumerate(DIRECTIONS):
+        if root_visits[d] >= 0 and root_visits[d] > best_n:
+            best_dir, best_n = dir_str, root_visits[d]
+    return best_dir
@@ -0,0 +1,250 @@
+"""
+shards.py – format binaire compact du dataset MoveNet
+──────────────────────────────────────────────────────────────
+Un shard = un fichier .npy d'enregistrements SHARD_DTYPE (33 octets / ligne,
+contre ~60 en CSV) lisible en mmap, sans parsing :
+
+    game   uint64   identifiant de partie (graine)
+    idx    uint32   numéro du coup
+    score  uint32   score avant le coup
+    board  uint64   grille bit-board (exposants 4 bits)
+    move   uint8    label, index dans MOVES
+    val    float32  bounded_eval de la grille
+    weight uint32   nombre de lignes représentées (1 sauf dédoublonnage)
+
+Les features MoveNet [empty_cnt, c0…c15] sont recalculées à la lecture.
+
+Dossier de génération (ShardWriter, `--bg … --shards DIR`) : chaque shard est
+écrit dans un .tmp puis renommé (os.replace), et manifest.json – remplacé de
+la même façon – liste les shards validés (parties, lignes, octets, CRC32) et la
+prochaine graine.  Un arrêt brutal perd au plus le shard en cours ; au
+redémarrage, ses propres fichiers hors manifeste (shard-NNNNNN.npy, .tmp) sont
+supprimés et la génération reprend avec des graines neuves.  Un dossier sans
+manifeste mais contenant d'autres .npy est refusé : rien d'étranger n'est effacé.
+
+    python shards.py DIR --validate    # tailles + en-têtes .npy + CRC32
+"""
+from __future__ import annotations
+import argparse, json, os, random, re, sys, time, zlib
+from pathlib import Path
+from typing import Iterator
+import numpy as np
+
+from algo.movenet import DIRS as MOVES, features_from_raw
+
+SHARD_DTYPE = np.dtype([("game", "<u8"), ("idx", "<u4"), ("score", "<u4"),
+                        ("board", "<u8"), ("move", "u1"), ("val", "<f4"),
+                        ("weight", "<u4")])
+SHARD_EXT = ".npy"
+MANIFEST = "manifest.json"
+_OWN = re.compile(r"shard-\d{6}\.npy")        # noms écrits par ShardWriter
+
+
+def empty_records(n: int) -> np.ndarray:
+    rec = np.zeros(n, dtype=SHARD_DTYPE)
+    rec["weight"] = 1
+    return rec
+
+
+def write_shard(path: str | Path, rec: np.ndarray) -> None:
+    np.save(path, np.asarray(rec, dtype=SHARD_DTYPE), allow_pickle=False)
+
+
+def load_shard(path: str | Path, mmap: bool = True) -> np.ndarray:
+    rec = np.load(path, mmap_mode="r" if mmap else None, allow_pickle=False)
+    if rec.dtype != SHARD_DTYPE:
+        raise ValueError(f"{path}: dtype {rec.dtype} ≠ SHARD_DTYPE")
+    return rec
+
+
+def shard_files(path: str | Path) -> list[Path]:
+    """
+    Un shard seul, les shards validés du manifeste, ou à défaut tous les *.npy
+    d'un dossier (ordre lexicographique).
+    """
+    path = Path(path)
+    if not path.is_dir():
+        return [path]
+    if (path / MANIFEST).exists():
+        return [path / s["file"] for s in read_manifest(path)["shards"]]
+    return sorted(path.glob("*" + SHARD_EXT))
+
+
+def iter_records(path: str | Path, chunk_rows: int) -> Iterator[np.ndarray]:
+    """Tranches d'au plus *chunk_rows* enregistrements (mmap → RAM bornée)."""
+    for f in shard_files(path):
+        rec = load_shard(f)
+        for s in range(0, len(rec), chunk_rows):
+            yield np.array(rec[s:s + chunk_rows])
+
+
+# ─────────────────────── manifeste & commit atomique ───────────────────────
+def _replace_atomic(path: Path, data: bytes) -> None:
+    """Écrit *data* dans path.tmp, fsync, puis os.replace → jamais de fichier partiel."""
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    if hasattr(os, "O_DIRECTORY"):                     # rend le renommage durable
+        fd = os.open(path.parent, os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def _npy_bytes(rec: np.ndarray) -> bytes:
+    from io import BytesIO
+    buf = BytesIO()
+    np.save(buf, np.asarray(rec, dtype=SHARD_DTYPE), allow_pickle=False)
+    return buf.getvalue()
+
+
+def file_crc32(path: str | Path, bufsize: int = 1 << 20) -> int:
+    crc = 0
+    with open(path, "rb") as f:
+        while block := f.read(bufsize):
+            crc = zlib.crc32(block, crc)
+    return crc
+
+
+def read_manifest(directory: str | Path) -> dict:
+    with open(Path(directory) / MANIFEST, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class ShardWriter:
+    """
+    Dossier de shards reprenable : les parties s'accumulent en mémoire et sont
+    validées par paquets de *games_per_shard* (shard puis manifeste, chacun
+    par os.replace).  Les graines viennent d'un compteur persistant : celles
+    des parties perdues lors d'un arrêt ne sont jamais rejouées.
+    """
+
+    def __init__(self, directory: str | Path, games_per_shard: int = 256,
+                 seed: int | None = None):
+        self.dir = Path(directory)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.games_per_shard = games_per_shard
+        if (self.dir / MANIFEST).exists():
+            self.manifest = read_manifest(self.dir)
+        else:
+            foreign = sorted(f.name for f in self.dir.glob("*" + SHARD_EXT)
+                             if not _OWN.fullmatch(f.name))
+            if foreign:
+                raise ValueError(f"{self.dir}: pas de {MANIFEST} mais des .npy étrangers "
+                                 f"({', '.join(foreign[:3])}…) : choisir un dossier vide")
+            self.manifest = {"version": 1, "dtype": SHARD_DTYPE.descr,
+                             "next_seed": random.getrandbits(63) if seed is None else int(seed),
+                             "games": 0, "rows": 0, "shards": []}
+        self.discarded = self._drop_uncommitted()
+        self._next_seed = self.manifest["next_seed"]
+        self._buf: list[np.ndarray] = []
+
+    def _drop_uncommitted(self) -> int:
+        """
+        Supprime ses propres restes d'un arrêt en plein commit : shard-NNNNNN.npy
+        absents du manifeste et leurs .tmp (manifeste compris).  Les autres
+        fichiers du dossier ne sont jamais touchés.
+        """
+        keep = {s["file"] for s in self.manifest["shards"]}
+        junk = [f for f in self.dir.iterdir()
+                if f.name == MANIFEST + ".tmp"
+                or (_OWN.fullmatch(f.name.removesuffix(".tmp")) and f.name not in keep)]
+        for f in junk:
+            f.unlink()
+        return len(junk)
+
+    @property
+    def games(self) -> int:
+        """Parties validées + en attente."""
+        return self.manifest["games"] + len(self._buf)
+
+    def reserve_seeds(self, n: int) -> list[int]:
+        seeds = [(self._next_seed + i) & (2**64 - 1) for i in range(n)]
+        self._next_seed += n
+        return seeds
+
+    def add_game(self, rec: np.ndarray) -> None:
+        self._buf.append(np.asarray(rec, dtype=SHARD_DTYPE))
+        if len(self._buf) >= self.games_per_shard:
+            self.commit()
+
+    def commit(self) -> Path | None:
+        if not self._buf:
+            return None
+        rec = np.concatenate(self._buf)
+        m = self.manifest
+        name = f"shard-{len(m['shards']):06d}{SHARD_EXT}"
+        data = _npy_bytes(rec)
+        _replace_atomic(self.dir / name, data)
+        m["shards"].append({"file": name, "games": len(self._buf), "rows": len(rec),
+                            "bytes": len(data), "crc32": zlib.crc32(data),
+                            "time": round(time.time(), 3)})
+        m["games"] += len(self._buf)
+        m["rows"] += len(rec)
+        m["next_seed"] = self._next_seed       # graines déjà distribuées : jamais reprises
+        _replace_atomic(self.dir / MANIFEST, json.dumps(m, indent=1).encode())
+        self._buf = []
+        return self.dir / name
+
+    def close(self) -> None:
+        self.commit()
+
+
+# ─────────────────────────────── validation ────────────────────────────────
+def validate(directory: str | Path, crc: bool = True) -> list[str]:
+    """
+    Vérifie chaque shard du manifeste sans le charger : taille, en-tête .npy
+    (dtype, nombre de lignes) et CRC32 → liste des problèmes (vide = OK).
+    """
+    directory = Path(directory)
+    m = read_manifest(directory)
+    problems = []
+    for s in m["shards"]:
+        f = directory / s["file"]
+        if not f.exists():
+            problems.append(f"{s['file']}: absent")
+            continue
+        if f.stat().st_size != s["bytes"]:
+            problems.append(f"{s['file']}: {f.stat().st_size} octets ≠ {s['bytes']}")
+            continue
+        with open(f, "rb") as fh:
+            try:
+                version = np.lib.format.read_magic(fh)
+                read_header = (np.lib.format.read_array_header_1_0 if version == (1, 0)
+                               else np.lib.format.read_array_header_2_0)
+                shape, _, dtype = read_header(fh)
+            except ValueError as e:
+                problems.append(f"{s['file']}: en-tête .npy illisible ({e})")
+                continue
+        if dtype != SHARD_DTYPE or shape != (s["rows"],):
+            problems.append(f"{s['file']}: en-tête {dtype} {shape} ≠ manifeste")
+        elif crc and file_crc32(f) != s["crc32"]:
+            problems.append(f"{s['file']}: CRC32 invalide")
+    if sum(s["games"] for s in m["shards"]) != m["games"] \
+            or sum(s["rows"] for s in m["shards"]) != m["rows"]:
+        problems.append(f"{MANIFEST}: totaux incohérents")
+    return problems
+
+
+if __name__ == "__main__":
+    pa = argparse.ArgumentParser()
+    pa.add_argument("dir", help="dossier de shards avec manifest.json")
+    pa.add_argument("--validate", action="store_true", help="tailles, en-têtes et CRC32")
+    pa.add_argument("--no-crc", action="store_true", help="tailles et en-têtes seulement")
+    args = pa.parse_args()
+
+    m = read_manifest(args.dir)
+    print(f"{args.dir}: {len(m['shards'])} shards · {m['games']:,} parties · "
+          f"{m['rows']:,} lignes · prochaine graine {m['next_seed']}")
+    if args.validate:
+        t0 = time.perf_counter()
+        problems = validate(args.dir, crc=not args.no_crc)
+        for p in problems:
+            print(f"⚠️  {p}")
+        if problems:
+            sys.exit(1)
+        print(f"✅ {len(m['shards'])} shards valides ({time.perf_counter() - t0:.2f}s)")
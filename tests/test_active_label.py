@@ -0,0 +1,102 @@
+import unittest
+import numpy as np
+
+import active_label as al
+from algo.movenet import DIRS, features_from_raw
+
+
+def _raw(rows):
+    raw = 0
+    for r, row in enumerate(rows):
+        for c, e in enumerate(row):
+            raw |= e << (4 * (4 * r + c))
+    return raw
+
+
+class _Clf:
+    """predict_proba constant, classes en str dans le désordre."""
+    classes_ = np.array(["right", "up", "left", "down"])
+
+    def __init__(self, p):
+        self.p = np.asarray(p, dtype=float)
+
+    def predict_proba(self, X):
+        return np.tile(self.p, (len(X), 1))
+
+
+class _TableClf:
+    """predict_proba par grille (table grille → probabilités, colonnes DIRS)."""
+    classes_ = np.array(DIRS)
+
+    def __init__(self, table):
+        raws = np.array(list(table), dtype=np.uint64)
+        self.rows = {tuple(f): np.asarray(p, dtype=float)
+                     for f, p in zip(features_from_raw(raws), table.values())}
+
+    def predict_proba(self, X):
+        return np.array([self.rows[tuple(f)] for f in X])
+
+
+class _Net(al.MoveNet):
+    def __init__(self, p):
+        self.clf = _TableClf(p) if isinstance(p, dict) else _Clf(p)
+
+
+class ActiveLabelTest(unittest.TestCase):
+    def test_proba_columns_follow_dirs(self):
+        p = al.policy_proba(_Net([0.1, 0.2, 0.3, 0.4]), [1, 2])
+        np.testing.assert_allclose(p[0], [0.2, 0.4, 0.3, 0.1])     # up, down, left, right
+        self.assertEqual(DIRS, ["up", "down", "left", "right"])
+
+    def test_legal_mask_and_forced_move(self):
+        # colonne de gauche pleine, tuiles distinctes : seul « right » est légal
+        raw = _raw([[1, 0, 0, 0], [2, 0, 0, 0], [3, 0, 0, 0], [4, 0, 0, 0]])
+        legal = al.legal_mask([raw])
+        self.assertEqual(legal[0].tolist(), [False, False, False, True])
+        top, margin = al.uncertainty(np.array([[0.7, 0.1, 0.1, 0.1]]), legal)
+        self.assertEqual(DIRS[top[0]], "right")
+        self.assertEqual(margin[0], 1.0)                         # jamais étiqueté
+
+    def test_select_budget_and_order(self):
+        margin = np.array([0.5, 0.05, 0.15, 0.9, 0.01])
+        disagree = np.array([False, False, False, True, False])
+        self.assertEqual(al.select(margin, disagree, 10).tolist(), [3, 4, 1, 2])
+        self.assertEqual(al.select(margin, disagree, 2).tolist(), [3, 4])
+
+    def test_select_exact_boards_from_models(self):
+        # une tuile au centre : les 4 coups sont légaux, marge = top1 − top2
+        b = {v: _raw([[0, 0, 0, 0], [0, v, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0]])
+             for v in range(1, 8)}
+        cur = {b[1]: [0.40, 0.30, 0.20, 0.10],      # marge 0.10
+               b[2]: [0.70, 0.10, 0.10, 0.10],      # 0.60, désaccord
+               b[3]: [0.31, 0.30, 0.20, 0.19],      # 0.01
+               b[4]: [0.10, 0.15, 0.45, 0.30],      # 0.15
+               b[5]: [0.05, 0.05, 0.10, 0.80],      # 0.70, désaccord
+               b[6]: [0.27, 0.25, 0.24, 0.24],      # 0.02
+               b[7]: [0.90, 0.05, 0.03, 0.02]}      # sûr, d'accord : jamais
+        prev = dict(cur)
+        prev[b[2]], prev[b[5]] = [0.10, 0.10, 0.10, 0.70], [0.70, 0.10, 0.10, 0.10]
+        raws = np.array(list(cur), dtype=np.uint64)
+        legal = al.legal_mask(raws)
+        top, margin = al.uncertainty(al.policy_proba(_Net(cur), raws), legal)
+        disagree = al.uncertainty(al.policy_proba(_Net(prev), raws), legal)[0] != top
+        pick = lambda n: [int(raws[i]) for i in al.select(margin, disagree, n)]
+        self.assertEqual(pick(10), [b[2], b[5], b[3], b[6], b[1], b[4]])
+        self.assertEqual(pick(3), [b[2], b[5], b[3]])
+        self.assertEqual(pick(0), [])
+
+    def test_self_play_uncertain_model(self):
+        res = al.self_play(_Net([0.26, 0.25, 0.25, 0.24]), [1, 2], max_moves=20)
+        pos = res["pos"]
+        self.assertEqual(len(pos["board"]), 40)
+        # marge attendue, recalculée sur les coups légaux de chaque grille
+        p = dict(zip(["right", "up", "left", "down"], [0.26, 0.25, 0.25, 0.24]))
+        for raw, m in zip(pos["board"], pos["margin"]):
+            vals = sorted(p[d] for d, ok in zip(DIRS, al.legal_mask([raw])[0]) if ok)
+            self.assertAlmostEqual(m, 1.0 if len(vals) == 1 else vals[-1] - vals[-2])
+        self.assertEqual(sorted(set(pos["game"].tolist())), [1, 2])
+        self.assertFalse(pos["disagree"].any())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+import numpy as np
+
+from board import Board, danger_features
+from search import adaptive
+
+
+def _board(rows):
+    b = Board.__new__(Board)
+    b._b, b._rng = np.uint64(0), None
+    for r, row in enumerate(rows):
+        for c, v in enumerate(row):
+            if v:
+                b.set_tile(r, c, int(np.log2(v)))
+    return b
+
+
+def _merges(line):
+    """Fusions d'un glissement (tuiles égales consécutives, zéros ignorés)."""
+    t, n, i = [v for v in line if v], 0, 0
+    while i < len(t) - 1:
+        if t[i] == t[i + 1]:
+            n, i = n + 1, i + 2
+        else:
+            i += 1
+    return n
+
+
+class AdaptiveTest(unittest.TestCase):
+    def test_danger_features_match_python(self):
+        rng = np.random.default_rng(1)
+        for _ in range(200):
+            grid = rng.integers(0, 6, (4, 4))
+            b = _board([[0 if e == 0 else 1 << e for e in row] for row in grid])
+            tiles = grid[grid > 0]
+            merges = max(sum(_merges(line) for line in grid),
+                         sum(_merges(line) for line in grid.T))
+            empty, distinct, m = danger_features(np.uint64(b.raw))
+            self.assertEqual(empty, int((grid == 0).sum()))
+            self.assertEqual(distinct, len(set(tiles.tolist())))
+            self.assertEqual(m, merges)
+
+    def test_tiers(self):
+        calm = _board([[2, 0, 0, 0], [0, 0, 0, 0], [0, 0, 4, 0], [0, 0, 0, 0]])
+        crit = _board([[2, 4, 8, 16], [32, 64, 128, 256], [2, 4, 8, 16], [32, 64, 0, 256]])
+        self.assertEqual(adaptive.classify(calm.raw), "calm")
+        self.assertEqual(adaptive.classify(crit.raw), "critical")
+        _, d_calm, ms_calm = adaptive.effort(calm.raw, 3, 40)
+        _, d_crit, ms_crit = adaptive.effort(crit.raw, 3, 40)
+        self.assertLess(d_calm, d_crit)
+        self.assertLess(ms_calm, ms_crit)
+
+    def test_adaptive_move_is_legal_and_counted(self):
+        adaptive.reset_effort_stats()
+        b = Board(seed=9)
+        mv = adaptive.adaptive_best_move(b, 2, 10)
+        self.assertTrue(b.clone().move(mv, add_random=False)[0])
+        self.assertEqual(sum(s["moves"] for s in adaptive.effort_stats().values()), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
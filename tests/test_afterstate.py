@@ -0,0 +1,59 @@
+import random
+import unittest
+
+import numpy as np
+
+from board import Board, move_board
+from eval.heuristics import basic_eval, bounded_eval
+from search import afterstate, expectimax
+
+_DIR_ID = {"left": 0, "right": 1, "up": 2, "down": 3}
+
+
+def _board(raw):
+    b = Board.__new__(Board)
+    b._b, b._rng = np.uint64(raw), None
+    return b
+
+
+def _random_raws(n, seed=1):
+    rng = random.Random(seed)
+    return [sum(rng.randint(1, 11) << (4 * p) for p in range(16) if rng.random() < 0.6)
+            for _ in range(n)]
+
+
+class TestAfterstate(unittest.TestCase):
+
+    def test_primitives_match_board(self):
+        for raw in _random_raws(2000):
+            got = dict(afterstate.afterstates(raw))
+            for dir_, d in _DIR_ID.items():
+                nb_, _, moved = move_board(np.uint64(raw), np.int8(d))
+                self.assertEqual(got.get(dir_), int(nb_) if moved else None)
+            b = _board(raw)
+            self.assertEqual([sh // 4 for sh in afterstate.empty_shifts(raw)],
+                             [4 * r + c for r, c in b.get_empty_cells()])
+            self.assertEqual(afterstate.bounded_eval_raw(raw), bounded_eval(b))
+
+    def test_same_moves_as_best_move(self):
+        # 0x…101024 : l'ancienne TT de best_move confondait cet après-état
+        # avec une grille MAX identique et jouait "up"
+        raws = [0x0100_0000_0010_1024] + _random_raws(30, seed=2)
+        for depth in (2, 3, 4):
+            for raw in raws:
+                ref = expectimax.best_move(_board(raw), depth, 10**6)
+                self.assertEqual(afterstate.afterstate_best_move(_board(raw), depth, 10**6),
+                                 ref, (hex(raw), depth))
+        self.assertEqual(expectimax.best_move(_board(raws[0]), 3, 10**6), "left")
+
+    def test_custom_eval_and_chance_cache(self):
+        raw = 0x0000_0000_0012_1021
+        self.assertEqual(afterstate.afterstate_best_move(_board(raw), 3, 10**6, basic_eval),
+                         expectimax.best_move(_board(raw), 3, 10**6, basic_eval))
+        afterstate.reset_search_stats()
+        afterstate.afterstate_best_move(_board(raw), 5, 10**6)
+        self.assertGreater(afterstate.search_stats()["hits"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
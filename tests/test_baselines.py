@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import baselines
+from game import Game
+from replay import read_games, replay
+from random_play import random_benchmark
+
+
+class BaselinesTest(unittest.TestCase):
+    def test_seeded_and_reproducible(self):
+        for name in baselines.POLICIES:
+            a = baselines.play(name, 16, seed=5)
+            b = baselines.play(name, 16, seed=5)
+            np.testing.assert_array_equal(a["score"], b["score"])
+            np.testing.assert_array_equal(a["moves"], b["moves"])
+            self.assertTrue((a["max_tile"] >= 4).all())
+
+    def test_recorded_games_replay_identically(self):
+        res = baselines.play("greedy", 8, seed=11, record=True)
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "g.2048r")
+            baselines.write_replay(path, res)
+            games = list(read_games(path))
+        self.assertEqual(len(games), 8)
+        for (seed, n, packed), score, tile in zip(games, res["score"], res["max_tile"]):
+            boards, scores = replay(seed, packed, n)
+            self.assertEqual(scores[-1], score)
+            self.assertEqual(1 << int(max((int(boards[-1]) >> (4 * p)) & 0xF
+                                          for p in range(16))), tile)
+        # même partie côté Python : Game(seed) + mêmes coups
+        seed, _, packed = games[0]
+        g = Game(seed=seed)
+        for d in res["moves_flat"][:20]:
+            g.move(("left", "right", "up", "down")[d])
+        boards, scores = replay(seed, packed, 20)
+        self.assertEqual((g.board.raw, g.score), (int(boards[-1]), scores[-1]))
+
+    def test_policies_beat_random(self):
+        mean = {n: baselines.play(n, 200, seed=3)["score"].mean() for n in baselines.POLICIES}
+        self.assertGreater(mean["greedy"], mean["random"])
+        self.assertGreater(mean["expectimax1"], mean["greedy"])
+
+    def test_random_benchmark_delegates(self):
+        s = random_benchmark(50, 10_000, seed=2)
+        self.assertEqual(s.dtype, np.int32)
+        np.testing.assert_array_equal(s, baselines.play("random", 50, seed=2)["score"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+import numpy as np
+
+from board import Board
+from search import expectimax
+from search.batched_expectimax import best_move_batched, _root_values, batched
+from eval.heuristics import bounded_eval, bounded_eval_batch
+
+
+def _board(tiles):
+    b = Board()
+    b._b = sum(v << (i * 4) for i, v in enumerate(tiles))
+    return b
+
+
+class TestBatchedExpectimax(unittest.TestCase):
+
+    def setUp(self):
+        self.board = _board([1, 2, 3, 0,
+                             0, 1, 0, 0,
+                             0, 0, 2, 0,
+                             0, 0, 0, 1])
+
+    def test_batch_eval_matches_scalar(self):
+        raws = np.array([self.board.raw, 0, 0x1234_5678_9ABC_DEF0], dtype=np.uint64)
+        ref  = batched(bounded_eval)(raws)
+        np.testing.assert_allclose(bounded_eval_batch(raws), ref)
+
+    def test_root_values_match_expectimax(self):
+        """Profondeur 2 : pas de coupure α côté BEPP → valeurs identiques."""
+        vals = _root_values(self.board.raw, 2, bounded_eval_batch, float("inf"))
+        for dir_, v in vals.items():
+            child = self.board.clone()
+            child.move(dir_, add_random=False)
+            ref = expectimax._expectimax(child, 1, False, -float("inf"), float("inf"),
+                                         bounded_eval, {}, float("inf"))
+            self.assertAlmostEqual(v, ref)
+
+    def test_one_call_per_iteration(self):
+        calls = []
+
+        def counting(raws):
+            self.assertEqual(raws.dtype, np.uint64)
+            calls.append(len(raws))
+            return bounded_eval_batch(raws)
+
+        move = best_move_batched(self.board, depth=3, time_limit_ms=10**6,
+                                 batch_eval=counting)
+        self.assertIn(move, ["up", "down", "left", "right"])
+        # 1 lot pour trier le faisceau + 1 lot de feuilles, par itération
+        self.assertEqual(len(calls), 2 * 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,29 @@
+import csv, os, tempfile, unittest
+
+from interface_jeu_pygame import DataLogger
+
+
+class DataLoggerTest(unittest.TestCase):
+    def test_rows_are_marked_pre_move(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "data.csv")
+            DataLogger(path).record(gid="g", idx=0, raw=0x21, score=0,
+                                    bepp2_move="left", bepp2_val=0.5)
+            DataLogger(path).record(gid="g", idx=1, raw=0x21, score=4,
+                                    bepp2_move="up", bepp2_val=0.5)      # ajout : même format
+            with open(path, newline="") as f:
+                rows = list(csv.DictReader(f))
+        self.assertEqual([r["board_at"] for r in rows], ["pre", "pre"])
+        self.assertEqual((rows[0]["c0"], rows[0]["c1"]), ("2", "4"))
+
+    def test_refuses_to_append_to_old_format(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "old.csv")
+            with open(path, "w", newline="") as f:
+                csv.writer(f).writerow(DataLogger.COLS[:-1])     # en-tête sans board_at
+            with self.assertRaises(ValueError):
+                DataLogger(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+import numpy as np
+
+from board import move_board
+from shards import MOVES
+from dedup_dataset import transform, canonicalize, SYM_MOVE
+
+DIR_ID = {"left": 0, "right": 1, "up": 2, "down": 3}
+
+
+class TestDedup(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        exp = rng.integers(0, 12, (20, 16)) * (rng.random((20, 16)) < 0.6)
+        self.raws = np.bitwise_or.reduce(
+            exp.astype(np.uint64) << np.arange(0, 64, 4, dtype=np.uint64), axis=1)
+
+    def test_symmetry_commutes_with_moves(self):
+        """sym(move(b, m)) == move(sym(b), SYM_MOVE[s, m]) pour les 8 symétries."""
+        for s in range(8):
+            t = transform(self.raws, s)
+            for raw, traw in zip(self.raws, t):
+                for m, name in enumerate(MOVES):
+                    after, _, _ = move_board(np.uint64(raw), np.int8(DIR_ID[name]))
+                    sym_m = MOVES[SYM_MOVE[s, m]]
+                    expect, _, _ = move_board(np.uint64(traw), np.int8(DIR_ID[sym_m]))
+                    self.assertEqual(transform(np.array([after], np.uint64), s)[0], expect)
+
+    def test_mirror_pair_collapses(self):
+        """Une grille et son miroir gauche/droite (label left ↔ right) → même ligne."""
+        b = self.raws[:1]
+        m = transform(b, 1)
+        keys, moves = canonicalize(np.concatenate([b, m]),
+                                   np.array([MOVES.index("left"), MOVES.index("right")]))
+        self.assertEqual(keys[0], keys[1])
+        self.assertEqual(moves[0], moves[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import json
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import distributed
+import shards
+
+_CFG = {"engine": "bepp", "depth": 1, "time": 5}
+
+
+def _take_batch(addr: str):
+    """Faux worker : prend un lot et ne le rend pas → (socket, lot)."""
+    sock = socket.create_connection(distributed._split_addr(addr))
+    f = sock.makefile("rwb")
+    f.write(b'{"op": "ready", "worker": "fantome"}\n')
+    f.flush()
+    return sock, f, json.loads(f.readline())
+
+
+class DistributedTest(unittest.TestCase):
+    def test_records_roundtrip(self):
+        rec = shards.empty_records(3)
+        rec["game"], rec["board"], rec["val"] = 7, [1, 2, 2**64 - 1], 0.5
+        out = distributed.unpack_records(distributed.pack_records(rec))
+        self.assertEqual(out.dtype, shards.SHARD_DTYPE)
+        self.assertTrue(np.array_equal(out, rec))
+
+    def test_crashed_worker_batch_is_reassigned(self):
+        with tempfile.TemporaryDirectory() as d:
+            coord = distributed.Coordinator(6, _CFG, batch_games=2, shard_dir=d,
+                                            shard_games=4, seed=100)
+            addr, out = distributed.serve_in_thread(coord)
+            sock, f, lost = _take_batch(addr)
+            self.assertEqual(lost["seeds"], [100, 101])
+            f.close(); sock.close()                        # worker « mort » avec son lot
+            procs = distributed.start_workers(addr, 2)
+            out["thread"].join(120)
+            for p in procs:
+                p.join(10)
+            s = out["summary"]
+            self.assertEqual((s["games"], s["batches"]), (6, 3))
+            self.assertGreaterEqual(s["reassigned"], 1)
+            self.assertEqual(shards.validate(d), [])
+            rec = np.concatenate([shards.load_shard(p, mmap=False) for p in shards.shard_files(d)])
+            self.assertEqual(sorted(set(rec["game"].tolist())), list(range(100, 106)))
+            self.assertEqual(shards.read_manifest(d)["games"], 6)
+
+    def test_expired_lease_goes_to_another_worker(self):
+        coord = distributed.Coordinator(2, _CFG, batch_games=2, lease_s=0.5, seed=5)
+        addr, out = distributed.serve_in_thread(coord)
+        sock, f, held = _take_batch(addr)                 # lot gardé sans réponse
+        worker = threading.Thread(target=distributed.run_worker, args=(addr,), daemon=True)
+        worker.start()
+        out["thread"].join(60)
+        f.close(); sock.close()
+        s = out["summary"]
+        self.assertEqual((held["seeds"], s["games"], s["reassigned"]), ([5, 6], 2, 1))
+        self.assertGreater(s["nodes"], 0)
+
+    def test_config_is_validated(self):
+        for bad in ({"engine": "nope", "depth": 1, "time": 5}, {"engine": "bepp", "depth": 1},
+                    {"depth": "3", "time": 5}):
+            with self.assertRaises(ValueError):
+                distributed.Coordinator(2, bad)
+
+    def test_failing_batch_aborts_the_run(self):
+        coord = distributed.Coordinator(4, _CFG, batch_games=2, max_retries=2, seed=1)
+        addr, out = distributed.serve_in_thread(coord)
+        with mock.patch.object(distributed, "_engine", side_effect=RuntimeError("boum")):
+            played = distributed.run_worker(addr)          # rend « error », puis « done »
+        out["thread"].join(30)
+        s = out["summary"]
+        self.assertEqual((played, s["games"], s["reassigned"]), (0, 0, 2))
+        self.assertIn("RuntimeError: boum", s["error"])
+
+    def test_keep_alive_outlasts_lease(self):
+        import interface_jeu_pygame
+        play = interface_jeu_pygame._play_game
+
+        def slow(*a, **kw):
+            time.sleep(0.6)                                # lot de 1,2 s > bail de 0,3 s
+            return play(*a, **kw)
+
+        coord = distributed.Coordinator(2, _CFG, batch_games=2, lease_s=0.3, seed=9)
+        addr, out = distributed.serve_in_thread(coord)
+        with mock.patch.object(interface_jeu_pygame, "_play_game", slow):
+            distributed.run_worker(addr)
+        out["thread"].join(30)
+        s = out["summary"]
+        self.assertEqual((s["games"], s["reassigned"], s["error"]), (2, 0, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import subprocess
+import sys
+import unittest
+
+import engines
+from move_server import RemoteEngine
+
+_ROOT = str(engines.kernels.ROOT)
+
+
+class EnginesTest(unittest.TestCase):
+    def test_interface_import_is_lazy(self):
+        code = ("import sys, interface_jeu_pygame, engines\n"
+                "before = sorted(m for m in ('search.mcts', 'search.fast_expectimax',"
+                " 'search.adaptive', 'joblib', 'sklearn') if m in sys.modules)\n"
+                "engines.get('rollout')\n"
+                "print(before, 'search.fast_expectimax' in sys.modules,"
+                " 'search.mcts' in sys.modules)")
+        out = subprocess.run([sys.executable, "-c", code], cwd=_ROOT,
+                             capture_output=True, text=True, check=True)
+        self.assertEqual(out.stdout.split("\n")[-2], "[] True False")
+
+    def test_call_convention(self):
+        self.assertTrue(engines.is_search(engines.get("bepp")))
+        self.assertTrue(engines.is_search(engines.get("mcts")))
+        self.assertFalse(engines.is_search(engines.get("rollout")))
+        self.assertTrue(engines.is_search(RemoteEngine.__new__(RemoteEngine)))
+        self.assertEqual(engines.kernels_for(engines.get("mcts")), ("board", "search.mcts"))
+        self.assertEqual(engines.kernels_for(len), engines.BASE_KERNELS)
+
+    def test_configure_applies_on_load(self):
+        from search import expectimax
+        old = expectimax.BEAM_K
+        try:
+            engines.configure("search.expectimax", "set_bepp_params", beam_k=old + 3)
+            self.assertEqual(expectimax.BEAM_K, old + 3)     # déjà importé : immédiat
+        finally:
+            expectimax.set_bepp_params(beam_k=old)
+
+
+if __name__ == "__main__":
+    unittest.main()
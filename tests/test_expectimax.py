@@ -1,5 +1,6 @@
 import unittest
 from board import Board
+from search import expectimax
 from search.expectimax import best_move
 
 class DummyVictor:
@@ -54,6 +55,65 @@ class TestExpectimax(unittest.TestCase):
         move = best_move(board, depth=3, time_limit_ms=1000, eval_fn=DummyVictor())
         self.assertIn(move, ["up", "left", "down", "right"], f"Unexpected move: {move}")
 
+    def test_cumulative_prob_cutoff_prunes(self):
+        """
+        θ porte sur la probabilité cumulée : à profondeur 4 un seuil non nul
+        doit couper des branches et visiter moins de nœuds qu'avec θ = 0.
+        """
+        board = Board()
+        tiles = [1, 2, 3, 0,
+                 0, 1, 0, 0,
+                 0, 0, 2, 0,
+                 0, 0, 0, 1]
+        board._b = sum(v << (i * 4) for i, v in enumerate(tiles))
+
+        nodes, old = {}, expectimax.PROB_CUTOFF
+        try:
+            for theta in (0.0, 1e-2):
+                expectimax.set_bepp_params(prob_cutoff=theta)
+                expectimax.reset_search_stats()
+                best_move(board, depth=4, time_limit_ms=10**6)
+                nodes[theta] = expectimax.search_stats()
+        finally:
+            expectimax.set_bepp_params(prob_cutoff=old)
+        self.assertEqual(nodes[0.0]["cut"], 0)
+        self.assertGreater(nodes[1e-2]["cut"], 0)
+        self.assertLess(nodes[1e-2]["nodes"], nodes[0.0]["nodes"])
+
+    def test_sparse_chance_weights(self):
+        """Mode clairsemé : SPARSE_K cases distinctes, poids sommant à 1."""
+        empties = [(p // 4, p % 4) for p in range(14)]
+        old = expectimax.SPARSE_K
+        expectimax.set_bepp_params(sparse_k=4)
+        try:
+            cells = expectimax._stratified_cells(empties, key=0xDEADBEEF)
+        finally:
+            expectimax.set_bepp_params(sparse_k=old)
+        self.assertEqual(len({rc for rc, _ in cells}), 4)
+        self.assertAlmostEqual(sum(w for _, w in cells), 1.0)
+
+    def test_sparse_late_strata_are_sampled(self):
+        """Au-delà de 12 strates (60 bits du hash), le choix varie encore."""
+        empties = [(p // 4, p % 4) for p in range(16)]
+        old = expectimax.SPARSE_K
+        expectimax.set_bepp_params(sparse_k=14)
+        try:
+            last = {expectimax._stratified_cells(empties, key)[13][0] for key in range(64)}
+        finally:
+            expectimax.set_bepp_params(sparse_k=old)
+        self.assertEqual(len(last), 2)             # strate 13 = 2 cases, les deux tirées
+
+    def test_alpha_cut_is_a_bound_not_a_value(self):
+        b = Board(); b._b = 0x0000_0000_0012_1021
+        tt, bounds = {}, {}
+        val = expectimax._expectimax(b, 2, False, 0.99, float("inf"),
+                                     expectimax.bounded_eval, tt, float("inf"),
+                                     bounds=bounds)
+        key = hash(b) ^ expectimax._CHANCE_SALT
+        self.assertNotIn(key, tt)
+        self.assertEqual(bounds[key][2], val)
+        self.assertLess(bounds[key][1], 0.99)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,43 @@
+import unittest
+import numpy as np
+
+import board
+from board import Board, move_board, spawn_tile, game_step
+from game import Game
+
+
+class GameStepTest(unittest.TestCase):
+    def test_matches_move_then_spawn(self):
+        b = Board(seed=7)
+        for d in range(4):
+            s = np.uint64(123 + d)
+            ref, gain, moved = move_board(np.uint64(b.raw), d)
+            if moved:
+                ref, s_ref = spawn_tile(np.uint64(ref), s)
+            nb_, g2, m2, _, _, s2 = game_step(np.uint64(b.raw), np.int8(d), s, np.uint8(11))
+            self.assertEqual(m2, moved)
+            if moved:
+                self.assertEqual(int(nb_), int(ref))
+                self.assertEqual(g2, gain)
+                self.assertEqual(int(s2), int(s_ref))
+
+    def test_seeded_games_are_deterministic(self):
+        a, b = Game(seed=42), Game(seed=42)
+        for i in range(200):
+            d = ("left", "up", "right", "down")[i % 4]
+            self.assertEqual(a.move(d), b.move(d))
+            self.assertEqual(a.board.raw, b.board.raw)
+        self.assertEqual(bytes(a.moves), bytes(b.moves))
+
+    def test_row_luts_match_scalar_reference(self):
+        rows = list(range(0, 1 << 16, 7)) + [0xFFFF, 0xEEFF, 0x1111, 0xF0F0]
+        for r in rows:
+            self.assertEqual((int(board.ROW_LEFT[r]), int(board.SCORE_LUT[r])),
+                             board._left_row(r))
+            rev = int(board._reverse_rows(np.int64(r)))
+            self.assertEqual(int(board.ROW_RIGHT[r]),
+                             int(board._reverse_rows(np.int64(board._left_row(rev)[0]))))
+
+
+if __name__ == "__main__":
+    unittest.main()
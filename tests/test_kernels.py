@@ -0,0 +1,35 @@
+import unittest
+from pathlib import Path
+
+import board
+import kernels
+
+
+class KernelRegistryTest(unittest.TestCase):
+    def test_registry_points_at_jit_dispatchers(self):
+        for k in kernels.KERNELS:
+            fn = kernels._dispatcher(k)
+            self.assertTrue(hasattr(fn, "compile"), f"{k.module}.{k.name}")
+
+    def test_warmup_covers_board_signatures(self):
+        report = kernels.warmup(("board",))
+        self.assertEqual({n for n in report},
+                         {f"board.{k.name}" for k in kernels.KERNELS if k.module == "board"})
+        # les types passés par Board sont déjà compilés
+        step = next(k for k in kernels.KERNELS if k.name == "game_step")
+        self.assertIn(step.sigs[0], board.game_step.signatures)
+
+    def test_stale_cache_file_is_detected(self):
+        cache = Path(board.move_board._cache._cache_file._cache_path)
+        cache.mkdir(exist_ok=True)
+        fake = cache / f"board.move_board-1.py{kernels.sys.version_info.major}" \
+                       f"{kernels.sys.version_info.minor}.nbi"
+        fake.touch()
+        try:
+            self.assertIn(fake, kernels.stale_cache_files())
+        finally:
+            fake.unlink(missing_ok=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
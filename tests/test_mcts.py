@@ -0,0 +1,85 @@
+import threading
+import unittest
+import numpy as np
+
+from board import Board
+from search import mcts
+from search.mcts import mcts_best_move, set_mcts_params
+
+
+def _board(tiles):
+    b = Board()
+    b._b = sum(v << (i * 4) for i, v in enumerate(tiles))
+    return b
+
+
+class TestMCTS(unittest.TestCase):
+
+    def test_only_legal_move(self):
+        """Seul 'right' bouge : colonne de gauche pleine, sans fusion verticale."""
+        board = _board([1, 0, 0, 0,
+                        2, 0, 0, 0,
+                        1, 0, 0, 0,
+                        2, 0, 0, 0])
+        self.assertEqual(mcts_best_move(board, 0, 20), "right")
+
+    def test_anytime_and_tree_parallel(self):
+        board = _board([1, 2, 3, 0,
+                        0, 1, 0, 0,
+                        0, 0, 2, 0,
+                        0, 0, 0, 1])
+        pool = mcts._pool()
+        visits = {}
+        try:
+            for threads, ms in ((1, 10), (1, 80), (2, 40)):
+                set_mcts_params(threads=threads)
+                move = mcts_best_move(board, 0, ms)
+                self.assertIn(move, ["up", "down", "left", "right"])
+                # racine partagée en 0
+                visits[(threads, ms)] = int(pool.visits[0])
+                # pool rendu propre pour le coup suivant
+                self.assertTrue(np.all(pool.child == mcts._FREE))
+        finally:
+            set_mcts_params(threads=1)
+        self.assertGreater(visits[(1, 80)], visits[(1, 10)])
+
+    def test_shared_tree_visits_add_up(self):
+        """4 threads sur le même arbre : aucune visite perdue ni nœud publié deux fois."""
+        threads, batches = 4, 30
+        pool = mcts._Pool(1 << 15)
+        pool.reset(0, np.uint64(_board([1, 2, 3, 0,
+                                        0, 1, 0, 0,
+                                        0, 0, 2, 0,
+                                        0, 0, 0, 1]).raw))
+        bounds = np.linspace(1, len(pool.board), threads + 1).astype(np.int64)
+        used = np.zeros(threads, dtype=np.int64)
+
+        def work(tid):
+            for _ in range(batches):
+                mcts._iterate(pool.board, pool.visits, pool.value, pool.child, used,
+                              tid, 0, bounds[tid], bounds[tid + 1], 64, 0.5, 8)
+
+        ths = [threading.Thread(target=work, args=(t,)) for t in range(threads)]
+        for th in ths: th.start()
+        for th in ths: th.join()
+        self.assertTrue(np.all(used < np.diff(bounds)))       # aucune tranche pleine
+
+        total = threads * batches * 64
+        self.assertEqual(pool.visits[0], total)
+        kids = pool.child[0, :4][pool.child[0, :4] >= 0]
+        self.assertEqual(pool.visits[kids].sum(), total)
+        for a in kids:                                        # afterstates → tirages
+            spawn = pool.child[a][pool.child[a] >= 0]
+            self.assertEqual(pool.visits[a], pool.visits[spawn].sum())
+        # chaque nœud alloué est publié une seule fois, racine jamais
+        linked = pool.child[pool.child >= 0]
+        self.assertEqual(len(linked), used.sum())
+        self.assertEqual(len(np.unique(linked)), len(linked))
+        self.assertNotIn(0, linked)
+        # perte virtuelle rendue : récompense moyenne dans [0 ; 1]
+        self.assertTrue(0.0 <= pool.value[0] / total <= 1.0)
+        self.assertAlmostEqual(pool.value[0], pool.value[kids].sum(), places=6)
+
+
+if __name__ == '__main__':
+    unittest.main()
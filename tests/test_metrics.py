@@ -0,0 +1,66 @@
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from metrics import Metrics, QuantileSketch, game_result
+
+
+class QuantileSketchTest(unittest.TestCase):
+    def test_relative_error(self):
+        xs = np.random.default_rng(0).lognormal(0, 1.5, 20_000)
+        sk = QuantileSketch(rel_err=0.01)
+        for x in xs:
+            sk.add(float(x))
+        for q in (0.5, 0.9, 0.99):
+            exact = float(np.quantile(xs, q, method="lower"))
+            self.assertLess(abs(sk.quantile(q) - exact) / exact, 0.02)
+
+    def test_merge_equals_single_stream(self):
+        rng = np.random.default_rng(1)
+        a, b, both = QuantileSketch(), QuantileSketch(), QuantileSketch()
+        for x in rng.exponential(3.0, 1000):
+            a.add(x); both.add(x)
+        for x in rng.exponential(0.5, 1000):
+            b.add(x); both.add(x)
+        a.merge(b)
+        self.assertEqual(a.counts, both.counts)
+        # fusion d'un dict sérialisé (clés str après JSON)
+        c = QuantileSketch()
+        c.merge(json.loads(json.dumps(both.counts)))
+        self.assertEqual(c.quantile(0.9), both.quantile(0.9))
+
+
+class MetricsTest(unittest.TestCase):
+    def _res(self, score, tile, moves, ms):
+        lat = QuantileSketch()
+        for _ in range(moves):
+            lat.add(ms)
+        return game_result("best_move", score, tile, moves, 1.0, lat, moves * ms / 1000)
+
+    def test_snapshot_and_jsonl(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "m.jsonl")
+            m = Metrics(path, every_s=1e9)
+            for i, tile in enumerate((512, 1024, 1024, 2048)):
+                m.add(self._res(1000 * (i + 1), tile, 100, 2.0))
+            self.assertIsNone(m.maybe_write())
+            snap = m.flush()
+            self.assertIs(m.flush(), snap)            # rien de neuf : pas de doublon
+            with open(path) as f:
+                lines = [json.loads(l) for l in f]
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(snap["games"], 4)
+        self.assertEqual(snap["moves"], 400)
+        self.assertEqual(snap["max_tile"], {"512": 1, "1024": 2, "2048": 1})
+        self.assertEqual(snap["score"]["max"], 4000)
+        self.assertAlmostEqual(snap["score"]["mean"], 2500.0)
+        lat = snap["latency_ms"]["best_move"]
+        self.assertAlmostEqual(lat["p50"], 2.0, delta=0.04)
+        self.assertAlmostEqual(lat["mean"], 2.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import threading, unittest
+
+from board import Board
+from move_server import MoveServer, MoveClient, RemoteEngine, serve_in_thread
+from algo.movenet import DIRS
+
+
+class _FakeNet:
+    """predict_batch déterministe : coup = raw % 4 ; mémorise la taille des lots."""
+
+    def __init__(self):
+        self.sizes = []
+
+    def predict_batch(self, raws):
+        self.sizes.append(len(raws))
+        return [DIRS[int(r) % 4] for r in raws]
+
+
+class MoveServerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.net = _FakeNet()
+        cls.addr = serve_in_thread(MoveServer(cls.net, batch_wait_ms=20))
+
+    def test_concurrent_requests_are_batched(self):
+        n_clients, n_req, errors = 8, 10, []
+
+        def work(i):
+            cl = MoveClient(self.addr)
+            for k in range(n_req):
+                raw = 1000 * i + k
+                if cl.move(raw) != DIRS[raw % 4]:
+                    errors.append(raw)
+            cl.close()
+
+        ths = [threading.Thread(target=work, args=(i,)) for i in range(n_clients)]
+        for th in ths: th.start()
+        for th in ths: th.join()
+        self.assertEqual(errors, [])
+        self.assertGreater(max(self.net.sizes), 1)
+        st = MoveClient(self.addr).stats()
+        self.assertGreaterEqual(st["by_engine"]["ia"], n_clients * n_req)
+        self.assertLess(st["batches"], st["by_engine"]["ia"])
+
+    def test_remote_search_engine_returns_legal_move(self):
+        b = Board(seed=5)
+        mv = RemoteEngine(self.addr, "bepp")(b, 2, 10)
+        self.assertTrue(b.clone().move(mv, add_random=False)[0])
+
+    def test_bad_request_reports_error(self):
+        with self.assertRaises(RuntimeError):
+            MoveClient(self.addr).move(0, engine="nope")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import os, unittest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+try:
+    import pygame
+except ImportError:                      # pygame est facultatif
+    pygame = None
+
+
+@unittest.skipIf(pygame is None, "pygame absent")
+class DirtyRectRenderTest(unittest.TestCase):
+    def setUp(self):
+        from interface_jeu_pygame import Pygame2048UI
+        self.ui = Pygame2048UI(fps=0, speed=1, depth=1, ms=1, logger_path=None,
+                               engine=None, start_ai=False)
+
+    def tearDown(self):
+        pygame.quit()
+
+    def test_unchanged_board_skips_frame(self):
+        frames = self.ui.frames
+        self.assertEqual(self.ui._draw_board(), [])
+        self.ui._render()
+        self.assertEqual(self.ui.frames, frames)
+
+    def test_incremental_matches_full_redraw(self):
+        ui = self.ui
+        for mv in ("left", "up", "right", "down", "left", "up"):
+            ui.game.move(mv)
+            ui.ai_on = not ui.ai_on
+            ui._render()
+        incremental = pygame.image.tobytes(ui.screen, "RGB")
+        ui._render(full=True)
+        self.assertEqual(incremental, pygame.image.tobytes(ui.screen, "RGB"))
+
+
+if __name__ == "__main__":
+    unittest.main()
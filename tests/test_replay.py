@@ -0,0 +1,53 @@
+import multiprocessing as mp, os, tempfile, unittest
+import numpy as np
+
+from board import Board
+from game import Game
+from replay import pack_moves, unpack_moves, append_game, read_games, replay
+
+
+class TestReplay(unittest.TestCase):
+
+    def test_seeded_board_is_deterministic(self):
+        a, b = Board(seed=123), Board(seed=123)
+        self.assertEqual(a.raw, b.raw)
+        for d in ("left", "up", "right", "down"):
+            self.assertEqual(a.move(d), b.move(d))
+            self.assertEqual(a.raw, b.raw)
+
+    def test_pack_roundtrip(self):
+        moves = np.random.default_rng(0).integers(0, 4, 1001).astype(np.uint8)
+        packed = pack_moves(moves)
+        self.assertEqual(len(packed), 251)
+        np.testing.assert_array_equal(unpack_moves(packed, len(moves)), moves)
+
+    def test_archive_replays_every_position(self):
+        g, seen = Game(seed=2048), []
+        order = ["left", "down", "right", "up"]
+        i = 0
+        while not g.is_over() and len(g.moves) < 200:
+            seen.append((g.board.raw, g.score))
+            while not g.move(order[i % 4])[0]:
+                i += 1
+            i += 1
+        seen.append((g.board.raw, g.score))
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "g.2048r")
+            append_game(path, g.seed, g.moves)
+            (seed, n, packed), = read_games(path)
+        boards, scores = replay(seed, packed, n)
+        self.assertEqual([(int(b), int(s)) for b, s in zip(boards, scores)], seen)
+
+    def test_concurrent_appends_single_header(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "g.2048r")
+            with mp.get_context("spawn").Pool(4) as pool:
+                pool.starmap(append_game, [(path, s, [s % 4] * 5) for s in range(16)])
+            games = list(read_games(path))
+        self.assertEqual(sorted(seed for seed, _, _ in games), list(range(16)))
+        self.assertTrue(all(n == 5 for _, n, _ in games))
+
+
+
+if __name__ == '__main__':
+    unittest.main()
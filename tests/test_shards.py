@@ -0,0 +1,74 @@
+import os, tempfile, unittest
+import numpy as np
+
+import shards
+from algo.movenet import features_from_raw
+
+
+class TestShards(unittest.TestCase):
+
+    def test_features_from_raw(self):
+        raw = 1 | (2 << 4) | (11 << 60)           # 2, 4, …, 2048 en c15
+        f = features_from_raw([raw])
+        self.assertEqual(f.shape, (1, 17))
+        self.assertEqual(f[0, 0], 13)              # empty_cnt
+        self.assertEqual(f[0, 1:3].tolist(), [2, 4])
+        self.assertEqual(f[0, 16], 2048)
+
+    def test_roundtrip_and_chunks(self):
+        rec = shards.empty_records(10)
+        rec["board"] = np.arange(10, dtype=np.uint64)
+        rec["move"] = np.arange(10) % 4
+        with tempfile.TemporaryDirectory() as d:
+            shards.write_shard(os.path.join(d, "a.npy"), rec[:6])
+            shards.write_shard(os.path.join(d, "b.npy"), rec[6:])
+            chunks = list(shards.iter_records(d, chunk_rows=4))
+        self.assertEqual([len(c) for c in chunks], [4, 2, 4])
+        np.testing.assert_array_equal(np.concatenate(chunks), rec)
+
+    def test_writer_resume_and_validate(self):
+        with tempfile.TemporaryDirectory() as d:
+            w = shards.ShardWriter(d, games_per_shard=2, seed=100)
+            self.assertEqual(w.reserve_seeds(3), [100, 101, 102])
+            for n in (3, 4, 5):
+                w.add_game(shards.empty_records(n))   # 2 parties validées, 1 en attente
+            # arrêt brutal : partie en attente perdue, fichiers à moitié écrits
+            for junk in ("shard-000001.npy", "manifest.json.tmp"):
+                open(os.path.join(d, junk), "wb").close()
+
+            w = shards.ShardWriter(d, games_per_shard=2)
+            self.assertEqual(w.discarded, 2)
+            self.assertEqual(w.games, 2)
+            self.assertEqual(w.reserve_seeds(1), [103])   # graines neuves
+            w.add_game(shards.empty_records(6))
+            w.close()
+            self.assertEqual(shards.validate(d), [])
+            m = shards.read_manifest(d)
+            self.assertEqual((m["games"], m["rows"]), (3, 13))
+            self.assertEqual(len(shards.shard_files(d)), 2)
+
+            path = os.path.join(d, "shard-000000.npy")
+            with open(path, "r+b") as f:             # un octet de données modifié
+                f.seek(-1, os.SEEK_END)
+                f.write(b"\x7f")
+            self.assertEqual(shards.validate(d), ["shard-000000.npy: CRC32 invalide"])
+
+    def test_writer_keeps_foreign_files(self):
+        with tempfile.TemporaryDirectory() as d:
+            foreign = os.path.join(d, "existing_data.npy")
+            shards.write_shard(foreign, shards.empty_records(2))
+            with self.assertRaises(ValueError):            # pas de manifeste : refus
+                shards.ShardWriter(d)
+            os.remove(foreign)
+            w = shards.ShardWriter(d, games_per_shard=1)
+            w.add_game(shards.empty_records(3))
+            shards.write_shard(foreign, shards.empty_records(2))
+            open(os.path.join(d, "notes.tmp"), "wb").close()
+            w = shards.ShardWriter(d)                      # reprise : rien d'étranger supprimé
+            self.assertEqual(w.discarded, 0)
+            self.assertTrue(os.path.exists(foreign))
+            self.assertTrue(os.path.exists(os.path.join(d, "notes.tmp")))
+
+
+if __name__ == '__main__':
+    unittest.main()
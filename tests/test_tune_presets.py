@@ -0,0 +1,46 @@
+import json, os, tempfile, unittest
+
+from interface_jeu_pygame import PRESETS, load_presets
+from tune_presets import pareto_ranks, pick_presets, play, summarize
+
+
+def _row(cfg, score, ms, rate, games=4):
+    return {"config": cfg, "games": games, "mean_score": score, "ms_per_move": ms,
+            "rate_512": rate, "rate_1024": rate, "rate_2048": rate}
+
+
+class TunePresetsTest(unittest.TestCase):
+    def test_pareto_ranks(self):
+        rows = [_row({"a": 1}, 100, 1.0, 0), _row({"a": 2}, 200, 5.0, 0),
+                _row({"a": 3}, 150, 6.0, 0), _row({"a": 4}, 90, 2.0, 0)]
+        self.assertEqual(pareto_ranks(rows), [0, 0, 1, 1])
+
+    def test_tuned_is_cheapest_reaching_target(self):
+        rows = [_row({"depth": 1}, 100, 1.0, 0.1), _row({"depth": 3}, 300, 9.0, 0.8),
+                _row({"depth": 2}, 250, 4.0, 0.6)]
+        presets = pick_presets(rows, 2048, 0.5)
+        self.assertEqual(presets["tuned"], {"depth": 2})
+        self.assertEqual([presets[k] for k in sorted(presets) if k.startswith("pareto")],
+                         [{"depth": 1}, {"depth": 2}, {"depth": 3}])
+
+    def test_eliminated_configs_are_ignored(self):
+        rows = [_row({"depth": 1}, 900, 0.5, 1.0, games=2),      # 2 parties chanceuses
+                _row({"depth": 2}, 250, 4.0, 0.6, games=8)]
+        presets = pick_presets(rows, 2048, 0.5)
+        self.assertEqual(presets, {"pareto-1": {"depth": 2}, "tuned": {"depth": 2}})
+
+    def test_play_and_preset_file_roundtrip(self):
+        cfg = {"engine": "bepp", "depth": 1, "time": 10, "beam": 1, "prob": 1e-2}
+        row = summarize(cfg, [play(cfg, seed=3, max_moves=20)])
+        self.assertEqual(row["games"], 1)
+        self.assertGreater(row["mean_moves"], 0)
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "p.json")
+            with open(path, "w") as f:
+                json.dump({"presets": {"tuned": cfg}}, f)
+            self.assertEqual(load_presets(path)["tuned"], cfg)
+        self.assertIn("turbo", PRESETS)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,11 @@
 import sys
+import os
 import time
+import argparse
+import numpy as np
 import pandas as pd
 import joblib
+from joblib import Parallel, delayed
 from sklearn.model_selection import train_test_split, StratifiedKFold, cross_val_score
 from sklearn.ensemble import HistGradientBoostingClassifier
 from sklearn.metrics import classification_report, accuracy_score, confusion_matrix
@@ -11,11 +15,18 @@ FILE_PATH     = '/Users/sorbet/Desktop/Dev/2048-AI-Solver/data.csv'
 CLEAN_PATH    = '/Users/sorbet/Desktop/Dev/2048-AI-Solver/clean_dataset.csv'
 MODEL_PATH    = '/Users/sorbet/Desktop/Dev/2048-AI-Solver/model.joblib'
 TARGET_COL    = 'bepp2_move'
-DROP_COLS     = ['bepp2_val']
+DROP_COLS     = ['bepp2_val', 'board_at']
 SKIP_COLS     = 4
 ALLOWED_MOVES = ['up', 'down', 'left', 'right']
 TEST_SIZE     = 0.1   # 90/10 split
 CV_FOLDS      = 5    # Utiliser 5 splis
+# ─── mode streaming (--stream) ───
+FEATURES      = ['empty_cnt'] + [f'c{i}' for i in range(16)]
+WORK_DIR      = '/Users/sorbet/Desktop/Dev/2048-AI-Solver/train_mm'
+CHUNK_ROWS    = 150_000   # lignes par bloc (bloc + échantillon ≤ 200k → binning exact)
+BIN_SAMPLE    = 20_000    # échantillon stratifié commun à tous les blocs
+CV_ROWS       = 2_000_000 # lignes (stratifiées) utilisées par la CV
+MAX_ITER      = 100       # itérations de boosting minimales au total
 # ───────────────────────────────────────
 
 def make_usecols(path, skip):
@@ -28,6 +39,14 @@ def make_usecols(path, skip):
 def load_dataframe(path, skip):
     if path.lower().endswith('.parquet'):
         return pd.read_parquet(path)
+    if not path.lower().endswith('.csv'):          # shard(s) binaire(s)
+        import shards
+        rec = np.concatenate([shards.load_shard(f, mmap=False)
+                              for f in shards.shard_files(path)])
+        df = pd.DataFrame(shards.features_from_raw(rec['board']), columns=FEATURES)
+        df[TARGET_COL] = np.asarray(ALLOWED_MOVES)[rec['move']]
+        df['weight'] = rec['weight']
+        return df
     usecols = make_usecols(path, skip)
     return pd.read_csv(path, usecols=usecols, low_memory=False)
 
@@ -57,6 +76,202 @@ def preprocess_df(df):
     return df
 
 
+# ─────────── STREAMING HORS-MÉMOIRE ───────────
+def peak_rss_mb(children=False):
+    """
+    Pic de RSS (Mo) du process, ou avec children=True celui du plus gros
+    enfant terminé (l'OS ne donne pas la somme).  None si indisponible.
+    """
+    try:
+        import resource
+    except ImportError:                     # Windows
+        return None
+    unit = 1 if sys.platform == 'darwin' else 1024   # octets (macOS) / Ko (Linux)
+    who  = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    return resource.getrusage(who).ru_maxrss * unit / 2**20
+
+
+def _df_to_arrays(df):
+    X = df[FEATURES].to_numpy(dtype=np.uint16)
+    y = df[TARGET_COL].astype(str).map(ALLOWED_MOVES.index).to_numpy(dtype=np.uint8)
+    w = (df['weight'].to_numpy(dtype=np.float32) if 'weight' in df
+         else np.ones(len(df), dtype=np.float32))
+    return X, y, w
+
+
+def iter_chunks(path, chunk_rows):
+    """
+    Blocs (X uint16 (n,17), y uint8, w float32) à mémoire bornée :
+    row-groups Parquet, shards binaires (.npy / dossier) ou CSV par morceaux.
+    """
+    if path.lower().endswith('.parquet'):
+        import pyarrow.parquet as pq
+        pf = pq.ParquetFile(path)
+        cols = [c for c in FEATURES + [TARGET_COL, 'weight'] if c in pf.schema_arrow.names]
+        for batch in pf.iter_batches(batch_size=chunk_rows, columns=cols):
+            yield _df_to_arrays(preprocess_df(batch.to_pandas()))
+    elif path.lower().endswith('.csv'):
+        usecols = make_usecols(path, SKIP_COLS)
+        for df in pd.read_csv(path, usecols=usecols, chunksize=chunk_rows,
+                              low_memory=False):
+            yield _df_to_arrays(preprocess_df(df))
+    else:
+        import shards
+        for rec in shards.iter_records(path, chunk_rows):
+            yield (shards.features_from_raw(rec['board']), rec['move'].astype(np.uint8),
+                   rec['weight'].astype(np.float32))
+
+
+def build_memmap(path, work_dir, chunk_rows=CHUNK_ROWS, bin_sample=BIN_SAMPLE, seed=42,
+                 weights=None):
+    """
+    Passe unique sur la source (ou la liste de sources, dans l'ordre, poids
+    des lignes multiplié par *weights*[i]) → matrices mmap sur disque
+    (X, y, w, test) + échantillon de binning : réservoir stratifié par classe, complété pour
+    couvrir chaque valeur (colonne, tuile) vue.  Tous les blocs d'entraînement
+    embarquent cet échantillon → mêmes seuils de bins et mêmes classes à
+    chaque fit warm_start.
+    """
+    os.makedirs(work_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    k = max(1, bin_sample // len(ALLOWED_MOVES))
+    res_key = [np.empty(0) for _ in ALLOWED_MOVES]
+    res_idx = [np.empty(0, dtype=np.int64) for _ in ALLOWED_MOVES]
+    first_seen = {}                                   # (colonne, valeur) → ligne
+    n = 0
+    files = {name: open(os.path.join(work_dir, name + '.bin'), 'wb')
+             for name in ('X', 'y', 'w', 'test')}
+    paths = [path] if isinstance(path, (str, os.PathLike)) else list(path)
+    weights = weights or [1.0] * len(paths)
+    chunks = ((X, y, w * np.float32(scale))
+              for p, scale in zip(paths, weights) for X, y, w in iter_chunks(p, chunk_rows))
+    try:
+        for X, y, w in chunks:
+            m = len(y)
+            test = rng.random(m) < TEST_SIZE
+            for name, arr in (('X', X), ('y', y), ('w', w), ('test', test)):
+                files[name].write(np.ascontiguousarray(arr).tobytes())
+            keys = np.where(test, np.inf, rng.random(m))  # test exclu de l'échantillon
+            for c in range(len(ALLOWED_MOVES)):
+                sel = np.flatnonzero((y == c) & ~test)
+                kk = np.concatenate((res_key[c], keys[sel]))
+                ii = np.concatenate((res_idx[c], sel + n))
+                keep = np.argsort(kk, kind='stable')[:k]
+                res_key[c], res_idx[c] = kk[keep], ii[keep]
+            train = np.flatnonzero(~test)
+            for j in range(X.shape[1]):
+                vals, pos = np.unique(X[train, j], return_index=True)
+                for v, p in zip(vals.tolist(), pos.tolist()):
+                    first_seen.setdefault((j, v), n + train[p])
+            n += m
+            print(f"   … {n:,} lignes · RSS max {peak_rss_mb() or 0:.0f} Mo", flush=True)
+    finally:
+        for f in files.values():
+            f.close()
+
+    def mm(name, dtype, shape):
+        return np.memmap(os.path.join(work_dir, name + '.bin'), dtype=dtype,
+                         mode='r', shape=shape)
+    bin_idx = np.unique(np.concatenate(res_idx + [np.fromiter(first_seen.values(), np.int64)]))
+    return dict(X=mm('X', np.uint16, (n, len(FEATURES))), y=mm('y', np.uint8, (n,)),
+                w=mm('w', np.float32, (n,)), test=mm('test', np.bool_, (n,)),
+                bin_idx=bin_idx)
+
+
+def fit_streaming(data, chunk_rows=CHUNK_ROWS, max_iter=MAX_ITER):
+    """
+    Boosting hors-mémoire : chaque fit warm_start ajoute quelques arbres,
+    appris sur un bloc d'entraînement + l'échantillon de binning commun.
+    Seul un bloc est converti en float64 à la fois.
+    """
+    X, y, w, test, bi = data['X'], data['y'], data['w'], data['test'], data['bin_idx']
+    Xb, yb, wb = np.asarray(X[bi]), np.asarray(y[bi]), np.asarray(w[bi])
+    if chunk_rows + len(bi) > 200_000:
+        print("⚠️ bloc + échantillon > 200k : seuils de bins non garantis identiques")
+    starts = range(0, len(y), chunk_rows)
+    per_chunk = max(1, -(-max_iter // len(starts)))
+    model = HistGradientBoostingClassifier(warm_start=True, early_stopping=False,
+                                           max_iter=per_chunk)
+    for s in starts:
+        m = ~np.asarray(test[s:s + chunk_rows])
+        Xc = np.concatenate((np.asarray(X[s:s + chunk_rows])[m], Xb))
+        yc = np.concatenate((np.asarray(y[s:s + chunk_rows])[m], yb))
+        wc = np.concatenate((np.asarray(w[s:s + chunk_rows])[m], wb))
+        if hasattr(model, 'n_iter_'):
+            model.max_iter = model.n_iter_ + per_chunk
+        model.fit(Xc, yc, sample_weight=wc)
+    return model
+
+
+def _cv_fold(X, y, w, tr, te):
+    """Un pli : X/y/w arrivent en mmap (référence au fichier, pas de copie pickle)."""
+    model = HistGradientBoostingClassifier()
+    model.fit(X[tr], y[tr], sample_weight=w[tr])
+    return accuracy_score(y[te], model.predict(X[te]), sample_weight=w[te])
+
+
+def cv_streaming(data, cv_rows=CV_ROWS, n_splits=CV_FOLDS, seed=42):
+    """CV stratifiée sur ≤ cv_rows lignes d'entraînement ; les plis partagent le mmap."""
+    y = data['y']
+    idx = np.flatnonzero(~np.asarray(data['test']))
+    if len(idx) > cv_rows:
+        idx, _ = train_test_split(idx, train_size=cv_rows, random_state=seed,
+                                  stratify=np.asarray(y[idx]))
+        idx.sort()
+    cv = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=seed)
+    folds = [(idx[tr], idx[te]) for tr, te in cv.split(idx, np.asarray(y[idx]))]
+    return np.array(Parallel(n_jobs=-1)(
+        delayed(_cv_fold)(data['X'], y, data['w'], tr, te) for tr, te in folds))
+
+
+def main_stream(args):
+    timestamps = {}
+    t0 = time.time()
+    print(f"➡️ Streaming de : {', '.join(args.data)} (blocs de {args.chunk_rows:,} lignes)")
+    data = build_memmap(args.data, args.work_dir, args.chunk_rows, args.bin_sample,
+                        weights=args.data_weight)
+    timestamps['stream'] = time.time() - t0
+    n, n_test = len(data['y']), int(np.count_nonzero(data['test']))
+    print(f"💾 mmap {args.work_dir} : {n:,} lignes ({n - n_test:,}/{n_test:,} train/test), "
+          f"échantillon de binning {len(data['bin_idx']):,}")
+
+    t1 = time.time()
+    if args.cv_rows > 0:
+        scores = cv_streaming(data, args.cv_rows)
+        print(f"   Scores CV: {scores}")
+        print(f"   Moyenne CV Acc.: {scores.mean():.4f}")
+    timestamps['cv'] = time.time() - t1
+
+    t2 = time.time()
+    print("🏋️ Entraînement final (warm_start par blocs)…")
+    model = fit_streaming(data, args.chunk_rows, args.max_iter)
+    timestamps['train'] = time.time() - t2
+    joblib.dump(model, args.model)
+    print(f"💾 Modèle enregistré dans {args.model} ({model.n_iter_} itérations)")
+
+    t3 = time.time()
+    y_true, y_pred, w_te = [], [], []
+    for s in range(0, n, args.chunk_rows):
+        te = np.flatnonzero(np.asarray(data['test'][s:s + args.chunk_rows])) + s
+        if len(te):
+            y_true.append(np.asarray(data['y'][te]))
+            y_pred.append(model.predict(np.asarray(data['X'][te])))
+            w_te.append(np.asarray(data['w'][te]))
+    y_true, y_pred, w_te = map(np.concatenate, (y_true, y_pred, w_te))
+    timestamps['eval'] = time.time() - t3
+
+    print("⏱️ Temps par étape (s):")
+    for k, v in timestamps.items(): print(f"  {k}: {v:.2f}")
+    rss = peak_rss_mb()
+    if rss is not None:
+        print(f"📈 RSS max : process {rss:.0f} Mo · "
+              f"plus gros worker {peak_rss_mb(children=True):.0f} Mo")
+    print(f"\n✅ Test Accuracy: {accuracy_score(y_true, y_pred, sample_weight=w_te):.4f}\n")
+    print("📊 Matrice de confusion (valeurs brutes):")
+    print(confusion_matrix(y_true, y_pred, labels=range(len(ALLOWED_MOVES)),
+                           sample_weight=w_te))
+
+
 def main():
     timestamps = {}
     # Lecture
@@ -84,12 +299,13 @@ def main():
     timestamps['save_clean'] = time.time() - t2
     print(f"💾 Dataset nettoyé enregistré dans {CLEAN_PATH}")
 
-    # Split
+    # Split (poids : lignes fusionnées par dedup_dataset.py)
     t3 = time.time()
     y = df[TARGET_COL]
-    X = df.drop(columns=[TARGET_COL])
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=TEST_SIZE, random_state=42, stratify=y)
+    w = (df['weight'] if 'weight' in df else pd.Series(1, index=df.index)).astype('float64')
+    X = df.drop(columns=[TARGET_COL, 'weight'], errors='ignore')
+    X_train, X_test, y_train, y_test, w_train, w_test = train_test_split(
+        X, y, w, test_size=TEST_SIZE, random_state=42, stratify=y)
     timestamps['split'] = time.time() - t3
     print(f"✔️ Split train/test : {X_train.shape[0]}/{X_test.shape[0]}")
 
@@ -102,7 +318,8 @@ def main():
         cv = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=42)
         model = HistGradientBoostingClassifier()
         scores = cross_val_score(model, X_train, y_train, cv=cv,
-                                 scoring='accuracy', n_jobs=-1, error_score='raise')
+                                 scoring='accuracy', n_jobs=-1, error_score='raise',
+                                 params={'sample_weight': w_train.to_numpy()})
         print(f"   Scores CV: {scores}")
         print(f"   Moyenne CV Acc.: {scores.mean():.4f}")
     else:
@@ -113,7 +330,7 @@ def main():
     t5 = time.time()
     print("🏋️ Entraînement final…")
     model = HistGradientBoostingClassifier()
-    model.fit(X_train, y_train)
+    model.fit(X_train, y_train, sample_weight=w_train)
     timestamps['train'] = time.time() - t5
 
     # Sauvegarde du modèle
@@ -125,8 +342,8 @@ def main():
     # Prédiction et évaluation
     t7 = time.time()
     y_pred = model.predict(X_test)
-    acc = accuracy_score(y_test, y_pred)
-    cm = confusion_matrix(y_test, y_pred)
+    acc = accuracy_score(y_test, y_pred, sample_weight=w_test)
+    cm = confusion_matrix(y_test, y_pred, sample_weight=w_test)
     cm_pct = (cm.astype('float') / cm.sum(axis=1)[:, None] * 100).round(2)
     timestamps['eval'] = time.time() - t7
 
@@ -141,7 +358,30 @@ def main():
     print("\n📊 Matrice de confusion (% par ligne):")
     print(cm_pct)
     print("\n📈 Rapport de classification :")
-    print(classification_report(y_test, y_pred, digits=4))
+    print(classification_report(y_test, y_pred, digits=4, sample_weight=w_test))
 
 if __name__ == "__main__":
-    main()
+    pa = argparse.ArgumentParser()
+    pa.add_argument("--stream", action="store_true",
+                    help="entraînement hors-mémoire (Parquet / shards / CSV par blocs)")
+    pa.add_argument("--data",  nargs="+", default=[FILE_PATH],
+                    help="source(s) ; plusieurs seulement avec --stream, lues dans l'ordre")
+    pa.add_argument("--data-weight", nargs="+", type=float,
+                    help="--stream : multiplicateur de poids par source (défaut 1)")
+    pa.add_argument("--model", default=MODEL_PATH)
+    pa.add_argument("--clean", default=CLEAN_PATH, help="CSV nettoyé (mode historique)")
+    pa.add_argument("--work-dir",   default=WORK_DIR, help="dossier des matrices mmap")
+    pa.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    pa.add_argument("--bin-sample", type=int, default=BIN_SAMPLE)
+    pa.add_argument("--cv-rows",    type=int, default=CV_ROWS, help="0 = pas de CV")
+    pa.add_argument("--max-iter",   type=int, default=MAX_ITER)
+    args = pa.parse_args()
+    if args.data_weight and len(args.data_weight) != len(args.data):
+        pa.error("--data-weight : un poids par source de --data")
+    if args.stream:
+        main_stream(args)
+    else:
+        if len(args.data) > 1:
+            pa.error("plusieurs sources : seulement avec --stream")
+        FILE_PATH, MODEL_PATH, CLEAN_PATH = args.data[0], args.model, args.clean
+        main()
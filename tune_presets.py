@@ -0,0 +1,198 @@
+"""
+tune_presets.py – réglage automatique des presets (score ↔ CPU-ms par coup)
+──────────────────────────────────────────────────────────────
+Balayage des paramètres --depth / --time / --beam / --prob (BEPP), du preset
+de base de BEPP adaptatif et de --time (MCTS) par « successive halving » :
+chaque configuration joue quelques parties, seule la meilleure fraction 1/eta
+(rang de Pareto, puis score moyen) passe au palier suivant, qui joue eta× plus
+de parties.  Toutes les
+configurations rejouent les mêmes graines (variance réduite entre configs).
+
+    python tune_presets.py --grid small --games 4 --rungs 3 --out presets_tuned.json
+    python interface_jeu_pygame.py --preset-file presets_tuned.json --preset tuned
+
+Mesures par configuration : score moyen, taux de tuile max ≥ 512/1024/2048,
+CPU-ms par coup (time.process_time du worker).  Sorties : front de Pareto
+(score ↑, ms/coup ↓) et fichier de presets au format de PRESETS :
+« tuned » = config la moins chère atteignant --target-tile avec --target-rate.
+Seules les configs du dernier palier (le plus de parties) sont retenues.
+"""
+from __future__ import annotations
+import argparse, itertools, json, math, multiprocessing as mp, time
+from datetime import date
+
+import numpy as np
+
+TILES = (512, 1024, 2048)
+
+GRIDS = {
+    "small": {"depth": (1, 2, 3), "time": (10, 40), "beam": (1, 2), "prob": (1e-2, 1e-3),
+              "mcts_time": (10, 40)},
+    "full":  {"depth": (1, 2, 3, 4), "time": (10, 20, 40, 60), "beam": (1, 2, 4),
+              "prob": (3e-2, 1e-2, 3e-3, 1e-3), "mcts_time": (10, 20, 40, 60)},
+}
+
+
+def candidate_configs(grid: dict) -> list[dict]:
+    """Grille → liste de presets (format PRESETS), presets existants inclus."""
+    from interface_jeu_pygame import PRESETS
+    cfgs = [{"engine": "bepp", "depth": d, "time": t, "beam": b, "prob": p}
+            for d, t, b, p in itertools.product(grid["depth"], grid["time"],
+                                                grid["beam"], grid["prob"])]
+    cfgs += [{"engine": "adaptive", "depth": d, "time": t}      # effort par position
+             for d, t in itertools.product(grid["depth"], grid["time"])]
+    cfgs += [{"engine": "mcts", "time": t} for t in grid["mcts_time"]]
+    for name, p in PRESETS.items():                     # référence : presets actuels
+        cfg = {"depth": 3, "time": 60, "beam": 2, "prob": 1e-3} | p \
+              if p.get("engine", "bepp") == "bepp" else dict(p)
+        if cfg not in cfgs:
+            cfgs.append(cfg)
+    return cfgs
+
+
+def _key(cfg: dict) -> str:
+    return json.dumps(cfg, sort_keys=True)
+
+
+# ─────────────────────────────── une partie ────────────────────────────────
+def play(cfg: dict, seed: int, max_moves: int = 0) -> dict:
+    """Joue une partie seedée avec *cfg* → score, tuile max, coups, CPU s."""
+    from game import Game
+    from search import expectimax
+    import engines
+
+    expectimax.set_bepp_params(prob_cutoff=cfg.get("prob", 1e-3), beam_k=cfg.get("beam", 2),
+                               sparse_empties=cfg.get("sparse", 0),
+                               sparse_k=cfg.get("sparse_k", 6))
+    engine = engines.get(cfg.get("engine", "bepp"))
+    depth, ms = cfg.get("depth", 3), cfg.get("time", 60)
+
+    g = Game(seed=seed)
+    t0, moves = time.process_time(), 0
+    while not g.is_over() and (not max_moves or moves < max_moves):
+        mv = engine(g.board, depth, ms) if engines.is_search(engine) \
+            else engine(g.board, depth)
+        if not g.move(mv)[0]:                            # coup illégal : on s'arrête
+            break
+        moves += 1
+    return {"score": g.score, "max_tile": g.board.max_tile(), "moves": moves,
+            "cpu_s": time.process_time() - t0}
+
+
+def _task(args):
+    key, cfg, seed, max_moves = args
+    return key, play(cfg, seed, max_moves)
+
+
+# ──────────────────────────────── métriques ────────────────────────────────
+def summarize(cfg: dict, games: list[dict]) -> dict:
+    moves = sum(g["moves"] for g in games)
+    tiles = np.array([g["max_tile"] for g in games])
+    return {"config": cfg, "games": len(games),
+            "mean_score": float(np.mean([g["score"] for g in games])),
+            **{f"rate_{t}": float((tiles >= t).mean()) for t in TILES},
+            "ms_per_move": 1000 * sum(g["cpu_s"] for g in games) / max(moves, 1),
+            "mean_moves": moves / len(games)}
+
+
+def pareto_ranks(rows: list[dict]) -> list[int]:
+    """Rang de Pareto (0 = front) sur (score moyen ↑, ms/coup ↓)."""
+    pts = [(r["mean_score"], -r["ms_per_move"]) for r in rows]
+    ranks, left, rank = [0] * len(rows), set(range(len(rows))), 0
+    while left:
+        front = {i for i in left
+                 if not any(pts[j][0] >= pts[i][0] and pts[j][1] >= pts[i][1]
+                            and pts[j] != pts[i] for j in left)}
+        for i in front:
+            ranks[i] = rank
+        left -= front
+        rank += 1
+    return ranks
+
+
+# ─────────────────────────── successive halving ────────────────────────────
+def successive_halving(configs: list[dict], games: int, eta: int, rungs: int,
+                       workers: int, max_moves: int = 0, seed: int = 0) -> list[dict]:
+    """Renvoie le résumé de chaque configuration évaluée (toutes rung confondues)."""
+    played: dict[str, list[dict]] = {_key(c): [] for c in configs}
+    alive, n_games = list(configs), games
+    with mp.Pool(workers) as pool:
+        for rung in range(rungs):
+            tasks = [(_key(c), c, seed + s, max_moves)
+                     for c in alive for s in range(len(played[_key(c)]), n_games)]
+            t0 = time.time()
+            for key, res in pool.imap_unordered(_task, tasks):
+                played[key].append(res)
+            rows = [summarize(c, played[_key(c)]) for c in alive]
+            ranks = pareto_ranks(rows)
+            order = sorted(range(len(alive)), key=lambda i: (ranks[i], -rows[i]["mean_score"]))
+            print(f"   palier {rung}: {len(alive)} configs × {n_games} parties "
+                  f"({len(tasks)} jouées, {time.time() - t0:.0f}s)", flush=True)
+            alive = [alive[i] for i in order[:max(1, math.ceil(len(alive) / eta))]]
+            n_games *= eta
+    return [summarize(c, g) for c, g in
+            ((c, played[_key(c)]) for c in configs) if g]
+
+
+def pick_presets(rows: list[dict], target_tile: int, target_rate: float) -> dict[str, dict]:
+    """
+    « tuned » (moins cher atteignant l'objectif) + front de Pareto « pareto-i »,
+    choisis parmi les configs du dernier palier seulement : une config
+    éliminée après 2 parties chanceuses ne doit pas battre les finalistes.
+    """
+    most = max(r["games"] for r in rows)
+    rows = [r for r in rows if r["games"] == most]
+    ranks = pareto_ranks(rows)
+    front = sorted((r for r, k in zip(rows, ranks) if k == 0), key=lambda r: r["ms_per_move"])
+    out = {f"pareto-{i + 1}": r["config"] for i, r in enumerate(front)}
+    ok = [r for r in rows if r[f"rate_{target_tile}"] >= target_rate]
+    if ok:
+        out["tuned"] = min(ok, key=lambda r: r["ms_per_move"])["config"]
+    return out
+
+
+def _fmt(cfg: dict) -> str:
+    return " ".join(f"{k}={v}" for k, v in cfg.items())
+
+
+if __name__ == "__main__":
+    pa = argparse.ArgumentParser()
+    pa.add_argument("--grid", choices=list(GRIDS), default="small")
+    pa.add_argument("--games", type=int, default=2, help="parties par config au 1er palier")
+    pa.add_argument("--eta", type=int, default=3, help="facteur de réduction par palier")
+    pa.add_argument("--rungs", type=int, default=3)
+    pa.add_argument("--workers", type=int, default=max(1, mp.cpu_count() // 2))
+    pa.add_argument("--max-moves", type=int, default=0,
+                    help="coupe les parties après N coups (0 = parties complètes)")
+    pa.add_argument("--seed", type=int, default=0)
+    pa.add_argument("--target-tile", type=int, choices=TILES, default=2048)
+    pa.add_argument("--target-rate", type=float, default=0.5)
+    pa.add_argument("--out", default="presets_tuned.json")
+    args = pa.parse_args()
+
+    configs = candidate_configs(GRIDS[args.grid])
+    print(f"🔧 {len(configs)} configurations, successive halving "
+          f"(eta={args.eta}, {args.rungs} paliers, {args.workers} proc)")
+    rows = successive_halving(configs, args.games, args.eta, args.rungs,
+                              args.workers, args.max_moves, args.seed)
+    presets = pick_presets(rows, args.target_tile, args.target_rate)
+
+    print("\nFront de Pareto (score ↑, CPU-ms/coup ↓) :")
+    for name, cfg in presets.items():
+        if name.startswith("pareto"):
+            r = next(r for r in rows if r["config"] == cfg)
+            print(f"   {r['ms_per_move']:7.2f} ms/coup  score {r['mean_score']:8.0f}  "
+                  f"≥{args.target_tile} {r[f'rate_{args.target_tile}']:.0%}  "
+                  f"({r['games']} parties)  {_fmt(cfg)}")
+    if "tuned" in presets:
+        print(f"✅ tuned : {_fmt(presets['tuned'])}")
+    else:
+        print(f"⚠️  aucune config n'atteint {args.target_tile} dans "
+              f"{args.target_rate:.0%} des parties")
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump({"generated": date.today().isoformat(),
+                   "objective": {"tile": args.target_tile, "rate": args.target_rate,
+                                 "max_moves": args.max_moves},
+                   "presets": presets, "results": rows}, f, indent=1)
+    print(f"→ {args.out}")